@@ -1,16 +1,27 @@
 from abc import ABC, abstractmethod
 
-from typing import Dict
+from typing import Dict, List, TYPE_CHECKING
 
 from .Signal import Signal
 
+if TYPE_CHECKING:
+    from .Network import Network
+
 Signals = Dict[Signal, int]
 
 
 class ASTNode(ABC):
+    __slots__ = ("name", "__weakref__")
+
     def __init__(self, name: str):
         self.name: str = name
 
     @abstractmethod
     def output(self) -> Signals:
         raise NotImplementedError
+
+    def inputs(self) -> List["Network"]:
+        """
+        The networks this node reads from
+        """
+        return []
@@ -0,0 +1,247 @@
+import operator
+from enum import Enum
+from weakref import ref, ReferenceType
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from .ASTNode import ASTNode, Signals
+from .Network import Network
+from .Operand import Operand, ConstantOperand, SignalOperand
+from .Signal import Signal, SIGNALS, SIGNAL_COUNT
+from .int32 import wrap
+
+
+class Comparator(Enum):
+    GREATER = ">"
+    LESS = "<"
+    EQUAL = "="
+    GREATER_OR_EQUAL = "≥"
+    LESS_OR_EQUAL = "≤"
+    NOT_EQUAL = "≠"
+
+
+COMPARATORS: Dict[Comparator, Callable[[int, int], bool]] = {
+    Comparator.GREATER: operator.gt,
+    Comparator.LESS: operator.lt,
+    Comparator.EQUAL: operator.eq,
+    Comparator.GREATER_OR_EQUAL: operator.ge,
+    Comparator.LESS_OR_EQUAL: operator.le,
+    Comparator.NOT_EQUAL: operator.ne,
+}
+
+ARRAY_COMPARATORS: Dict[
+    Comparator, Callable[[npt.NDArray[np.int32], int], npt.NDArray[np.bool_]]
+] = {
+    Comparator.GREATER: np.greater,
+    Comparator.LESS: np.less,
+    Comparator.EQUAL: np.equal,
+    Comparator.GREATER_OR_EQUAL: np.greater_equal,
+    Comparator.LESS_OR_EQUAL: np.less_equal,
+    Comparator.NOT_EQUAL: np.not_equal,
+}
+
+
+class Wildcard(Enum):
+    """
+    Virtual signals standing for the signals present on the input network
+    """
+
+    EACH = "signal-each"
+    ANYTHING = "signal-anything"
+    EVERYTHING = "signal-everything"
+
+
+class OutputMode(Enum):
+    ONE = "one"
+    INPUT_COUNT = "input_count"
+
+
+# with more signals possibly present, wildcards are evaluated on the dense state with
+# numpy instead of looking at the written signals one by one
+DENSE_THRESHOLD: int = SIGNAL_COUNT // 8
+
+
+class Decision(ASTNode):
+    """
+    A decider combinator. The left signal is compared to the right operand:
+
+    - a signal is compared on its own
+    - everything is true if all present signals pass, also if there are none
+    - anything is true if at least one present signal passes
+    - each compares every present signal on its own
+
+    If the condition holds, the output signal is written with one or its input count.
+    Everything outputs all present signals, and each outputs every passing signal. With
+    each on the left, a single output signal gets the number of passing signals, or the
+    sum of their input counts.
+
+    Wildcards only look at the signals written into the network, so their cost grows
+    with the number of active signals rather than with the size of the signal table.
+    """
+
+    __slots__ = (
+        "comparator",
+        "_network",
+        "left",
+        "right",
+        "output_signal",
+        "output_mode",
+    )
+
+    def __init__(
+        self,
+        comparator: Comparator,
+        network: Network,
+        left: Union[Signal, Wildcard],
+        right: Optional[Operand] = None,
+        output_signal: Union[Signal, Wildcard, None] = None,
+        output_mode: OutputMode = OutputMode.ONE,
+    ):
+        super().__init__("Decision")
+        if output_signal is Wildcard.ANYTHING:
+            raise ValueError("Anything can't be used as output signal")
+        if output_signal is Wildcard.EACH and left is not Wildcard.EACH:
+            raise ValueError("Each can only be output if each is compared")
+        if output_signal is Wildcard.EVERYTHING and left is Wildcard.EACH:
+            raise ValueError("Everything can't be output if each is compared")
+        self.comparator: Comparator = comparator
+        self.network = network
+        self.left: Union[Signal, Wildcard] = left
+        self.right: Operand = right if right else ConstantOperand.shared(0)
+        self.output_signal: Union[Signal, Wildcard, None] = output_signal
+        self.output_mode: OutputMode = output_mode
+
+    @property
+    def network(self) -> Optional[Network]:
+        return self._network()
+
+    @network.setter
+    def network(self, net: Network) -> None:
+        self._network: ReferenceType[Network] = ref(net)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "comparator": self.comparator,
+            "network": self.network,
+            "left": self.left,
+            "right": self.right,
+            "output_signal": self.output_signal,
+            "output_mode": self.output_mode,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _present(
+        self, network: Network, right: int
+    ) -> Tuple[List[int], List[int], List[bool]]:
+        """
+        The indices and values of the signals present on the network, and whether each
+        of them passes the comparison
+        """
+        if network.active_count > DENSE_THRESHOLD:
+            state = network.previous_values
+            indices = np.flatnonzero(state)
+            values = state[indices]
+            passing = ARRAY_COMPARATORS[self.comparator](values, right)
+            return indices.tolist(), values.tolist(), passing.tolist()
+        compare = COMPARATORS[self.comparator]
+        present = network.present_signals()
+        return (
+            [index for index, _ in present],
+            [value for _, value in present],
+            [compare(value, right) for _, value in present],
+        )
+
+    def output(self) -> Signals:
+        network = self.network
+        if network is None:
+            raise RuntimeError("Network belonging to decision has been destroyed")
+        output = self.output_signal
+        if output is None:
+            return {}
+        right = self.right.value()
+        count = self.output_mode is OutputMode.INPUT_COUNT
+        if isinstance(self.left, Signal) and isinstance(output, Signal):
+            # no wildcards, the common case doesn't need to look at other signals
+            if not COMPARATORS[self.comparator](
+                network.get_signal_value(self.left), right
+            ):
+                return {}
+            value = network.get_signal_value(output) if count else 1
+            return {output: value} if value else {}
+        indices, values, passing = self._present(network, right)
+        if self.left is Wildcard.EACH:
+            if isinstance(output, Signal):
+                if count:
+                    total = wrap(sum(value for value, ok in zip(values, passing) if ok))
+                else:
+                    total = sum(passing)
+                return {output: total} if total else {}
+            return {
+                SIGNALS[index]: value if count else 1
+                for index, value, ok in zip(indices, values, passing)
+                if ok
+            }
+        if self.left is Wildcard.EVERYTHING:
+            condition = all(passing)
+        elif self.left is Wildcard.ANYTHING:
+            condition = any(passing)
+        else:
+            condition = COMPARATORS[self.comparator](
+                network.get_signal_value(self.left), right
+            )
+        if not condition:
+            return {}
+        if isinstance(output, Signal):
+            value = network.get_signal_value(output) if count else 1
+            return {output: value} if value else {}
+        return {
+            SIGNALS[index]: value if count else 1
+            for index, value in zip(indices, values)
+        }
+
+    def inputs(self) -> List[Network]:
+        networks: List[Network] = []
+        if network := self.network:
+            networks.append(network)
+        if isinstance(self.right, SignalOperand) and (network := self.right.network):
+            if network not in networks:
+                networks.append(network)
+        return networks
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Decision):
+            return (
+                self.comparator == other.comparator
+                and self.network == other.network
+                and self.left == other.left
+                and self.right == other.right
+                and self.output_signal == other.output_signal
+                and self.output_mode == other.output_mode
+            )
+        return False
+
+    def __hash__(self) -> int:
+        return hash(
+            (
+                self.comparator,
+                self.network,
+                self.left,
+                self.right,
+                self.output_signal,
+                self.output_mode,
+            )
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"Decision(comparator={self.comparator}, network={self.network!r}, "
+            f"left={self.left}, right={self.right}, output_signal={self.output_signal}, "
+            f"output_mode={self.output_mode})"
+        )
@@ -0,0 +1,100 @@
+from typing import Dict, Hashable, Optional, Tuple
+
+from .Network import Network
+from .Operand import (
+    Operand,
+    SignalOperand,
+    ConstantOperand,
+    SHARED_CONSTANTS,
+    _SharedConstantOperand,
+    _SharedSignalOperand,
+)
+from .Operation import Operation, NumericOperator
+from .Signal import Signal
+
+# operators whose operands can be swapped
+COMMUTATIVE: Tuple[NumericOperator, ...] = (
+    NumericOperator.ADD,
+    NumericOperator.MULTIPLY,
+    NumericOperator.AND,
+    NumericOperator.OR,
+    NumericOperator.XOR,
+)
+
+
+def structural_key(operation: Operation) -> Hashable:
+    """
+    A key shared by all operations computing the same value, also if the operands of a
+    commutative operator are swapped
+    """
+    operands: Hashable = (operation.left, operation.right)
+    if operation.operation in COMMUTATIVE:
+        operands = frozenset((operation.left, operation.right))
+    return operation.operation, operands, operation.output_signal
+
+
+class Interner:
+    """
+    Hands out one shared instance per distinct operand and operation, so generators
+    emitting identical sub-circuits build each of them only once. Interned signal
+    operands keep their networks alive as long as the table exists. Interned operands
+    can't be modified, assign new operands to change an operation instead.
+    """
+
+    def __init__(self) -> None:
+        self._constants: Dict[int, ConstantOperand] = {}
+        self._signals: Dict[Tuple[Network, Signal], SignalOperand] = {}
+        self._operations: Dict[Hashable, Operation] = {}
+
+    def __len__(self) -> int:
+        return len(self._constants) + len(self._signals) + len(self._operations)
+
+    def clear(self) -> None:
+        self._constants.clear()
+        self._signals.clear()
+        self._operations.clear()
+
+    def constant(self, value: int) -> ConstantOperand:
+        operand = self._constants.get(value)
+        if operand is None:
+            operand = SHARED_CONSTANTS.get(value)
+            if operand is None:
+                operand = _SharedConstantOperand(value)
+            self._constants[value] = operand
+        return operand
+
+    def signal(self, network: Network, signal: Signal) -> SignalOperand:
+        operand = self._signals.get((network, signal))
+        if operand is None:
+            operand = _SharedSignalOperand(network, signal)
+            self._signals[(network, signal)] = operand
+        return operand
+
+    def operand(self, operand: Operand) -> Operand:
+        if isinstance(operand, ConstantOperand):
+            return self.constant(operand.constant)
+        if isinstance(operand, SignalOperand) and (network := operand.network):
+            return self.signal(network, operand.signal)
+        return operand
+
+    def operation(
+        self,
+        operation: NumericOperator,
+        left: Optional[Operand] = None,
+        right: Optional[Operand] = None,
+        output_signal: Optional[Signal] = None,
+    ) -> Operation:
+        """
+        The shared operation, created if no equal one has been interned yet
+        """
+        return self.intern(Operation(operation, left, right, output_signal))
+
+    def intern(self, operation: Operation) -> Operation:
+        key = structural_key(operation)
+        existing = self._operations.get(key)
+        if existing is not None:
+            return existing
+        operation.left = self.operand(operation.left)
+        operation.right = self.operand(operation.right)
+        self._operations[key] = operation
+        return operation
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from .Network import Network
+from .Operand import Operand, SignalOperand, ConstantOperand
+from .Operation import Operation, NumericOperator, ARRAY_OPERATIONS
+from .Signal import Signal, SIGNAL_COUNT
+from .Simulator import Simulator
+
+
+class Kernel:
+    """
+    A design lowered into flat arrays, so a tick of the whole design is a few NumPy
+    gather, compute and scatter operations. The state of all networks is one vector,
+    followed by a pool of constants, and operands are indices into it. Nodes are sorted
+    by operator, so every operator is applied to one contiguous slice.
+
+    Every array has a leading lane axis, so one kernel can advance many independent
+    copies of the design at once. All lanes start from the simulator's state.
+    """
+
+    def __init__(self, simulator: Simulator, lanes: int = 1):
+        if lanes < 1:
+            raise ValueError(f"A kernel needs at least one lane, got {lanes}")
+        self.lanes: int = lanes
+        self.networks: List[Network] = list(simulator.networks)
+        self._network_index: Dict[Network, int] = {
+            network: index for index, network in enumerate(self.networks)
+        }
+        self.size: int = len(self.networks) * SIGNAL_COUNT
+        constants: Dict[int, int] = {}
+        operations: List[Tuple[Operation, List[Network]]] = []
+        for node in simulator.nodes:
+            if not isinstance(node, Operation):
+                raise ValueError(f"{node!r} cannot be compiled into a kernel")
+            operations.append((node, simulator.outputs(node)))
+        operations.sort(key=lambda item: list(NumericOperator).index(item[0].operation))
+
+        def operand_index(operand: Operand) -> int:
+            if isinstance(operand, SignalOperand) and (network := operand.network):
+                return self.position(network, operand.signal)
+            if isinstance(operand, ConstantOperand):
+                constant = int(np.int64(operand.constant).astype(np.int32))
+                return constants.setdefault(constant, self.size + len(constants))
+            raise ValueError(f"{operand!r} cannot be compiled into a kernel")
+
+        self.left: npt.NDArray[np.intp] = np.array(
+            [operand_index(node.left) for node, _ in operations], dtype=np.intp
+        )
+        self.right: npt.NDArray[np.intp] = np.array(
+            [operand_index(node.right) for node, _ in operations], dtype=np.intp
+        )
+        self.groups: List[Tuple[NumericOperator, int, int]] = []
+        for position, (node, _) in enumerate(operations):
+            if self.groups and self.groups[-1][0] == node.operation:
+                operator, start, _ = self.groups[-1]
+                self.groups[-1] = (operator, start, position + 1)
+            else:
+                self.groups.append((node.operation, position, position + 1))
+        scatter: List[Tuple[int, int]] = sorted(
+            (self.position(network, node.output_signal), position)
+            for position, (node, outputs) in enumerate(operations)
+            if node.output_signal is not None
+            for network in outputs
+        )
+        self.sources: npt.NDArray[np.intp] = np.array(
+            [source for _, source in scatter], dtype=np.intp
+        )
+        targets = np.array([target for target, _ in scatter], dtype=np.intp)
+        self.targets, self.starts = np.unique(targets, return_index=True)
+        self.values: npt.NDArray[np.int64] = np.zeros(
+            (lanes, self.size + len(constants)), dtype=np.int64
+        )
+        self.values[:, list(constants.values())] = list(constants.keys())
+        self.inputs: npt.NDArray[np.int64] = np.zeros(
+            (lanes, self.size), dtype=np.int64
+        )
+        for (network, signal), value in simulator.inputs.items():
+            self.inputs[:, self.position(network, signal)] = value
+        # added to the inputs, set_input only replaces the inputs
+        self.constant_inputs: npt.NDArray[np.int64] = np.zeros(
+            self.size, dtype=np.int64
+        )
+        for (network, signal), value in simulator.constant_inputs.items():
+            self.constant_inputs[self.position(network, signal)] += value
+        for index, network in enumerate(self.networks):
+            start = index * SIGNAL_COUNT
+            self.values[:, start : start + SIGNAL_COUNT] = network.previous_values
+        self.tick_count: int = simulator.tick_count
+
+    def position(self, network: Network, signal: Signal) -> int:
+        return self._network_index[network] * SIGNAL_COUNT + signal.index
+
+    def set_input(
+        self,
+        network: Network,
+        signal: Signal,
+        value: npt.ArrayLike,
+        lane: Optional[int] = None,
+    ) -> None:
+        """
+        Drives a signal in one lane, or in all lanes if none is given. Values for all
+        lanes can also be given as an array with one entry per lane.
+        """
+        position = self.position(network, signal)
+        if lane is None:
+            self.inputs[:, position] = value
+        else:
+            self.inputs[lane, position] = value
+
+    def load(
+        self, network: Network, values: npt.ArrayLike, lane: Optional[int] = None
+    ) -> None:
+        """
+        Overwrites the state of a network, indexed by Signal.index, in one or all lanes
+        """
+        start = self._network_index[network] * SIGNAL_COUNT
+        state = np.asarray(values, dtype=np.int64).astype(np.int32)
+        if lane is None:
+            self.values[:, start : start + SIGNAL_COUNT] = state
+        else:
+            self.values[lane, start : start + SIGNAL_COUNT] = state
+
+    def get_signal_value(self, network: Network, signal: Signal, lane: int = 0) -> int:
+        return int(self.values[lane, self.position(network, signal)])
+
+    def get_signal_values(
+        self, network: Network, signal: Signal
+    ) -> npt.NDArray[np.int32]:
+        """
+        The value of a signal in every lane
+        """
+        return self.values[:, self.position(network, signal)].astype(np.int32)
+
+    def state(self, network: Network, lane: int = 0) -> npt.NDArray[np.int32]:
+        start = self._network_index[network] * SIGNAL_COUNT
+        return self.values[lane, start : start + SIGNAL_COUNT].astype(np.int32)
+
+    def tick(self) -> None:
+        values = self.values
+        left = values[:, self.left]
+        right = values[:, self.right]
+        results = np.empty(left.shape, dtype=np.int64)
+        for operator, start, stop in self.groups:
+            results[:, start:stop] = ARRAY_OPERATIONS[operator](
+                left[:, start:stop], right[:, start:stop]
+            )
+        state = self.inputs + self.constant_inputs
+        if len(self.sources):
+            state[:, self.targets] += np.add.reduceat(
+                results[:, self.sources], self.starts, axis=1
+            )
+        values[:, : self.size] = state.astype(np.int32)
+        self.tick_count += 1
+
+    def run(self, ticks: int) -> None:
+        for _ in range(ticks):
+            self.tick()
+
+    def write_back(self, lane: int = 0) -> None:
+        """
+        Copies the state of a lane into the networks, so it can be inspected through
+        the object graph. Simulators driving those networks can't be used afterwards.
+        """
+        for network in self.networks:
+            network.load(self.state(network, lane))
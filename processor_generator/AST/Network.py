@@ -1,17 +1,177 @@
+import random
+from array import array
 from weakref import ref, ReferenceType
 
-from typing import List
+from typing import (
+    List,
+    Set,
+    Iterator,
+    MutableMapping,
+    Dict,
+    Any,
+    Optional,
+    Callable,
+    Protocol,
+    Tuple,
+)
 
-from .ASTNode import ASTNode, Signals
-from .Signal import Signal
+import numpy as np
+import numpy.typing as npt
+
+from .ASTNode import ASTNode
+from .Signal import Signal, SIGNALS, SIGNAL_COUNT
+from .int32 import wrap, INT32_OFFSET, INT32_MASK
+
+# random weights of a linear hash over a state, so the hash can be updated per signal
+# whenever a value changes. Equal hashes don't guarantee equal states.
+HASH_MASK: int = (1 << 64) - 1
+_generator = random.Random(0x5EED)
+HASH_WEIGHTS: List[int] = [_generator.getrandbits(64) | 1 for _ in range(SIGNAL_COUNT)]
+_HASH_WEIGHT_ARRAY: npt.NDArray[np.uint64] = np.array(HASH_WEIGHTS, dtype=np.uint64)
+
+
+def new_state() -> "array[int]":
+    return array("i", bytes(4 * SIGNAL_COUNT))
+
+
+def hash_state(values: npt.ArrayLike) -> int:
+    """
+    The hash of a dense state, as kept up to date by a network
+    """
+    state = np.asarray(values, dtype=np.int64).view(np.uint64)
+    return int((state * _HASH_WEIGHT_ARRAY).sum(dtype=np.uint64))
+
+
+class SignalsView(MutableMapping[Signal, int]):
+    """
+    A dict-like view over a dense state array. Signals with the value zero are treated
+    as not present. on_change is called with the index and the difference of every
+    changed value.
+    """
+
+    def __init__(
+        self,
+        values: "array[int]",
+        active: Set[int],
+        on_change: Optional[Callable[[int, int], None]] = None,
+    ):
+        self._values: "array[int]" = values
+        self._active: Set[int] = active
+        self._on_change: Optional[Callable[[int, int], None]] = on_change
+
+    def __getitem__(self, signal: Signal) -> int:
+        if value := self._values[signal.index]:
+            return value
+        raise KeyError(signal)
+
+    def __setitem__(self, signal: Signal, value: int) -> None:
+        old = self._values[signal.index]
+        self._values[signal.index] = new = wrap(value)
+        self._active.add(signal.index)
+        if self._on_change:
+            self._on_change(signal.index, new - old)
+
+    def __delitem__(self, signal: Signal) -> None:
+        if not (old := self._values[signal.index]):
+            raise KeyError(signal)
+        self._values[signal.index] = 0
+        if self._on_change:
+            self._on_change(signal.index, -old)
+
+    def __iter__(self) -> Iterator[Signal]:
+        values = self._values
+        return iter([SIGNALS[index] for index in sorted(self._active) if values[index]])
+
+    def __len__(self) -> int:
+        values = self._values
+        return sum(1 for index in self._active if values[index])
+
+    def __repr__(self) -> str:
+        return f"SignalsView({dict(self)!r})"
+
+
+class EdgeTable(Protocol):
+    """
+    Stores the edges between networks and nodes outside of the networks, e.g. a
+    Simulator keeping them in integer arrays
+    """
+
+    def writers(self, network: "Network") -> List[ASTNode]: ...
+
+    def readers(self, network: "Network") -> List[ASTNode]: ...
 
 
 class Network:
+    __slots__ = (
+        "_depends",
+        "_dependants",
+        "_edges",
+        "_previous",
+        "_current",
+        "_previous_active",
+        "_current_active",
+        "_previous_hash",
+        "_current_hash",
+        "_tick_hooks",
+        "__weakref__",
+    )
+
     def __init__(self) -> None:
         self._depends: List[ReferenceType[ASTNode]] = []
         self._dependants: List[ReferenceType[ASTNode]] = []
-        self._previous_state: Signals = {}
-        self._current_state: Signals = {}
+        # replaces the lists above if set
+        self._edges: Optional[ReferenceType[EdgeTable]] = None
+        # double buffered state, indexed by Signal.index. The active sets hold the
+        # indices that may be non-zero, so ticking only clears what has been written.
+        self._previous: "array[int]" = new_state()
+        self._current: "array[int]" = new_state()
+        self._previous_active: Set[int] = set()
+        self._current_active: Set[int] = set()
+        # hash_state of both states, updated with every change
+        self._previous_hash: int = 0
+        self._current_hash: int = 0
+        # called with the network after every tick, e.g. by a TraceRecorder
+        self._tick_hooks: Optional[List[Callable[["Network"], None]]] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # weak references can't be pickled, the nodes and edge table are restored if
+        # they are pickled along with the network
+        return {
+            "_depends": [
+                node for reference in self._depends if (node := reference()) is not None
+            ],
+            "_dependants": [
+                node
+                for reference in self._dependants
+                if (node := reference()) is not None
+            ],
+            "_edges": self._edges() if self._edges else None,
+            "_previous": self._previous,
+            "_current": self._current,
+            "_previous_active": self._previous_active,
+            "_current_active": self._current_active,
+            "_previous_hash": self._previous_hash,
+            "_current_hash": self._current_hash,
+            # hooks belong to this process, e.g. an open trace file
+            "_tick_hooks": None,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._depends = [ref(node) for node in state["_depends"]]
+        self._dependants = [ref(node) for node in state["_dependants"]]
+        edges = state.get("_edges")
+        self._edges = ref(edges) if edges is not None else None
+
+    def use_edges(self, edges: Optional[EdgeTable]) -> None:
+        """
+        Lets an edge table answer depends and dependants instead of the lists of weak
+        references, which are dropped. None switches back to empty lists.
+        """
+        self._depends = []
+        self._dependants = []
+        self._edges = ref(edges) if edges is not None else None
 
     def depends_on(self, node: ASTNode) -> None:
         self._depends.append(ref(node))
@@ -19,20 +179,139 @@ class Network:
     def dependant_from(self, node: ASTNode) -> None:
         self._dependants.append(ref(node))
 
+    def add_tick_hook(self, hook: Callable[["Network"], None]) -> None:
+        if self._tick_hooks is None:
+            self._tick_hooks = []
+        self._tick_hooks.append(hook)
+
+    def remove_tick_hook(self, hook: Callable[["Network"], None]) -> None:
+        if self._tick_hooks is None:
+            raise ValueError(f"{hook!r} is not a tick hook of this network")
+        self._tick_hooks.remove(hook)
+
     def get_signal_value(self, signal: Signal) -> int:
-        return self._previous_state.setdefault(signal, 0)
+        return self._previous[signal.index]
+
+    @property
+    def active_count(self) -> int:
+        """
+        An upper bound of the number of signals present in the previous state
+        """
+        return len(self._previous_active)
+
+    def present_signals(self) -> List[Tuple[int, int]]:
+        """
+        The index and value of every signal present in the previous state. Only the
+        signals written since the state was cleared are looked at, not the whole state.
+        """
+        values = self._previous
+        return [
+            (index, value)
+            for index in self._previous_active
+            if (value := values[index])
+        ]
 
-    def tick(self) -> None:
-        self._previous_state = self._current_state
-        self._current_state = {}
+    def tick(self, clear: bool = True) -> None:
+        """
+        Makes the values written this tick visible. Without clearing, the current state
+        is kept as well, so it can be updated incrementally instead of being rewritten.
+        """
+        if not clear:
+            self._previous[:] = self._current
+            self._previous_active = set(self._current_active)
+            self._previous_hash = self._current_hash
+        else:
+            previous = self._previous
+            for index in self._previous_active:
+                previous[index] = 0
+            self._previous_active.clear()
+            self._previous, self._current = self._current, previous
+            self._previous_active, self._current_active = (
+                self._current_active,
+                self._previous_active,
+            )
+            self._previous_hash, self._current_hash = self._current_hash, 0
+        if self._tick_hooks:
+            for hook in self._tick_hooks:
+                hook(self)
 
     def update_value(self, signal: Signal, value: int) -> None:
-        self._current_state[signal] = self._current_state.setdefault(signal, 0) + value
+        index = signal.index
+        current = self._current
+        old = current[index]
+        current[index] = new = (
+            (old + value + INT32_OFFSET) & INT32_MASK
+        ) - INT32_OFFSET
+        self._current_active.add(index)
+        self._current_hash = (
+            self._current_hash + (new - old) * HASH_WEIGHTS[index]
+        ) & HASH_MASK
+
+    def load(
+        self, values: npt.ArrayLike, current: Optional[npt.ArrayLike] = None
+    ) -> None:
+        """
+        Replaces the previous and the current state, indexed by Signal.index. Both are
+        set to the same values unless a separate current state is given.
+        """
+        state = np.asarray(values, dtype=np.int64).astype(np.int32)
+        self.previous_values[:] = state
+        self._previous_active = set(np.flatnonzero(state).tolist())
+        self._previous_hash = hash_state(state)
+        if current is None:
+            self.current_values[:] = state
+            self._current_active = set(self._previous_active)
+            self._current_hash = self._previous_hash
+        else:
+            current_state = np.asarray(current, dtype=np.int64).astype(np.int32)
+            self.current_values[:] = current_state
+            self._current_active = set(np.flatnonzero(current_state).tolist())
+            self._current_hash = hash_state(current_state)
 
     @property
     def depends(self) -> List[ReferenceType[ASTNode]]:
+        if self._edges and (edges := self._edges()):
+            return [ref(node) for node in edges.writers(self)]
         return self._depends
 
     @property
     def dependants(self) -> List[ReferenceType[ASTNode]]:
+        if self._edges and (edges := self._edges()):
+            return [ref(node) for node in edges.readers(self)]
         return self._dependants
+
+    @property
+    def state_hash(self) -> int:
+        """
+        A hash of the state of the previous tick, see hash_state
+        """
+        return self._previous_hash
+
+    def _change_previous(self, index: int, delta: int) -> None:
+        self._previous_hash = (
+            self._previous_hash + delta * HASH_WEIGHTS[index]
+        ) & HASH_MASK
+
+    def _change_current(self, index: int, delta: int) -> None:
+        self._current_hash = (
+            self._current_hash + delta * HASH_WEIGHTS[index]
+        ) & HASH_MASK
+
+    @property
+    def _previous_state(self) -> SignalsView:
+        return SignalsView(self._previous, self._previous_active, self._change_previous)
+
+    @property
+    def _current_state(self) -> SignalsView:
+        return SignalsView(self._current, self._current_active, self._change_current)
+
+    @property
+    def previous_values(self) -> npt.NDArray[np.int32]:
+        """
+        The state of the previous tick as a numpy array, sharing memory with the network
+        """
+        return np.frombuffer(self._previous, dtype=np.int32)
+
+    @property
+    def current_values(self) -> npt.NDArray[np.int32]:
+        return np.frombuffer(self._current, dtype=np.int32)
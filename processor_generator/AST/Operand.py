@@ -1,19 +1,23 @@
 from abc import ABC, abstractmethod
 from weakref import ref, ReferenceType
 
-from typing import Any, Optional
+from typing import Any, Optional, Dict, Tuple
 
 from .Network import Network
 from .Signal import Signal
 
 
 class Operand(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def value(self) -> int:
         raise NotImplementedError
 
 
 class SignalOperand(Operand):
+    __slots__ = ("_network", "signal")
+
     def __init__(self, network: Network, signal: Signal):
         self.network = network
         self.signal: Signal = signal
@@ -23,11 +27,21 @@ class SignalOperand(Operand):
             return network.get_signal_value(self.signal)
         raise RuntimeError("Network belonging to signal has been destroyed")
 
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"network": self.network, "signal": self.signal}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.network = state["network"]
+        self.signal = state["signal"]
+
     def __eq__(self, other: Any) -> bool:
         if isinstance(other, SignalOperand):
             return self.network == other.network and self.signal == other.signal
         return False
 
+    def __hash__(self) -> int:
+        return hash((SignalOperand, self.network, self.signal))
+
     def __repr__(self) -> str:
         return f"SignalOperand(network={self.network!r}, signal={self.signal!r})"
 
@@ -40,10 +54,37 @@ class SignalOperand(Operand):
         self._network: ReferenceType[Network] = ref(net)
 
 
+class _SharedSignalOperand(SignalOperand):
+    __slots__ = ()
+
+    def __init__(self, network: Network, signal: Signal):
+        object.__setattr__(self, "_network", ref(network))
+        object.__setattr__(self, "signal", signal)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(
+            "Shared operands can't be modified, assign a new SignalOperand instead"
+        )
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return SignalOperand, (self.network, self.signal)
+
+
 class ConstantOperand(Operand):
+    __slots__ = ("constant",)
+
     def __init__(self, constant: int):
         self.constant: int = constant
 
+    @staticmethod
+    def shared(constant: int) -> "ConstantOperand":
+        """
+        A constant operand shared with every other user of the same small constant, to
+        save memory in large designs. Shared operands can't be modified.
+        """
+        operand = SHARED_CONSTANTS.get(constant)
+        return ConstantOperand(constant) if operand is None else operand
+
     def value(self) -> int:
         return self.constant
 
@@ -52,5 +93,28 @@ class ConstantOperand(Operand):
             return self.constant == other.constant
         return False
 
+    def __hash__(self) -> int:
+        return hash((ConstantOperand, self.constant))
+
     def __repr__(self) -> str:
         return f"ConstantOperand(constant={self.constant})"
+
+
+class _SharedConstantOperand(ConstantOperand):
+    __slots__ = ()
+
+    def __init__(self, constant: int):
+        object.__setattr__(self, "constant", constant)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(
+            "Shared constants can't be modified, assign a new ConstantOperand instead"
+        )
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return ConstantOperand.shared, (self.constant,)
+
+
+SHARED_CONSTANTS: Dict[int, ConstantOperand] = {
+    constant: _SharedConstantOperand(constant) for constant in range(-1, 256)
+}
@@ -1,9 +1,18 @@
 from enum import Enum
 
-from typing import Optional, Any
+from typing import Optional, Any, Callable, Dict, List
+
+import numpy as np
+import numpy.typing as npt
 
 from .ASTNode import ASTNode, Signals
-from .Operand import Operand, ConstantOperand
+from .Network import Network
+from .Operand import Operand, ConstantOperand, SignalOperand
+from .Signal import Signal
+from .int32 import wrap, INT32_MASK
+
+Int32Array = npt.NDArray[np.int32]
+Int64Array = npt.NDArray[np.int64]
 
 
 class NumericOperator(Enum):
@@ -20,20 +29,171 @@ class NumericOperator(Enum):
     XOR = "XOR"
 
 
+def _divide(left: int, right: int) -> int:
+    if right == 0:
+        return 0
+    quotient = abs(left) // abs(right)
+    return wrap(quotient if (left < 0) == (right < 0) else -quotient)
+
+
+def _modulo(left: int, right: int) -> int:
+    if right == 0:
+        return 0
+    remainder = abs(left) % abs(right)
+    return -remainder if left < 0 else remainder
+
+
+def _exponent(left: int, right: int) -> int:
+    if right < 0:
+        return 0
+    return wrap(pow(left, right, INT32_MASK + 1))
+
+
+# operands are expected to be 32 bit already. Factorio only uses the lowest five bits
+# of the shift amount.
+OPERATIONS: Dict[NumericOperator, Callable[[int, int], int]] = {
+    NumericOperator.ADD: lambda left, right: wrap(left + right),
+    NumericOperator.SUBTRACT: lambda left, right: wrap(left - right),
+    NumericOperator.MULTIPLY: lambda left, right: wrap(left * right),
+    NumericOperator.DIVIDE: _divide,
+    NumericOperator.MODULO: _modulo,
+    NumericOperator.EXPONENT: _exponent,
+    NumericOperator.LEFT_BIT_SHIFT: lambda left, right: wrap(left << (right & 31)),
+    NumericOperator.RIGHT_BIT_SHIFT: lambda left, right: left >> (right & 31),
+    NumericOperator.AND: lambda left, right: left & right,
+    NumericOperator.OR: lambda left, right: left | right,
+    NumericOperator.XOR: lambda left, right: left ^ right,
+}
+
+
+def _divide_many(left: Int64Array, right: Int64Array) -> Int64Array:
+    divisor = np.where(right == 0, 1, right)
+    quotient = np.abs(left) // np.abs(divisor)
+    return np.where(
+        right == 0, 0, np.where((left < 0) == (right < 0), 1, -1) * quotient
+    )
+
+
+def _modulo_many(left: Int64Array, right: Int64Array) -> Int64Array:
+    divisor = np.where(right == 0, 1, right)
+    remainder = np.abs(left) % np.abs(divisor)
+    return np.where(right == 0, 0, np.where(left < 0, -remainder, remainder))
+
+
+def _exponent_many(left: Int64Array, right: Int64Array) -> Int64Array:
+    base = left.astype(np.uint64) & np.uint64(INT32_MASK)
+    exponent = np.maximum(right, 0).astype(np.uint64)
+    result = np.ones(np.broadcast(base, exponent).shape, dtype=np.uint64)
+    # square and multiply, every intermediate product of two 32 bit numbers fits
+    for _ in range(31):
+        result = np.where(
+            exponent & np.uint64(1), (result * base) & np.uint64(INT32_MASK), result
+        )
+        base = (base * base) & np.uint64(INT32_MASK)
+        exponent >>= np.uint64(1)
+    return np.where(right < 0, 0, result.astype(np.int64))
+
+
+ARRAY_OPERATIONS: Dict[
+    NumericOperator, Callable[[Int64Array, Int64Array], Int64Array]
+] = {
+    NumericOperator.ADD: np.add,
+    NumericOperator.SUBTRACT: np.subtract,
+    NumericOperator.MULTIPLY: np.multiply,
+    NumericOperator.DIVIDE: _divide_many,
+    NumericOperator.MODULO: _modulo_many,
+    NumericOperator.EXPONENT: _exponent_many,
+    NumericOperator.LEFT_BIT_SHIFT: lambda left, right: left << (right & 31),
+    NumericOperator.RIGHT_BIT_SHIFT: lambda left, right: left >> (right & 31),
+    NumericOperator.AND: np.bitwise_and,
+    NumericOperator.OR: np.bitwise_or,
+    NumericOperator.XOR: np.bitwise_xor,
+}
+
+
+def evaluate_many(
+    operation: NumericOperator, left: npt.ArrayLike, right: npt.ArrayLike
+) -> Int32Array:
+    """
+    Applies an operator element wise to arrays of operand values, with the same
+    results as Operation.output
+    """
+    left_values = np.asarray(left, dtype=np.int64).astype(np.int32).astype(np.int64)
+    right_values = np.asarray(right, dtype=np.int64).astype(np.int32).astype(np.int64)
+    # with 32 bit operands no int64 intermediate can overflow, so truncating the
+    # result to 32 bits gives factorio's wrap around
+    result = ARRAY_OPERATIONS[operation](left_values, right_values)
+    return np.asarray(result).astype(np.int32)
+
+
 class Operation(ASTNode):
+    __slots__ = ("_operation", "_function", "left", "right", "output_signal")
+
     def __init__(
         self,
         operation: NumericOperator,
         left: Optional[Operand] = None,
         right: Optional[Operand] = None,
+        output_signal: Optional[Signal] = None,
     ):
         super().__init__("Operation")
         self.operation: NumericOperator = operation
-        self.left: Operand = left if left else ConstantOperand(0)
-        self.right: Operand = right if right else ConstantOperand(0)
+        self.left: Operand = left if left else ConstantOperand.shared(0)
+        self.right: Operand = right if right else ConstantOperand.shared(0)
+        self.output_signal: Optional[Signal] = output_signal
+
+    @property
+    def operation(self) -> NumericOperator:
+        return self._operation
+
+    @operation.setter
+    def operation(self, operation: NumericOperator) -> None:
+        self._operation = operation
+        self._function: Callable[[int, int], int] = OPERATIONS[operation]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "operation": self._operation,
+            "left": self.left,
+            "right": self.right,
+            "output_signal": self.output_signal,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def evaluate(self) -> int:
+        # constants may lie outside of 32 bits, they wrap like in evaluate_many
+        return self._function(wrap(self.left.value()), wrap(self.right.value()))
 
     def output(self) -> Signals:
-        raise NotImplementedError("")
+        if self.output_signal is None:
+            return {}
+        return {self.output_signal: self.evaluate()}
+
+    def inputs(self) -> List[Network]:
+        networks: List[Network] = []
+        for operand in (self.left, self.right):
+            if isinstance(operand, SignalOperand) and (network := operand.network):
+                if network not in networks:
+                    networks.append(network)
+        return networks
+
+    @staticmethod
+    def evaluate_all(operations: List["Operation"]) -> Int32Array:
+        """
+        Evaluates many operations sharing one operator in a single vectorized step
+        """
+        if not operations:
+            return np.zeros(0, dtype=np.int32)
+        operator = operations[0].operation
+        if any(operation.operation != operator for operation in operations):
+            raise ValueError("All operations have to share the same operator")
+        left = [operation.left.value() for operation in operations]
+        right = [operation.right.value() for operation in operations]
+        return evaluate_many(operator, left, right)
 
     def __eq__(self, other: Any) -> bool:
         if isinstance(other, Operation):
@@ -41,8 +201,14 @@ class Operation(ASTNode):
                 self.operation == other.operation
                 and self.right == other.right
                 and self.left == other.left
+                and self.output_signal == other.output_signal
             )
         return False
 
+    def __hash__(self) -> int:
+        # structural like __eq__, so operations must not be changed while they are
+        # used as keys
+        return hash((self.operation, self.left, self.right, self.output_signal))
+
     def __repr__(self) -> str:
-        return f"Operation(operation={self.operation}, left={self.left}, right={self.right})"
+        return f"Operation(operation={self.operation}, left={self.left}, right={self.right}, output_signal={self.output_signal})"
@@ -0,0 +1,305 @@
+import copy
+
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .ASTNode import ASTNode
+from .Interner import structural_key
+from .Network import Network
+from .Operand import Operand, SignalOperand, ConstantOperand
+from .Operation import Operation, NumericOperator, OPERATIONS
+from .Signal import Signal
+from .Simulator import Simulator
+from .int32 import wrap
+
+# operator -> constants that leave the other operand unchanged, on the right and on
+# the left. Shifts only use the lowest five bits of the amount.
+RIGHT_IDENTITIES: Dict[NumericOperator, Set[int]] = {
+    NumericOperator.ADD: {0},
+    NumericOperator.SUBTRACT: {0},
+    NumericOperator.MULTIPLY: {1},
+    NumericOperator.DIVIDE: {1},
+    NumericOperator.EXPONENT: {1},
+    NumericOperator.LEFT_BIT_SHIFT: {0, 32, 64},
+    NumericOperator.RIGHT_BIT_SHIFT: {0, 32, 64},
+    NumericOperator.AND: {-1},
+    NumericOperator.OR: {0},
+    NumericOperator.XOR: {0},
+}
+LEFT_IDENTITIES: Dict[NumericOperator, Set[int]] = {
+    NumericOperator.ADD: {0},
+    NumericOperator.MULTIPLY: {1},
+    NumericOperator.AND: {-1},
+    NumericOperator.OR: {0},
+    NumericOperator.XOR: {0},
+}
+# operator -> constants that make the result zero whatever the other operand is
+RIGHT_ZEROS: Dict[NumericOperator, Set[int]] = {
+    NumericOperator.MULTIPLY: {0},
+    NumericOperator.DIVIDE: {0},
+    NumericOperator.MODULO: {0, 1, -1},
+    NumericOperator.AND: {0},
+}
+LEFT_ZEROS: Dict[NumericOperator, Set[int]] = {
+    NumericOperator.MULTIPLY: {0},
+    NumericOperator.DIVIDE: {0},
+    NumericOperator.MODULO: {0},
+    NumericOperator.LEFT_BIT_SHIFT: {0},
+    NumericOperator.RIGHT_BIT_SHIFT: {0},
+    NumericOperator.AND: {0},
+}
+
+
+class OptimizationReport(NamedTuple):
+    before: int
+    after: int
+    # operations replaced by constant inputs, or removed if the constant is zero
+    folded: int
+    identities: int
+    dead: int
+
+    @property
+    def removed(self) -> int:
+        return self.before - self.after
+
+
+def _constant(operand: Operand) -> Optional[int]:
+    if isinstance(operand, ConstantOperand):
+        return wrap(operand.constant)
+    return None
+
+
+def constant_result(operation: Operation) -> Optional[int]:
+    """
+    The output value of an operation if it doesn't depend on any network
+    """
+    left, right = _constant(operation.left), _constant(operation.right)
+    if left is not None and right is not None:
+        return OPERATIONS[operation.operation](left, right)
+    if right in RIGHT_ZEROS.get(operation.operation, ()):
+        return 0
+    if left in LEFT_ZEROS.get(operation.operation, ()):
+        return 0
+    return None
+
+
+def identity_source(operation: Operation) -> Optional[SignalOperand]:
+    """
+    The operand an operation copies unchanged, if it is an identity like x + 0
+    """
+    left, right = operation.left, operation.right
+    if isinstance(left, SignalOperand) and _constant(right) in RIGHT_IDENTITIES.get(
+        operation.operation, ()
+    ):
+        return left
+    if isinstance(right, SignalOperand) and _constant(left) in LEFT_IDENTITIES.get(
+        operation.operation, ()
+    ):
+        return right
+    return None
+
+
+def optimize(
+    simulator: Simulator,
+    keep: Iterable[Network],
+    identities: bool = True,
+) -> Tuple[Simulator, OptimizationReport]:
+    """
+    Builds a smaller simulator for the design of a simulator that hasn't run yet.
+    Rewired operations are replaced by copies, so the nodes and operands of the design
+    aren't modified, but its networks and the other nodes are shared with the new
+    simulator. The given simulator must not be used afterwards.
+
+    - operations that don't depend on any network are replaced by constant inputs
+    - identities like x + 0 are removed if they are the only writer of their output
+      network, and its readers read the copied signal directly. This removes the one
+      tick delay the identity adds, so it can be turned off for timing sensitive designs
+    - operations that don't contribute to the networks to keep, the outputs of the
+      design, are removed
+
+    Only Operation nodes are optimized. Other nodes are kept as they are, and so are the
+    identities writing into networks they read.
+    """
+    if simulator.tick_count:
+        raise ValueError("Only simulators that haven't run yet can be optimized")
+    kept: Set[Network] = set(keep)
+    nodes = list(simulator.nodes)
+    outputs: Dict[int, List[Network]] = {
+        id(node): list(dict.fromkeys(simulator.outputs(node))) for node in nodes
+    }
+    inputs = simulator.inputs
+    constants: Dict[Tuple[Network, Signal], int] = dict(simulator.constant_inputs)
+    folded = identity_count = 0
+
+    survivors = []
+    for node in nodes:
+        value = constant_result(node) if isinstance(node, Operation) else None
+        if value is None:
+            survivors.append(node)
+            continue
+        folded += 1
+        assert isinstance(node, Operation)
+        if node.output_signal is not None and value:
+            for network in outputs[id(node)]:
+                key = (network, node.output_signal)
+                constants[key] = wrap(constants.get(key, 0) + value)
+    nodes = survivors
+
+    if identities:
+        writers: Dict[Network, List[int]] = {}
+        # network -> operations reading it and the side of their operand
+        readers: Dict[Network, List[Tuple[int, str]]] = {}
+        # networks read by other nodes, which can't be rewired
+        foreign: Set[Network] = set()
+        for index, node in enumerate(nodes):
+            for network in outputs[id(node)]:
+                writers.setdefault(network, []).append(index)
+            if isinstance(node, Operation):
+                for side in ("left", "right"):
+                    operand = getattr(node, side)
+                    if isinstance(operand, SignalOperand) and operand.network:
+                        readers.setdefault(operand.network, []).append((index, side))
+            else:
+                foreign.update(node.inputs())
+        driven = {network for network, _ in [*inputs, *constants]}
+        removed: Set[int] = set()
+        copied: Set[int] = set()
+        for index, node in enumerate(nodes):
+            if not isinstance(node, Operation) or node.output_signal is None:
+                continue
+            source = identity_source(node)
+            targets = outputs[id(node)]
+            if source is None or source.network is None or len(targets) != 1:
+                continue
+            target = targets[0]
+            if (
+                target is source.network
+                or target in kept
+                or target in driven
+                or target in foreign
+                or writers[target] != [index]
+                or any(
+                    getattr(nodes[reader], side).signal != node.output_signal
+                    for reader, side in readers.get(target, [])
+                )
+            ):
+                continue
+            for reader, side in readers.pop(target, []):
+                if reader not in copied:
+                    # operands and operations may be shared, e.g. by an Interner, so
+                    # the reader is replaced by a copy with a new operand
+                    original = nodes[reader]
+                    nodes[reader] = copy.copy(original)
+                    outputs[id(nodes[reader])] = outputs[id(original)]
+                    copied.add(reader)
+                setattr(
+                    nodes[reader], side, SignalOperand(source.network, source.signal)
+                )
+                readers.setdefault(source.network, []).append((reader, side))
+            removed.add(index)
+            identity_count += 1
+        nodes = [node for index, node in enumerate(nodes) if index not in removed]
+
+    # the nodes contributing to a kept network, directly or through other networks
+    writers_of: Dict[Network, List[int]] = {}
+    for index, node in enumerate(nodes):
+        if not isinstance(node, Operation) or node.output_signal is not None:
+            for network in outputs[id(node)]:
+                writers_of.setdefault(network, []).append(index)
+    live: Set[int] = {
+        index for index, node in enumerate(nodes) if not isinstance(node, Operation)
+    }
+    stack = [network for network in kept]
+    stack.extend(network for index in live for network in nodes[index].inputs())
+    visited: Set[Network] = set()
+    while stack:
+        network = stack.pop()
+        if network in visited:
+            continue
+        visited.add(network)
+        for index in writers_of.get(network, []):
+            if index not in live:
+                live.add(index)
+                stack.extend(nodes[index].inputs())
+    dead = len(nodes) - len(live)
+
+    result = _rebuild(
+        [node for index, node in enumerate(nodes) if index in live],
+        outputs,
+        {key: value for key, value in inputs.items() if key[0] in visited},
+        {key: value for key, value in constants.items() if key[0] in visited},
+        simulator.compact_edges,
+    )
+    return result, OptimizationReport(
+        len(simulator.nodes), len(result.nodes), folded, identity_count, dead
+    )
+
+
+def merge_duplicates(
+    simulator: Simulator, max_outputs: Optional[int] = None
+) -> Tuple[Simulator, int]:
+    """
+    Builds a simulator in which operations computing the same value from the same
+    networks are merged into one operation writing into all of their networks. Since
+    networks add up what is written into them, duplicates writing into the same network
+    are not merged. max_outputs limits the networks of a merged operation, e.g. to the
+    two wire colors of an exported combinator. Returns the number of merged operations.
+    Like optimize, it takes a simulator that hasn't run yet and shares its design.
+    """
+    if simulator.tick_count:
+        raise ValueError("Only simulators that haven't run yet can be merged")
+    outputs: Dict[int, List[Network]] = {
+        id(node): list(dict.fromkeys(simulator.outputs(node)))
+        for node in simulator.nodes
+    }
+    groups: Dict[Hashable, List[Operation]] = {}
+    nodes: List[ASTNode] = []
+    merged = 0
+    for node in simulator.nodes:
+        if not isinstance(node, Operation):
+            nodes.append(node)
+            continue
+        targets = outputs[id(node)]
+        group = groups.setdefault(structural_key(node), [])
+        for candidate in group:
+            existing = outputs[id(candidate)]
+            if any(network in existing for network in targets):
+                continue
+            if max_outputs is not None and len(existing) + len(targets) > max_outputs:
+                continue
+            existing.extend(targets)
+            merged += 1
+            break
+        else:
+            group.append(node)
+            nodes.append(node)
+    return (
+        _rebuild(
+            nodes,
+            outputs,
+            simulator.inputs,
+            simulator.constant_inputs,
+            simulator.compact_edges,
+        ),
+        merged,
+    )
+
+
+def _rebuild(
+    nodes: List[ASTNode],
+    outputs: Dict[int, List[Network]],
+    inputs: Dict[Tuple[Network, Signal], int],
+    constants: Dict[Tuple[Network, Signal], int],
+    compact_edges: bool,
+) -> Simulator:
+    # drop the registrations of the old design, the new simulator adds its own
+    for node in nodes:
+        for network in node.inputs() + outputs[id(node)]:
+            network.use_edges(None)
+    result = Simulator(compact_edges)
+    for node in nodes:
+        result.add(node, *outputs[id(node)])
+    for (network, signal), value in inputs.items():
+        result.set_input(network, signal, value)
+    for (network, signal), value in constants.items():
+        result.add_constant_input(network, signal, value)
+    return result
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from typing import List, NamedTuple, Optional, TextIO, TYPE_CHECKING
+
+from .ASTNode import ASTNode
+
+if TYPE_CHECKING:
+    from .Simulator import Simulator
+
+
+class NodeCost(NamedTuple):
+    node: ASTNode
+    position: int
+    evaluations: int
+    # nanoseconds spent in output
+    time: int
+
+
+class Profiler:
+    """
+    Collects the cost of a simulation: evaluations and evaluation time per node, value
+    updates, latching time and active signals per network and the wall time of every
+    tick. The simulator's tick checks once per step whether a profiler is attached and
+    only takes timings if one is, so simulators without a profiler barely pay for it.
+    """
+
+    def __init__(self, simulator: Simulator):
+        self.simulator: Simulator = simulator
+        self.evaluations: List[int] = []
+        self.evaluation_time: List[int] = []
+        self.updates: List[int] = []
+        self.update_time: List[int] = []
+        self.latch_time: List[int] = []
+        self.active_signals: List[int] = []
+        self.peak_active_signals: List[int] = []
+        self.ticks: int = 0
+        self.tick_time: int = 0
+        self.max_tick_time: int = 0
+        simulator.profiler = self
+
+    def detach(self) -> None:
+        if self.simulator.profiler is self:
+            self.simulator.profiler = None
+
+    def resize(self) -> None:
+        """
+        Makes room for nodes and networks added since the last tick
+        """
+        nodes = len(self.simulator.nodes) - len(self.evaluations)
+        if nodes > 0:
+            self.evaluations.extend([0] * nodes)
+            self.evaluation_time.extend([0] * nodes)
+        networks = len(self.simulator.networks) - len(self.updates)
+        if networks > 0:
+            for counters in (
+                self.updates,
+                self.update_time,
+                self.latch_time,
+                self.active_signals,
+                self.peak_active_signals,
+            ):
+                counters.extend([0] * networks)
+
+    def reset(self) -> None:
+        self.evaluations, self.evaluation_time = [], []
+        self.updates, self.update_time, self.latch_time = [], [], []
+        self.active_signals, self.peak_active_signals = [], []
+        self.ticks = self.tick_time = self.max_tick_time = 0
+
+    def hot_nodes(self, limit: Optional[int] = None) -> List[NodeCost]:
+        """
+        The nodes sorted by the time spent evaluating them, most expensive first
+        """
+        costs = sorted(
+            (
+                NodeCost(self.simulator.nodes[position], position, evaluations, time)
+                for position, (evaluations, time) in enumerate(
+                    zip(self.evaluations, self.evaluation_time)
+                )
+                if evaluations
+            ),
+            key=lambda cost: (-cost.time, -cost.evaluations, cost.position),
+        )
+        return costs[:limit]
+
+    def report(self, limit: int = 20) -> str:
+        total = sum(self.evaluation_time) or 1
+        lines = [
+            f"{self.ticks} ticks, {self.tick_time / 1e6:.3f} ms total, "
+            f"{self.max_tick_time / 1e6:.3f} ms slowest",
+            f"{'node':>6} {'evaluations':>12} {'ms':>10} {'share':>6}  description",
+        ]
+        for cost in self.hot_nodes(limit):
+            lines.append(
+                f"{cost.position:>6} {cost.evaluations:>12} {cost.time / 1e6:>10.3f} "
+                f"{cost.time / total:>6.1%}  {cost.node!r}"
+            )
+        return "\n".join(lines)
+
+    def write_flamegraph(self, output: TextIO) -> None:
+        """
+        Writes the collected times in nanoseconds in the collapsed stack format read by
+        flamegraph.pl, speedscope and similar tools
+        """
+        for position, time in enumerate(self.evaluation_time):
+            if time:
+                node = self.simulator.nodes[position]
+                output.write(f"tick;evaluate;{node.name} #{position} {time}\n")
+        for position, time in enumerate(self.update_time):
+            if time:
+                output.write(f"tick;update;network #{position} {time}\n")
+        for position, time in enumerate(self.latch_time):
+            if time:
+                output.write(f"tick;latch;network #{position} {time}\n")
+        accounted = (
+            sum(self.evaluation_time) + sum(self.update_time) + sum(self.latch_time)
+        )
+        if self.tick_time > accounted:
+            output.write(f"tick {self.tick_time - accounted}\n")
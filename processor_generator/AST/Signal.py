@@ -1,7 +1,12 @@
 from enum import Enum
 
+from typing import List
+
 
 class Signal(Enum):
+    # dense position of the signal, used to index network state arrays
+    index: int
+
     ROCKET_FUEL: str = "rocket-fuel"
     ADVANCED_CIRCUIT: str = "advanced-circuit"
     SULFURIC_ACID_BARREL: str = "sulfuric-acid-barrel"
@@ -261,3 +266,10 @@ class Signal(Enum):
     SIGNAL_RED: str = "signal-red"
     SIGNAL_C: str = "signal-C"
     SIGNAL_E: str = "signal-E"
+
+
+SIGNALS: List[Signal] = list(Signal)
+SIGNAL_COUNT: int = len(SIGNALS)
+
+for _index, _signal in enumerate(SIGNALS):
+    _signal.index = _index
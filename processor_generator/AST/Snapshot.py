@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from .ASTNode import Signals
+from .Signal import Signal, SIGNALS, SIGNAL_COUNT
+
+# network index, signal -> value
+IndexedInputs = Dict[Tuple[int, Signal], int]
+StateArray = npt.NDArray[np.int32]
+
+# delta snapshots referencing more bases than this are stored in full instead
+MAX_DEPTH: int = 16
+
+
+class Snapshot:
+    """
+    The complete state of a Simulator: the previous and current state of every network,
+    the cached node outputs and the external inputs. Network state is stored in arrays
+    with one row per network. A snapshot can store only the rows that changed since a
+    base snapshot, which makes taking snapshots of mostly idle designs cheap.
+    """
+
+    def __init__(
+        self,
+        tick_count: int,
+        networks: int,
+        rows: npt.NDArray[np.intp],
+        previous: StateArray,
+        current: StateArray,
+        outputs: List[Signals],
+        pending: Set[int],
+        inputs: IndexedInputs,
+        pending_inputs: Dict[int, Signals],
+        base: Optional[Snapshot] = None,
+    ):
+        self.tick_count: int = tick_count
+        self.networks: int = networks
+        self.rows: npt.NDArray[np.intp] = rows
+        self.previous: StateArray = previous
+        self.current: StateArray = current
+        self.outputs: List[Signals] = outputs
+        self.pending: Set[int] = pending
+        self.inputs: IndexedInputs = inputs
+        self.pending_inputs: Dict[int, Signals] = pending_inputs
+        self.base: Optional[Snapshot] = base
+        self.depth: int = base.depth + 1 if base else 0
+        self._positions: Dict[int, int] = {
+            row: position for position, row in enumerate(rows.tolist())
+        }
+
+    def row(self, network: int) -> Tuple[StateArray, StateArray]:
+        """
+        The previous and current state of a single network
+        """
+        snapshot: Optional[Snapshot] = self
+        while snapshot is not None:
+            position = snapshot._positions.get(network)
+            if position is not None:
+                return snapshot.previous[position], snapshot.current[position]
+            snapshot = snapshot.base
+        raise IndexError(f"Snapshot has no state for network {network}")
+
+    def resolve(self) -> Tuple[StateArray, StateArray]:
+        """
+        The previous and current state of all networks, following the base snapshots
+        """
+        if self.base is None and len(self.rows) == self.networks:
+            return self.previous, self.current
+        if self.base is None:
+            raise IndexError("Snapshot without base does not cover all networks")
+        previous, current = self.base.resolve()
+        previous, current = previous.copy(), current.copy()
+        previous[self.rows] = self.previous
+        current[self.rows] = self.current
+        return previous, current
+
+    def flatten(self) -> Snapshot:
+        """
+        An equivalent snapshot that does not depend on base snapshots
+        """
+        previous, current = self.resolve()
+        return Snapshot(
+            self.tick_count,
+            self.networks,
+            np.arange(self.networks, dtype=np.intp),
+            previous,
+            current,
+            self.outputs,
+            self.pending,
+            self.inputs,
+            self.pending_inputs,
+        )
+
+    def save(self, directory: Union[str, Path]) -> None:
+        """
+        Stores the snapshot as .npy files, so it can be loaded memory mapped
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        previous, current = self.resolve()
+        np.save(path / "previous.npy", previous)
+        np.save(path / "current.npy", current)
+        np.save(
+            path / "outputs.npy",
+            _entries(
+                (node, signal, value)
+                for node, output in enumerate(self.outputs)
+                for signal, value in output.items()
+            ),
+        )
+        np.save(
+            path / "inputs.npy",
+            _entries(
+                (network, signal, value)
+                for (network, signal), value in self.inputs.items()
+            ),
+        )
+        np.save(
+            path / "pending_inputs.npy",
+            _entries(
+                (network, signal, value)
+                for network, delta in self.pending_inputs.items()
+                for signal, value in delta.items()
+            ),
+        )
+        np.save(path / "pending.npy", np.array(sorted(self.pending), dtype=np.int64))
+        (path / "snapshot.json").write_text(
+            json.dumps(
+                {
+                    "tick_count": self.tick_count,
+                    "networks": self.networks,
+                    "nodes": len(self.outputs),
+                    "signals": SIGNAL_COUNT,
+                }
+            )
+        )
+
+    @staticmethod
+    def load(directory: Union[str, Path]) -> Snapshot:
+        path = Path(directory)
+        meta = json.loads((path / "snapshot.json").read_text())
+        if meta["signals"] != SIGNAL_COUNT:
+            raise ValueError("Snapshot was saved with a different set of signals")
+        outputs: List[Signals] = [{} for _ in range(meta["nodes"])]
+        for node, signal, value in np.load(path / "outputs.npy").tolist():
+            outputs[node][SIGNALS[signal]] = value
+        inputs: IndexedInputs = {
+            (network, SIGNALS[signal]): value
+            for network, signal, value in np.load(path / "inputs.npy").tolist()
+        }
+        pending_inputs: Dict[int, Signals] = {}
+        for network, signal, value in np.load(path / "pending_inputs.npy").tolist():
+            pending_inputs.setdefault(network, {})[SIGNALS[signal]] = value
+        return Snapshot(
+            meta["tick_count"],
+            meta["networks"],
+            np.arange(meta["networks"], dtype=np.intp),
+            np.load(path / "previous.npy", mmap_mode="r"),
+            np.load(path / "current.npy", mmap_mode="r"),
+            outputs,
+            set(np.load(path / "pending.npy").tolist()),
+            inputs,
+            pending_inputs,
+        )
+
+
+def _entries(entries: Iterable[Tuple[int, Signal, int]]) -> npt.NDArray[np.int64]:
+    return np.array(
+        [(first, signal.index, value) for first, signal, value in entries],
+        dtype=np.int64,
+    ).reshape(-1, 3)
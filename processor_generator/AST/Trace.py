@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+import numpy.typing as npt
+
+from .Network import Network
+from .Signal import Signal
+
+MAGIC: bytes = b"PGTRACE1"
+# length of the json index, stored right before the closing magic
+FOOTER = struct.Struct("<Q")
+
+Probe = Tuple[Network, Signal]
+# offset, entries, first time, last time, compressed sizes of keyframe, times,
+# probes and values
+ChunkEntry = Tuple[int, int, int, int, int, int, int, int]
+
+
+class TraceWindow(NamedTuple):
+    # value of every probe at the start of the window
+    initial: npt.NDArray[np.int32]
+    times: npt.NDArray[np.int64]
+    probes: npt.NDArray[np.int32]
+    values: npt.NDArray[np.int32]
+
+
+class TraceRecorder:
+    """
+    Records the values of selected signals on selected networks into a file. Only
+    changes are recorded, buffered in chunks of a fixed number of entries, and every
+    full chunk is compressed and appended to the file, so memory stays bounded however
+    long the run is. Every chunk starts with the values of all probes, so a Trace can
+    decode any chunk on its own.
+
+    Values are recorded when a network ticks. The clock returns the number of finished
+    ticks, e.g. Simulator.tick_count, and a value is recorded at the tick in which it
+    becomes visible. Values loaded into networks without ticking are not recorded.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        probes: Sequence[Probe],
+        clock: Callable[[], int],
+        names: Optional[Sequence[str]] = None,
+        chunk_size: int = 1 << 16,
+    ):
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size has to be at least 1, got {chunk_size}")
+        if names is not None and len(names) != len(probes):
+            raise ValueError(f"Got {len(names)} names for {len(probes)} probes")
+        self.probes: List[Probe] = list(probes)
+        self.clock: Callable[[], int] = clock
+        self.chunk_size: int = chunk_size
+        self._watched: Dict[Network, List[Tuple[int, int]]] = {}
+        for probe, (network, signal) in enumerate(self.probes):
+            self._watched.setdefault(network, []).append((probe, signal.index))
+        if names is None:
+            networks = list(self._watched)
+            names = [
+                f"network{networks.index(network)}.{signal.value}"
+                for network, signal in self.probes
+            ]
+        self.names: List[str] = list(names)
+        self.start: int = clock()
+        self._last: "array[int]" = array(
+            "i", [network.get_signal_value(signal) for network, signal in self.probes]
+        )
+        self._initial: List[int] = list(self._last)
+        self._keyframe: "array[int]" = array("i", self._last)
+        self._times: "array[int]" = array("q")
+        self._probe_column: "array[int]" = array("i")
+        self._values: "array[int]" = array("i")
+        self._chunks: List[ChunkEntry] = []
+        self._file: Optional[BinaryIO] = open(path, "wb")
+        self._file.write(MAGIC)
+        for network in self._watched:
+            network.add_tick_hook(self._record)
+
+    def __enter__(self) -> TraceRecorder:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def _record(self, network: Network) -> None:
+        time = self.clock() + 1
+        state = network._previous
+        last = self._last
+        for probe, index in self._watched[network]:
+            value = state[index]
+            if value != last[probe]:
+                last[probe] = value
+                self._times.append(time)
+                self._probe_column.append(probe)
+                self._values.append(value)
+        if len(self._times) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the buffered changes as a chunk
+        """
+        if self._file is None:
+            raise ValueError("Trace recorder is closed")
+        if not self._times:
+            return
+        times = np.frombuffer(self._times, dtype=np.int64)
+        blobs = [
+            zlib.compress(column.tobytes())
+            for column in (
+                np.frombuffer(self._keyframe, dtype=np.int32),
+                # times never decrease, so their differences compress well
+                np.diff(times, prepend=times[0]),
+                np.frombuffer(self._probe_column, dtype=np.int32),
+                np.frombuffer(self._values, dtype=np.int32),
+            )
+        ]
+        offset = self._file.tell()
+        for blob in blobs:
+            self._file.write(blob)
+        keyframe, differences, probes, values = (len(blob) for blob in blobs)
+        self._chunks.append(
+            (
+                offset,
+                len(times),
+                int(times[0]),
+                int(times[-1]),
+                keyframe,
+                differences,
+                probes,
+                values,
+            )
+        )
+        self._keyframe = array("i", self._last)
+        self._times = array("q")
+        self._probe_column = array("i")
+        self._values = array("i")
+
+    def close(self) -> None:
+        """
+        Writes the remaining changes and the index and stops recording
+        """
+        if self._file is None:
+            return
+        self.flush()
+        for network in self._watched:
+            network.remove_tick_hook(self._record)
+        index = json.dumps(
+            {
+                "names": self.names,
+                "start": self.start,
+                "end": self.clock(),
+                "initial": self._initial,
+                "chunks": self._chunks,
+            }
+        ).encode()
+        self._file.write(index)
+        self._file.write(FOOTER.pack(len(index)))
+        self._file.write(MAGIC)
+        self._file.close()
+        self._file = None
+
+
+class Trace:
+    """
+    Reads a file written by a TraceRecorder. Only the index is read when opening, chunks
+    are read and decompressed when a query needs them.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path: Path = Path(path)
+        with open(self.path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a trace file")
+            file.seek(-(FOOTER.size + len(MAGIC)), 2)
+            (length,) = FOOTER.unpack(file.read(FOOTER.size))
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(
+                    f"{self.path} is incomplete, the recorder was not closed"
+                )
+            file.seek(-(length + FOOTER.size + len(MAGIC)), 2)
+            index = json.loads(file.read(length))
+        self.names: List[str] = index["names"]
+        self.start: int = index["start"]
+        self.end: int = index["end"]
+        self._chunks: List[ChunkEntry] = [tuple(chunk) for chunk in index["chunks"]]
+        self._firsts: List[int] = [chunk[2] for chunk in self._chunks]
+        self._initial: npt.NDArray[np.int32] = np.array(
+            index["initial"], dtype=np.int32
+        )
+
+    def __len__(self) -> int:
+        """
+        The number of recorded changes
+        """
+        return sum(chunk[1] for chunk in self._chunks)
+
+    def _read_chunk(self, file: BinaryIO, chunk: int) -> TraceWindow:
+        offset, _, first, _, *sizes = self._chunks[chunk]
+        file.seek(offset)
+        keyframe, times, probes, values = (
+            zlib.decompress(file.read(size)) for size in sizes
+        )
+        return TraceWindow(
+            np.frombuffer(keyframe, dtype=np.int32),
+            np.cumsum(np.frombuffer(times, dtype=np.int64)) + first,
+            np.frombuffer(probes, dtype=np.int32),
+            np.frombuffer(values, dtype=np.int32),
+        )
+
+    def windows(
+        self, start: Optional[int] = None, stop: Optional[int] = None
+    ) -> Iterator[TraceWindow]:
+        """
+        The changes with start < time < stop, one window per chunk, each with the values
+        of all probes right before its first change. The first window is found by a
+        binary search over the chunk index and later chunks are read as needed.
+        """
+        start = self.start if start is None else start
+        stop = self.end + 1 if stop is None else stop
+        if not self._chunks:
+            yield TraceWindow(
+                self._initial.copy(),
+                np.zeros(0, dtype=np.int64),
+                np.zeros(0, dtype=np.int32),
+                np.zeros(0, dtype=np.int32),
+            )
+            return
+        chunk = max(bisect_right(self._firsts, start) - 1, 0)
+        with open(self.path, "rb") as file:
+            first = True
+            while chunk < len(self._chunks) and (first or self._firsts[chunk] < stop):
+                window = self._read_chunk(file, chunk)
+                initial = window.initial.copy()
+                if first:
+                    # bring the keyframe forward to the start of the range
+                    skip = int(np.searchsorted(window.times, start, side="right"))
+                    initial[window.probes[:skip]] = window.values[:skip]
+                else:
+                    skip = 0
+                end = int(np.searchsorted(window.times, stop, side="left"))
+                yield TraceWindow(
+                    initial,
+                    window.times[skip:end],
+                    window.probes[skip:end],
+                    window.values[skip:end],
+                )
+                first = False
+                chunk += 1
+
+    def query(
+        self, start: Optional[int] = None, stop: Optional[int] = None
+    ) -> TraceWindow:
+        """
+        The values of all probes at start and every change with start < time < stop
+        """
+        windows = list(self.windows(start, stop))
+        return TraceWindow(
+            windows[0].initial,
+            np.concatenate([window.times for window in windows]),
+            np.concatenate([window.probes for window in windows]),
+            np.concatenate([window.values for window in windows]),
+        )
+
+    def value(self, name: str, time: int) -> int:
+        """
+        The value of a probe at the given tick
+        """
+        window = next(self.windows(time, time))
+        return int(window.initial[self.names.index(name)])
+
+    def write_vcd(
+        self,
+        output: TextIO,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        timescale: str = "1 ns",
+    ) -> None:
+        """
+        Writes the trace as a value change dump, which is understood by waveform viewers
+        like GTKWave. Every probe is a 32 bit integer variable and one tick is one unit
+        of the timescale.
+        """
+        codes = [_vcd_code(probe) for probe in range(len(self.names))]
+        output.write("$version processor_generator $end\n")
+        output.write(f"$timescale {timescale} $end\n")
+        output.write("$scope module trace $end\n")
+        for code, name in zip(codes, self.names):
+            output.write(f"$var integer 32 {code} {name.replace(' ', '_')} $end\n")
+        output.write("$upscope $end\n$enddefinitions $end\n")
+        current_time: Optional[int] = None
+        for window in self.windows(start, stop):
+            if current_time is None:
+                current_time = self.start if start is None else start
+                output.write(f"#{current_time}\n$dumpvars\n")
+                for code, value in zip(codes, window.initial.tolist()):
+                    output.write(f"b{value & 0xFFFFFFFF:b} {code}\n")
+                output.write("$end\n")
+            for time, probe, value in zip(
+                window.times.tolist(), window.probes.tolist(), window.values.tolist()
+            ):
+                if time != current_time:
+                    current_time = time
+                    output.write(f"#{time}\n")
+                output.write(f"b{value & 0xFFFFFFFF:b} {codes[probe]}\n")
+
+
+def _vcd_code(number: int) -> str:
+    # identifiers are made of the printable ascii characters
+    code = ""
+    while True:
+        number, digit = divmod(number, 94)
+        code += chr(33 + digit)
+        if not number:
+            return code
+        number -= 1
@@ -0,0 +1,11 @@
+INT32_MIN: int = -(2**31)
+INT32_MAX: int = 2**31 - 1
+INT32_OFFSET: int = 2**31
+INT32_MASK: int = 2**32 - 1
+
+
+def wrap(value: int) -> int:
+    """
+    Wraps an arbitrary integer around to the signed 32 bit range, like factorio does
+    """
+    return ((value + INT32_OFFSET) & INT32_MASK) - INT32_OFFSET
@@ -0,0 +1,90 @@
+import pickle
+import traceback
+from concurrent.futures import ProcessPoolExecutor, Future, as_completed
+
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# (design, case) -> result, has to be picklable, so defined at module level
+CaseFunction = Callable[[Any, Any], Any]
+
+
+class CaseResult(NamedTuple):
+    position: int
+    value: Any
+    error: Optional[str]
+
+
+# state of a worker process, set once by _initialize
+_design: Any = None
+_function: Optional[CaseFunction] = None
+
+
+def _initialize(payload: bytes) -> None:
+    global _design, _function
+    _design, _function = pickle.loads(payload)
+
+
+def _run_chunk(chunk: List[Tuple[int, Any]]) -> List[CaseResult]:
+    assert _function is not None
+    return [_run_case(_function, _design, index, case) for index, case in chunk]
+
+
+def _run_case(function: CaseFunction, design: Any, index: int, case: Any) -> CaseResult:
+    try:
+        return CaseResult(index, function(design, case), None)
+    except Exception:
+        return CaseResult(index, None, traceback.format_exc())
+
+
+class Runner:
+    """
+    Runs independent test cases against a design in a process pool. The design, e.g.
+    an InstructionSet or a compiled Kernel, is pickled once and sent to each worker
+    when it starts, so only the cases and results travel per task. Each worker shares
+    its copy of the design between cases, so functions must not leave it modified.
+    """
+
+    def __init__(
+        self,
+        design: Any,
+        function: CaseFunction,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 1,
+    ):
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size has to be at least 1, got {chunk_size}")
+        self.design: Any = design
+        self.function: CaseFunction = function
+        self.max_workers: Optional[int] = max_workers
+        self.chunk_size: int = chunk_size
+
+    def run(self, cases: Sequence[Any]) -> Iterator[CaseResult]:
+        """
+        Yields the result of every case as soon as it is finished. Exceptions raised by
+        a case are reported in its result instead of stopping the run.
+        """
+        payload = pickle.dumps((self.design, self.function), pickle.HIGHEST_PROTOCOL)
+        with ProcessPoolExecutor(
+            self.max_workers, initializer=_initialize, initargs=(payload,)
+        ) as executor:
+            futures: List[Future[List[CaseResult]]] = [
+                executor.submit(
+                    _run_chunk,
+                    [
+                        (index, cases[index])
+                        for index in range(
+                            start, min(start + self.chunk_size, len(cases))
+                        )
+                    ],
+                )
+                for start in range(0, len(cases), self.chunk_size)
+            ]
+            for future in as_completed(futures):
+                yield from future.result()
+
+    def run_serial(self, cases: Sequence[Any]) -> Iterator[CaseResult]:
+        """
+        Runs all cases in this process, mostly useful for debugging
+        """
+        for index, case in enumerate(cases):
+            yield _run_case(self.function, self.design, index, case)
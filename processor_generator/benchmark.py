@@ -0,0 +1,437 @@
+"""
+Benchmarks for the hot paths of the package, on synthetic instruction sets and
+designs. Results can be stored as a baseline and compared against later runs:
+
+    python -m processor_generator.benchmark run --output baseline.json
+    python -m processor_generator.benchmark compare baseline.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .AST.Decision import Decision, Comparator, Wildcard
+from .AST.Kernel import Kernel
+from .AST.Network import Network
+from .AST.Operand import Operand, SignalOperand, ConstantOperand
+from .AST.Operation import Operation, NumericOperator
+from .AST.Signal import SIGNALS
+from .AST.Simulator import Simulator
+from .blueprint.Exporter import Exporter
+from .instruction.Emulator import Emulator
+from .instruction.Instruction import Instruction
+from .instruction.InstructionParameter import InstructionParameter
+from .instruction.InstructionSet import InstructionSet
+
+BASELINE_VERSION: int = 1
+ARCHITECTURES: List[str] = ["8bit", "16bit", "32bit", "64bit"]
+DESIGN_SIZES: List[int] = [1_000, 10_000, 100_000]
+# operators of the synthetic designs, the expensive ones are rare in real designs
+DESIGN_OPERATORS: List[NumericOperator] = [
+    NumericOperator.ADD,
+    NumericOperator.SUBTRACT,
+    NumericOperator.MULTIPLY,
+    NumericOperator.DIVIDE,
+    NumericOperator.AND,
+    NumericOperator.OR,
+    NumericOperator.XOR,
+    NumericOperator.RIGHT_BIT_SHIFT,
+]
+OPCODE_BITS: int = 4
+
+
+class Result(NamedTuple):
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+class Regression(NamedTuple):
+    name: str
+    baseline: float
+    current: float
+    # relative change, negative when worse
+    change: float
+
+
+def synthetic_instruction_set(architecture: str) -> InstructionSet:
+    """
+    One instruction per value of a four bit opcode in the highest bits. The remaining
+    bits are split into three parameters, the last one made of two ranges.
+    """
+    width = int(architecture[: -len("bit")])
+    field = (width - OPCODE_BITS) // 3
+    top = width - OPCODE_BITS - 1
+    sources = [
+        f"0-{field - 1}",
+        f"{field}-{2 * field - 1}",
+        f"{top}-{top},{2 * field}-{top - 1}",
+    ]
+    return InstructionSet(
+        [
+            Instruction(
+                f"OP{opcode}",
+                None,
+                [
+                    InstructionParameter(name, source)
+                    for name, source in zip("abc", sources)
+                ],
+                architecture,
+                f"{opcode:0{OPCODE_BITS}b}".replace("0", "#").replace("1", "+")
+                + f",0-{top}",
+            )
+            for opcode in range(1 << OPCODE_BITS)
+        ]
+    )
+
+
+def synthetic_words(
+    instructions: InstructionSet, count: int, seed: int = 0
+) -> np.ndarray:
+    width = next(iter(instructions)).width
+    generator = np.random.default_rng(seed)
+    words = generator.integers(0, 1 << 63, count, dtype=np.uint64, endpoint=True)
+    if width < 64:
+        words &= np.uint64((1 << width) - 1)
+    return words
+
+
+def synthetic_design(
+    nodes: int, seed: int = 0, compact_edges: bool = False
+) -> Simulator:
+    """
+    Random operations between networks, with about ten nodes writing into each
+    network. Feedback loops keep most of the design busy every tick.
+    """
+    generator = random.Random(seed)
+    networks = [Network() for _ in range(max(nodes // 10, 1))]
+    signals = SIGNALS[:8]
+
+    def operand() -> Operand:
+        if generator.random() < 0.3:
+            return ConstantOperand.shared(generator.randint(1, 100))
+        return SignalOperand(generator.choice(networks), generator.choice(signals))
+
+    simulator = Simulator(compact_edges)
+    for _ in range(nodes):
+        simulator.add(
+            Operation(
+                generator.choice(DESIGN_OPERATORS),
+                SignalOperand(generator.choice(networks), generator.choice(signals)),
+                operand(),
+                generator.choice(signals),
+            ),
+            generator.choice(networks),
+        )
+    for network in networks[:: max(len(networks) // 10, 1)]:
+        simulator.set_input(network, signals[0], generator.randint(1, 100))
+    return simulator
+
+
+def exportable_design(nodes: int, seed: int = 0) -> Simulator:
+    """
+    A pipeline of stages of four operations, each reading the network before it and
+    writing into the network after it. Some also read the network they write into,
+    so every design can be wired with two colors.
+    """
+    generator = random.Random(seed)
+    networks = [Network() for _ in range(nodes // 4 + 2)]
+    signals = SIGNALS[:8]
+    simulator = Simulator()
+    for index in range(nodes):
+        source, target = networks[index // 4], networks[index // 4 + 1]
+        right: Operand = (
+            SignalOperand(target, generator.choice(signals))
+            if generator.random() < 0.5
+            else ConstantOperand.shared(generator.randint(1, 100))
+        )
+        simulator.add(
+            Operation(
+                generator.choice(DESIGN_OPERATORS),
+                SignalOperand(source, generator.choice(signals)),
+                right,
+                generator.choice(signals),
+            ),
+            target,
+        )
+    simulator.set_input(networks[0], signals[0], generator.randint(1, 100))
+    return simulator
+
+
+def rate(function: Callable[[], Any], work: int, min_time: float) -> float:
+    """
+    Calls the function until at least min_time has passed and returns the work done
+    per second
+    """
+    calls = 0
+    start = time.perf_counter()
+    while not calls or time.perf_counter() - start < min_time:
+        function()
+        calls += 1
+    return calls * work / (time.perf_counter() - start)
+
+
+def peak_memory(function: Callable[[], Any]) -> int:
+    """
+    The peak of memory allocated while calling the function, in bytes
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def instruction_benchmarks(
+    architecture: str, words: int, min_time: float
+) -> Dict[str, Result]:
+    instructions = synthetic_instruction_set(architecture)
+    program = synthetic_words(instructions, words)
+    instruction = instructions["OP5"]
+    parameter = instruction.parameters[2]
+    values = program.tolist()
+    columns = instruction.decode_many(program)
+
+    def decode() -> None:
+        decoder = instruction.parameters_for_instruction
+        for word in values:
+            decoder(word)
+
+    def value() -> None:
+        for word in values:
+            parameter.value(word)
+
+    # a loop of 64 distinct words, executed until the end of the image
+    emulator = Emulator(instructions, np.resize(program[:64], words))
+    for each in instructions:
+        emulator.register(each.name, lambda emulator, parameters: None)
+
+    def emulate() -> None:
+        emulator.pc = 0
+        emulator.run(words)
+
+    return {
+        f"instruction/{architecture}/parameter_value": Result(
+            rate(value, words, min_time), "words/s", True
+        ),
+        f"instruction/{architecture}/decode": Result(
+            rate(decode, words, min_time), "words/s", True
+        ),
+        f"instruction/{architecture}/emulate": Result(
+            rate(emulate, words, min_time), "instructions/s", True
+        ),
+        f"instruction/{architecture}/decode_many": Result(
+            rate(lambda: instruction.decode_many(program), words, min_time),
+            "words/s",
+            True,
+        ),
+        f"instruction/{architecture}/encode_many": Result(
+            rate(lambda: instruction.encode_many(**columns), words, min_time),
+            "words/s",
+            True,
+        ),
+        f"instruction/{architecture}/identify_many": Result(
+            rate(lambda: instructions.identify_many(program), words, min_time),
+            "words/s",
+            True,
+        ),
+    }
+
+
+def network_benchmarks(min_time: float) -> Dict[str, Result]:
+    network = Network()
+    signals = SIGNALS[:16]
+
+    def update() -> None:
+        for signal in signals:
+            network.update_value(signal, 1)
+
+    def tick() -> None:
+        update()
+        network.tick()
+
+    # a decider comparing each signal, on a network with few or all signals present
+    sparse, dense = Network(), Network()
+    for signal in SIGNALS[:4]:
+        sparse.update_value(signal, 1)
+    for signal in SIGNALS:
+        dense.update_value(signal, 1)
+    sparse.tick()
+    dense.tick()
+    each_sparse = Decision(
+        Comparator.GREATER, sparse, Wildcard.EACH, output_signal=Wildcard.EACH
+    ).output
+    each_dense = Decision(
+        Comparator.GREATER, dense, Wildcard.EACH, output_signal=Wildcard.EACH
+    ).output
+
+    return {
+        "network/update_value": Result(
+            rate(update, len(signals), min_time), "updates/s", True
+        ),
+        "network/tick": Result(rate(tick, 1, min_time), "ticks/s", True),
+        **{
+            f"network/each/{active}": Result(
+                rate(each, 1, min_time), "evaluations/s", True
+            )
+            for active, each in ((4, each_sparse), (len(SIGNALS), each_dense))
+        },
+    }
+
+
+def design_benchmarks(nodes: int, ticks: int, min_time: float) -> Dict[str, Result]:
+    simulator = synthetic_design(nodes)
+    kernel = Kernel(simulator)
+    exportable = exportable_design(nodes)
+    return {
+        f"design/{nodes}/memory": Result(
+            peak_memory(lambda: synthetic_design(nodes)), "bytes", False
+        ),
+        f"design/{nodes}/memory_compact": Result(
+            peak_memory(lambda: synthetic_design(nodes, compact_edges=True)),
+            "bytes",
+            False,
+        ),
+        f"design/{nodes}/simulator": Result(
+            rate(lambda: simulator.run(ticks), ticks, min_time),
+            "ticks/s",
+            True,
+        ),
+        f"design/{nodes}/kernel_compile": Result(
+            rate(lambda: Kernel(simulator), 1, min_time), "kernels/s", True
+        ),
+        f"design/{nodes}/kernel": Result(
+            rate(lambda: kernel.run(ticks), ticks, min_time), "ticks/s", True
+        ),
+        f"design/{nodes}/export": Result(
+            rate(lambda: Exporter(exportable).to_string(), nodes, min_time),
+            "combinators/s",
+            True,
+        ),
+    }
+
+
+def run_benchmarks(
+    architectures: Sequence[str] = ARCHITECTURES,
+    sizes: Sequence[int] = DESIGN_SIZES,
+    words: int = 100_000,
+    ticks: int = 10,
+    min_time: float = 0.5,
+    report: Optional[Callable[[str, Result], None]] = None,
+) -> Dict[str, Result]:
+    results: Dict[str, Result] = {}
+
+    def add(batch: Dict[str, Result]) -> None:
+        for name, result in batch.items():
+            results[name] = result
+            if report:
+                report(name, result)
+
+    for architecture in architectures:
+        add(instruction_benchmarks(architecture, words, min_time))
+    add(network_benchmarks(min_time))
+    for nodes in sizes:
+        add(design_benchmarks(nodes, ticks, min_time))
+    return results
+
+
+def to_obj(results: Dict[str, Result]) -> Dict[str, Any]:
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": {name: result._asdict() for name, result in results.items()},
+    }
+
+
+def from_obj(obj: Dict[str, Any]) -> Dict[str, Result]:
+    if obj.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline version {obj.get('version')}")
+    return {name: Result(**result) for name, result in obj["results"].items()}
+
+
+def compare(
+    baseline: Dict[str, Result], current: Dict[str, Result], threshold: float = 0.1
+) -> List[Regression]:
+    """
+    The benchmarks that got worse by more than threshold, relative to the baseline.
+    Benchmarks missing from either side are ignored.
+    """
+    regressions: List[Regression] = []
+    for name, old in baseline.items():
+        new = current.get(name)
+        if new is None or not old.value:
+            continue
+        change = (new.value - old.value) / old.value
+        if not old.higher_is_better:
+            change = -change
+        if change < -threshold:
+            regressions.append(Regression(name, old.value, new.value, change))
+    return regressions
+
+
+def _print_result(name: str, result: Result) -> None:
+    print(f"{name:<45} {result.value:>16,.1f} {result.unit}")
+
+
+def main(arguments: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m processor_generator.benchmark")
+    parser.add_argument(
+        "--quick", action="store_true", help="only the smallest design, shorter runs"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("--output", help="store the results as json")
+    check = commands.add_parser("compare", help="compare against a baseline")
+    check.add_argument("baseline", help="results stored by run --output")
+    check.add_argument(
+        "--current", help="compare stored results instead of running the benchmarks"
+    )
+    check.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown reported as regression, default 0.1",
+    )
+    options = parser.parse_args(arguments)
+    settings: Dict[str, Any] = (
+        {"sizes": DESIGN_SIZES[:1], "words": 10_000, "min_time": 0.1}
+        if options.quick
+        else {}
+    )
+
+    if options.command == "run":
+        results = run_benchmarks(report=_print_result, **settings)
+        if options.output:
+            with open(options.output, "w") as file:
+                json.dump(to_obj(results), file, indent=2)
+        return 0
+
+    with open(options.baseline) as file:
+        baseline = from_obj(json.load(file))
+    if options.current:
+        with open(options.current) as file:
+            current = from_obj(json.load(file))
+    else:
+        current = run_benchmarks(report=_print_result, **settings)
+    regressions = compare(baseline, current, options.threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.name}: {regression.baseline:,.1f} -> "
+            f"{regression.current:,.1f} ({regression.change:+.1%})"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
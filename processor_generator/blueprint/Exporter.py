@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import io
+import json
+import zlib
+from base64 import b64encode
+from collections import deque
+from functools import lru_cache
+
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, TextIO, Tuple
+
+from draftsman import DEFAULT_FACTORIO_VERSION
+from draftsman.constants import WireConnectorID
+from draftsman.data import entities, signals
+from draftsman.utils import encode_version
+
+from ..AST.ASTNode import Signals
+from ..AST.Network import Network
+from ..AST.Operand import Operand, SignalOperand, ConstantOperand
+from ..AST.Operation import Operation
+from ..AST.Signal import Signal
+from ..AST.Simulator import Simulator
+from ..AST.int32 import wrap
+from .SpatialGrid import SpatialGrid, Position
+
+ARITHMETIC_COMBINATOR: str = "arithmetic-combinator"
+CONSTANT_COMBINATOR: str = "constant-combinator"
+WIRE_REACH: float = min(
+    entities.raw[name]["circuit_wire_max_distance"]
+    for name in (ARITHMETIC_COMBINATOR, CONSTANT_COMBINATOR)
+)
+COLORS: Tuple[str, str] = ("red", "green")
+# side, color -> wire connector of a combinator
+CONNECTORS: Dict[Tuple[str, str], int] = {
+    ("input", "red"): WireConnectorID.COMBINATOR_INPUT_RED,
+    ("input", "green"): WireConnectorID.COMBINATOR_INPUT_GREEN,
+    ("output", "red"): WireConnectorID.COMBINATOR_OUTPUT_RED,
+    ("output", "green"): WireConnectorID.COMBINATOR_OUTPUT_GREEN,
+}
+# constant combinators only have an output, which uses the input connector ids
+CONSTANT_CONNECTORS: Dict[str, int] = {
+    "red": WireConnectorID.COMBINATOR_INPUT_RED,
+    "green": WireConnectorID.COMBINATOR_INPUT_GREEN,
+}
+
+# entity number, connector, entity number, connector
+Wire = Tuple[int, int, int, int]
+
+
+class Entity(NamedTuple):
+    # either an operation or the externally driven signals of a network
+    node: Optional[Operation]
+    signals: Signals
+    inputs: List[Network]
+    outputs: List[Network]
+    position: Position
+
+
+@lru_cache(maxsize=None)
+def signal_type(signal: Signal) -> str:
+    try:
+        return signals.get_signal_types(signal.value)[0]
+    except Exception:
+        raise ValueError(f"{signal} is not known to factorio-draftsman")
+
+
+def _signal_id(signal: Signal) -> Dict[str, str]:
+    return {"type": signal_type(signal), "name": signal.value}
+
+
+class Exporter:
+    """
+    Turns a design into a blueprint of arithmetic combinators, with constant combinators
+    for the signals driven from outside. Connected combinators are placed close to each
+    other in rows of alternating direction, and each network gets one wire color. The
+    wires of a network form a spanning tree, found with a spatial grid so checking the
+    wire reach only looks at entities in neighbouring cells. Networks that can't be
+    wired within reach are reported instead of being connected through poles.
+    """
+
+    def __init__(
+        self, simulator: Simulator, columns: int = 16, label: Optional[str] = None
+    ):
+        if columns < 1:
+            raise ValueError(f"A blueprint needs at least one column, got {columns}")
+        self.columns: int = columns
+        self.label: Optional[str] = label
+        self.entities: List[Entity] = self._place(self._collect(simulator))
+        self.colors: Dict[Network, str] = self._color()
+        self.wires: List[Wire] = self._wire()
+
+    @staticmethod
+    def _collect(simulator: Simulator) -> List[Entity]:
+        collected: List[Entity] = []
+        for node in simulator.nodes:
+            if not isinstance(node, Operation):
+                raise ValueError(f"{node!r} cannot be exported to a blueprint")
+            for operand in (node.left, node.right):
+                if isinstance(operand, SignalOperand) and operand.network is None:
+                    raise ValueError(f"{node!r} reads from a network that is gone")
+            outputs = list(dict.fromkeys(simulator.outputs(node)))
+            if len(outputs) > len(COLORS):
+                raise ValueError(
+                    f"{node!r} writes into {len(outputs)} networks, a combinator can "
+                    f"only write into {len(COLORS)}"
+                )
+            collected.append(Entity(node, {}, node.inputs(), outputs, (0, 0)))
+        driven: Dict[Network, Signals] = {}
+        for inputs in (simulator.inputs, simulator.constant_inputs):
+            for (network, signal), value in inputs.items():
+                values = driven.setdefault(network, {})
+                values[signal] = wrap(values.get(signal, 0) + value)
+        for network, values in driven.items():
+            values = {signal: value for signal, value in values.items() if value}
+            if values:
+                collected.append(Entity(None, values, [], [network], (0, 0)))
+        return collected
+
+    def _place(self, collected: List[Entity]) -> List[Entity]:
+        """
+        Orders the entities by a breadth first search over shared networks, so
+        connected entities end up in neighbouring slots
+        """
+        members: Dict[Network, List[int]] = {}
+        for index, entity in enumerate(collected):
+            for network in entity.inputs + entity.outputs:
+                members.setdefault(network, []).append(index)
+        order: List[int] = []
+        placed = [False] * len(collected)
+        expanded: Dict[Network, None] = {}
+        for start in range(len(collected)):
+            if placed[start]:
+                continue
+            placed[start] = True
+            queue: Deque[int] = deque([start])
+            while queue:
+                index = queue.popleft()
+                order.append(index)
+                entity = collected[index]
+                for network in entity.inputs + entity.outputs:
+                    if network in expanded:
+                        continue
+                    expanded[network] = None
+                    for neighbour in members[network]:
+                        if not placed[neighbour]:
+                            placed[neighbour] = True
+                            queue.append(neighbour)
+        result: List[Entity] = []
+        for slot, index in enumerate(order):
+            entity = collected[index]
+            row, column = divmod(slot, self.columns)
+            # rows alternate direction, so consecutive slots are always adjacent
+            if row % 2:
+                column = self.columns - 1 - column
+            # arithmetic combinators are two tiles high, facing north
+            height = 1.0 if entity.node is None else 2.0
+            position = (column + 0.5, row * 2 + height / 2)
+            result.append(entity._replace(position=position))
+        return result
+
+    def _color(self) -> Dict[Network, str]:
+        """
+        Networks read or written by the same side of a combinator need different
+        colors, so they are told apart. This is a two coloring of those conflicts.
+        """
+        conflicts: Dict[Network, List[Network]] = {}
+        for entity in self.entities:
+            for networks in (entity.inputs, entity.outputs):
+                for network in networks:
+                    conflicts.setdefault(network, [])
+                if len(networks) == 2:
+                    first, second = networks
+                    conflicts[first].append(second)
+                    conflicts[second].append(first)
+        colors: Dict[Network, str] = {}
+        for start in conflicts:
+            if start in colors:
+                continue
+            colors[start] = COLORS[0]
+            stack = [start]
+            while stack:
+                network = stack.pop()
+                other = COLORS[1] if colors[network] == COLORS[0] else COLORS[0]
+                for neighbour in conflicts[network]:
+                    if neighbour not in colors:
+                        colors[neighbour] = other
+                        stack.append(neighbour)
+                    elif colors[neighbour] != other:
+                        raise ValueError(
+                            "The networks can't be told apart with two wire colors"
+                        )
+        return colors
+
+    def _connector(self, index: int, side: str, network: Network) -> int:
+        if self.entities[index].node is None:
+            return CONSTANT_CONNECTORS[self.colors[network]]
+        return CONNECTORS[(side, self.colors[network])]
+
+    def _wire(self) -> List[Wire]:
+        members: Dict[Network, List[Tuple[int, str]]] = {}
+        for index, entity in enumerate(self.entities):
+            for network in entity.inputs:
+                members.setdefault(network, []).append((index, "input"))
+            for network in entity.outputs:
+                members.setdefault(network, []).append((index, "output"))
+        wires: List[Wire] = []
+        for number, (network, connectors) in enumerate(members.items()):
+            grid: SpatialGrid[Tuple[int, str]] = SpatialGrid(WIRE_REACH)
+            for connector in connectors[1:]:
+                grid.insert(connector, *self.entities[connector[0]].position)
+            queue: Deque[Tuple[int, str]] = deque([connectors[0]])
+            reached = 1
+            while queue:
+                index, side = queue.popleft()
+                position = self.entities[index].position
+                for neighbour, _ in list(grid.near(*position, WIRE_REACH)):
+                    grid.remove(neighbour, *self.entities[neighbour[0]].position)
+                    wires.append(
+                        (
+                            index + 1,
+                            self._connector(index, side, network),
+                            neighbour[0] + 1,
+                            self._connector(neighbour[0], neighbour[1], network),
+                        )
+                    )
+                    queue.append(neighbour)
+                    reached += 1
+            if reached != len(connectors):
+                raise ValueError(
+                    f"Network {number} connects entities that are further than "
+                    f"{WIRE_REACH} tiles apart"
+                )
+        return wires
+
+    def _operand(
+        self, operand: Operand, prefix: str, networks: List[Network]
+    ) -> Dict[str, Any]:
+        if isinstance(operand, ConstantOperand):
+            return {f"{prefix}_constant": wrap(operand.constant)}
+        assert isinstance(operand, SignalOperand)
+        result: Dict[str, Any] = {f"{prefix}_signal": _signal_id(operand.signal)}
+        if len(networks) == 2:
+            color = self.colors[operand.network]  # type: ignore[index]
+            result[f"{prefix}_signal_networks"] = {
+                name: name == color for name in COLORS
+            }
+        return result
+
+    def _entity(self, index: int) -> Dict[str, Any]:
+        entity = self.entities[index]
+        x, y = entity.position
+        result: Dict[str, Any] = {"entity_number": index + 1}
+        if entity.node is None:
+            result["name"] = CONSTANT_COMBINATOR
+            result["position"] = {"x": x, "y": y}
+            result["control_behavior"] = {
+                "sections": {
+                    "sections": [
+                        {
+                            "index": 1,
+                            "filters": [
+                                {
+                                    "index": position + 1,
+                                    **_signal_id(signal),
+                                    "quality": "normal",
+                                    "comparator": "=",
+                                    "count": value,
+                                }
+                                for position, (signal, value) in enumerate(
+                                    entity.signals.items()
+                                )
+                            ],
+                        }
+                    ]
+                }
+            }
+            return result
+        node = entity.node
+        conditions: Dict[str, Any] = {
+            **self._operand(node.left, "first", entity.inputs),
+            "operation": node.operation.value,
+            **self._operand(node.right, "second", entity.inputs),
+        }
+        if node.output_signal is not None:
+            conditions["output_signal"] = _signal_id(node.output_signal)
+        result["name"] = ARITHMETIC_COMBINATOR
+        result["position"] = {"x": x, "y": y}
+        result["control_behavior"] = {"arithmetic_conditions": conditions}
+        return result
+
+    def write(self, output: TextIO) -> None:
+        """
+        Writes the blueprint string. The json is compressed and encoded while it is
+        generated, one entity at a time, so the whole document never exists in memory.
+        """
+        compressor = zlib.compressobj(9)
+        pending = b""
+
+        def emit(text: str) -> None:
+            nonlocal pending
+            pending += compressor.compress(text.encode())
+            # base64 works on groups of three bytes
+            cut = len(pending) - len(pending) % 3
+            output.write(b64encode(pending[:cut]).decode())
+            pending = pending[cut:]
+
+        dump: Callable[[Any], str] = json.JSONEncoder(separators=(",", ":")).encode
+        output.write("0")
+        emit('{"blueprint":{"item":"blueprint",')
+        if self.label is not None:
+            emit(f'"label":{dump(self.label)},')
+        emit(f'"version":{encode_version(*DEFAULT_FACTORIO_VERSION)},"entities":[')
+        for index in range(len(self.entities)):
+            emit(("," if index else "") + dump(self._entity(index)))
+        emit('],"wires":[')
+        for index, wire in enumerate(self.wires):
+            emit(("," if index else "") + dump([int(value) for value in wire]))
+        emit("]}}")
+        pending += compressor.flush()
+        output.write(b64encode(pending).decode())
+
+    def to_string(self) -> str:
+        output = io.StringIO()
+        self.write(output)
+        return output.getvalue()
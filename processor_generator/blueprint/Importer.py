@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import zlib
+from base64 import b64decode
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..AST.Network import Network
+from ..AST.Operand import Operand, SignalOperand, ConstantOperand
+from ..AST.Operation import Operation, NumericOperator
+from ..AST.Signal import Signal
+from ..AST.Simulator import Simulator
+from ..AST.int32 import wrap
+from .Exporter import ARITHMETIC_COMBINATOR, CONSTANT_COMBINATOR, COLORS
+
+# entity number, connector id as used by the wires of factorio 2.0 blueprints
+Connector = Tuple[int, int]
+
+# circuit connectors of combinators, poles use the first two
+INPUT_CONNECTORS: Dict[str, int] = {"red": 1, "green": 2}
+OUTPUT_CONNECTORS: Dict[str, int] = {"red": 3, "green": 4}
+# higher ids are copper wires
+CIRCUIT_CONNECTORS: int = 4
+
+
+def decode_blueprint_string(string: str) -> Dict[str, Any]:
+    if not string.startswith("0"):
+        raise ValueError(f"Unsupported blueprint string version {string[:1]!r}")
+    try:
+        obj = json.loads(zlib.decompress(b64decode(string[1:])))
+    except (ValueError, zlib.error) as error:
+        raise ValueError(f"Invalid blueprint string: {error}")
+    if "blueprint" not in obj:
+        raise ValueError("Only single blueprints can be imported, not books")
+    blueprint: Dict[str, Any] = obj["blueprint"]
+    return blueprint
+
+
+def _signal(obj: Dict[str, Any]) -> Signal:
+    try:
+        return Signal(obj["name"])
+    except ValueError:
+        raise ValueError(f"Unsupported signal {obj['name']!r}")
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.ids: Dict[Connector, int] = {}
+        self.parents: List[int] = []
+
+    def id(self, connector: Connector) -> int:
+        index = self.ids.get(connector)
+        if index is None:
+            index = self.ids[connector] = len(self.parents)
+            self.parents.append(index)
+        return index
+
+    def find(self, index: int) -> int:
+        parents = self.parents
+        while parents[index] != index:
+            # path halving keeps the trees flat
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    def union(self, first: Connector, second: Connector) -> None:
+        first_root, second_root = self.find(self.id(first)), self.find(self.id(second))
+        if first_root != second_root:
+            self.parents[second_root] = first_root
+
+
+class Importer:
+    """
+    Builds a design from a blueprint. Arithmetic combinators become operations and
+    constant combinators become inputs of the simulator. Every set of connectors joined
+    by wires of one color, directly or through poles, becomes one network. The wire
+    graph is resolved with a union find, so importing takes linear time.
+
+    Operations read a single network per operand, so a combinator input connected to
+    both a red and a green network needs to select one color per operand.
+    """
+
+    def __init__(self, blueprint: Dict[str, Any]):
+        self.label: Optional[str] = blueprint.get("label")
+        self.simulator: Simulator = Simulator()
+        # entity number -> operation
+        self.nodes: Dict[int, Operation] = {}
+        entities: List[Dict[str, Any]] = blueprint.get("entities", [])
+        connectors = _UnionFind()
+        for first, first_id, second, second_id in blueprint.get("wires", []):
+            if first_id <= CIRCUIT_CONNECTORS and second_id <= CIRCUIT_CONNECTORS:
+                connectors.union((first, first_id), (second, second_id))
+        for entity in entities:
+            self._connect_legacy(connectors, entity)
+        self._connectors: _UnionFind = connectors
+        self._networks: Dict[int, Network] = {}
+        inputs: Dict[Tuple[Network, Signal], int] = {}
+        for entity in entities:
+            name = entity["name"]
+            if name == ARITHMETIC_COMBINATOR:
+                self._add_operation(entity)
+            elif name == CONSTANT_COMBINATOR:
+                self._add_constants(entity, inputs)
+            elif name.endswith("-combinator"):
+                raise ValueError(f"Unsupported combinator {name}")
+        for (network, signal), value in inputs.items():
+            self.simulator.set_input(network, signal, wrap(value))
+
+    @staticmethod
+    def from_string(string: str) -> Importer:
+        return Importer(decode_blueprint_string(string))
+
+    @property
+    def networks(self) -> List[Network]:
+        return list(self._networks.values())
+
+    @staticmethod
+    def _connect_legacy(connectors: _UnionFind, entity: Dict[str, Any]) -> None:
+        # blueprints before factorio 2.0 list the connections of every entity
+        number = entity["entity_number"]
+        for circuit, colors in entity.get("connections", {}).items():
+            if not circuit.isdigit():
+                # copper connections of power switches
+                continue
+            for color, targets in colors.items():
+                if color not in COLORS:
+                    continue
+                offset = (int(circuit) - 1) * 2
+                for target in targets:
+                    target_offset = (target.get("circuit_id", 1) - 1) * 2
+                    connectors.union(
+                        (number, offset + INPUT_CONNECTORS[color]),
+                        (target["entity_id"], target_offset + INPUT_CONNECTORS[color]),
+                    )
+
+    def _network(self, connector: Connector) -> Optional[Network]:
+        """
+        The network of a connector, or None if no wire is attached to it
+        """
+        index = self._connectors.ids.get(connector)
+        if index is None:
+            return None
+        root = self._connectors.find(index)
+        network = self._networks.get(root)
+        if network is None:
+            network = self._networks[root] = Network()
+        return network
+
+    def _operand(
+        self,
+        conditions: Dict[str, Any],
+        prefix: str,
+        wired: Dict[str, Network],
+        unwired: List[Network],
+    ) -> Operand:
+        signal = conditions.get(f"{prefix}_signal")
+        if signal is None:
+            return ConstantOperand(wrap(conditions.get(f"{prefix}_constant", 0)))
+        selected = conditions.get(f"{prefix}_signal_networks", {})
+        networks = [
+            network for color, network in wired.items() if selected.get(color, True)
+        ]
+        if len(networks) > 1:
+            raise ValueError(
+                f"{signal['name']} is read from a red and a green network, operands "
+                f"can only read one"
+            )
+        if not networks:
+            if not unwired:
+                unwired.append(Network())
+            networks = unwired
+        return SignalOperand(networks[0], _signal(signal))
+
+    def _add_operation(self, entity: Dict[str, Any]) -> None:
+        number = entity["entity_number"]
+        conditions = entity.get("control_behavior", {}).get("arithmetic_conditions", {})
+        # factorio 1.x allowed a single constant field for the second operand
+        if "constant" in conditions and "second_constant" not in conditions:
+            conditions = {**conditions, "second_constant": conditions["constant"]}
+        wired: Dict[str, Network] = {}
+        outputs: List[Network] = []
+        for color in COLORS:
+            if network := self._network((number, INPUT_CONNECTORS[color])):
+                wired[color] = network
+            if network := self._network((number, OUTPUT_CONNECTORS[color])):
+                if network not in outputs:
+                    outputs.append(network)
+        unwired: List[Network] = []
+        try:
+            operator = NumericOperator(conditions.get("operation", "*"))
+        except ValueError:
+            raise ValueError(f"Unsupported operation {conditions['operation']!r}")
+        output = conditions.get("output_signal")
+        node = Operation(
+            operator,
+            self._operand(conditions, "first", wired, unwired),
+            self._operand(conditions, "second", wired, unwired),
+            _signal(output) if output else None,
+        )
+        self.nodes[number] = node
+        self.simulator.add(node, *outputs)
+
+    def _add_constants(
+        self, entity: Dict[str, Any], inputs: Dict[Tuple[Network, Signal], int]
+    ) -> None:
+        number = entity["entity_number"]
+        behavior = entity.get("control_behavior", {})
+        if not behavior.get("is_on", True):
+            return
+        if "sections" in behavior:
+            filters = [
+                entry
+                for section in behavior["sections"].get("sections", [])
+                if section.get("active", True)
+                for entry in section.get("filters", [])
+            ]
+        else:
+            # factorio 1.x nests the signal
+            filters = [
+                {**entry["signal"], "count": entry["count"]}
+                for entry in behavior.get("filters", [])
+            ]
+        networks = [
+            network
+            for color in COLORS
+            if (network := self._network((number, INPUT_CONNECTORS[color])))
+        ]
+        for entry in filters:
+            signal = _signal(entry)
+            for network in networks:
+                inputs[(network, signal)] = (
+                    inputs.get((network, signal), 0) + entry["count"]
+                )
@@ -0,0 +1,54 @@
+from math import floor
+
+from typing import Dict, Generic, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+Position = Tuple[float, float]
+
+
+class SpatialGrid(Generic[T]):
+    """
+    Buckets items by position into square cells. With cells as large as the search
+    radius, all items within reach of a position are in the 3x3 cells around it, so a
+    lookup only depends on how crowded those cells are, not on the number of items.
+    """
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError(f"The cell size has to be positive, got {cell_size}")
+        self.cell_size: float = cell_size
+        self._cells: Dict[Tuple[int, int], List[Tuple[T, Position]]] = {}
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return floor(x / self.cell_size), floor(y / self.cell_size)
+
+    def insert(self, item: T, x: float, y: float) -> None:
+        self._cells.setdefault(self._cell(x, y), []).append((item, (x, y)))
+
+    def remove(self, item: T, x: float, y: float) -> None:
+        cell = self._cells[self._cell(x, y)]
+        cell.remove((item, (x, y)))
+
+    def near(self, x: float, y: float, radius: float) -> Iterator[Tuple[T, float]]:
+        """
+        The items within radius of the position, together with their squared distance.
+        The radius may not exceed the cell size.
+        """
+        if radius > self.cell_size:
+            raise ValueError(
+                f"The radius {radius} is larger than the cell size {self.cell_size}"
+            )
+        column, row = self._cell(x, y)
+        limit = radius * radius
+        for cell_column in range(column - 1, column + 2):
+            for cell_row in range(row - 1, row + 2):
+                for item, (item_x, item_y) in self._cells.get(
+                    (cell_column, cell_row), ()
+                ):
+                    distance = (item_x - x) ** 2 + (item_y - y) ** 2
+                    if distance <= limit:
+                        yield item, distance
+
+    def __len__(self) -> int:
+        return sum(len(cell) for cell in self._cells.values())
@@ -0,0 +1,333 @@
+"""
+Streams the state of a running simulation to local debugging tools. Messages are
+json objects, one per line. Clients send:
+
+    {"type": "subscribe", "networks": [0, 2] | null, "signals": ["signal-A"] | null}
+    {"type": "pause"}
+    {"type": "step", "ticks": 1}
+    {"type": "resume"}
+
+and receive:
+
+    {"type": "hello", "tick": 0, "networks": 3, "paused": false}
+    {"type": "tick", "tick": 5, "changes": {"0": {"signal-A": 4}}, "reset": {...}}
+    {"type": "state", "tick": 5, "paused": true}
+    {"type": "error", "message": "..."}
+
+Changes hold the new values of the signals that changed in a tick, zero for removed
+signals. Reset holds all present signals of a network and replaces what the client
+knew about it. It is sent after subscribing and after frames were dropped.
+"""
+
+import asyncio
+import json
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from ..AST.Signal import Signal, SIGNALS, SIGNAL_COUNT
+from ..AST.Simulator import Simulator
+
+Frame = Dict[str, Any]
+
+# ticks run between giving connections a chance, when nobody is subscribed
+IDLE_BATCH: int = 1024
+
+
+class _Client:
+    def __init__(self, writer: asyncio.StreamWriter, queue_size: int):
+        self.writer: asyncio.StreamWriter = writer
+        self.queue: "asyncio.Queue[Frame]" = asyncio.Queue(queue_size)
+        self.subscribed: bool = False
+        # None for all networks or signals
+        self.networks: Optional[Set[int]] = None
+        self.signals: Optional[npt.NDArray[np.bool_]] = None
+        # networks whose changes were dropped, resent in full with the next frame
+        self.stale: Set[int] = set()
+        self.dropped: int = 0
+
+    def wants(self, network: int) -> bool:
+        return self.subscribed and (self.networks is None or network in self.networks)
+
+
+class DebugBridge:
+    """
+    Runs a simulator inside an asyncio event loop and serves its network state on a
+    local TCP or unix socket. Every client has a bounded queue of frames. A client that
+    doesn't keep up loses frames instead of stalling the simulation, and gets the full
+    state of the affected networks with the next frame it has room for. Without
+    subscribers the changes aren't even computed.
+    """
+
+    def __init__(self, simulator: Simulator, queue_size: int = 64):
+        if queue_size < 1:
+            raise ValueError(f"The queue needs room for a frame, got {queue_size}")
+        self.simulator: Simulator = simulator
+        self.queue_size: int = queue_size
+        self.paused: bool = False
+        self._steps: int = 0
+        self._wake: asyncio.Event = asyncio.Event()
+        self._clients: List[_Client] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        # the values the changes of the next tick are computed against
+        self._last: Optional[npt.NDArray[np.int32]] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[str, int]:
+        """
+        Listens on a TCP port, a free one by default. Returns the address.
+        """
+        self._server = await asyncio.start_server(self._connect, host, port)
+        address: Tuple[str, int] = self._server.sockets[0].getsockname()[:2]
+        return address
+
+    async def start_unix(self, path: str) -> None:
+        self._server = await asyncio.start_unix_server(self._connect, path)
+
+    async def close(self) -> None:
+        for client in self._clients:
+            client.writer.close()
+        self._clients = []
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    @property
+    def clients(self) -> int:
+        return len(self._clients)
+
+    async def run(self, ticks: Optional[int] = None) -> None:
+        """
+        Ticks the simulator, forever by default. While paused, only requested steps are
+        run.
+        """
+        done = 0
+        while ticks is None or done < ticks:
+            if self.paused:
+                if not self._steps:
+                    self._wake.clear()
+                    await self._wake.wait()
+                    continue
+                self._steps -= 1
+            self.simulator.tick()
+            done += 1
+            if any(client.subscribed for client in self._clients):
+                self._publish()
+                await asyncio.sleep(0)
+            else:
+                self._last = None
+                if not done % IDLE_BATCH or self.paused:
+                    await asyncio.sleep(0)
+
+    def pause(self) -> None:
+        self.paused = True
+        self._broadcast_state()
+
+    def resume(self) -> None:
+        self.paused = False
+        self._steps = 0
+        self._wake.set()
+        self._broadcast_state()
+
+    def step(self, ticks: int = 1) -> None:
+        self.paused = True
+        self._steps += ticks
+        self._wake.set()
+
+    def _state(self) -> npt.NDArray[np.int32]:
+        networks = self.simulator.networks
+        if not networks:
+            return np.zeros((0, SIGNAL_COUNT), dtype=np.int32)
+        return np.stack([network.previous_values for network in networks])
+
+    def _reset_last(self) -> None:
+        self._last = self._state()
+        for client in self._clients:
+            client.stale = {
+                position
+                for position in range(len(self.simulator.networks))
+                if client.wants(position)
+            }
+
+    def _publish(self) -> None:
+        simulator = self.simulator
+        if self._last is None or len(self._last) != len(simulator.networks):
+            self._reset_last()
+        last = self._last
+        assert last is not None
+        changed = [simulator.network_position(network) for network in simulator.changed]
+        changes: Dict[int, Tuple[npt.NDArray[np.intp], npt.NDArray[np.int32]]] = {}
+        for position in changed:
+            values = simulator.networks[position].previous_values
+            indices = np.flatnonzero(values != last[position])
+            if len(indices):
+                changes[position] = (indices, values[indices])
+                last[position] = values
+        for client in self._clients:
+            if client.subscribed:
+                self._send(client, changes)
+
+    def _values(
+        self,
+        client: _Client,
+        indices: npt.NDArray[np.intp],
+        values: npt.NDArray[np.int32],
+    ) -> Dict[str, int]:
+        if client.signals is not None:
+            keep = client.signals[indices]
+            indices, values = indices[keep], values[keep]
+        return {
+            SIGNALS[index].value: value
+            for index, value in zip(indices.tolist(), values.tolist())
+        }
+
+    def _send(
+        self,
+        client: _Client,
+        changes: Dict[int, Tuple[npt.NDArray[np.intp], npt.NDArray[np.int32]]],
+    ) -> None:
+        wanted = [position for position in changes if client.wants(position)]
+        if client.queue.full():
+            if wanted:
+                client.stale.update(wanted)
+                client.dropped += 1
+            return
+        frame: Frame = {"type": "tick", "tick": self.simulator.tick_count}
+        frame["changes"] = {
+            str(position): signals
+            for position in wanted
+            if position not in client.stale
+            and (signals := self._values(client, *changes[position]))
+        }
+        if client.stale:
+            frame["reset"] = {}
+            for position in sorted(client.stale):
+                state = self.simulator.networks[position].previous_values
+                present = np.flatnonzero(state)
+                frame["reset"][str(position)] = self._values(
+                    client, present, state[present]
+                )
+            client.stale = set()
+        if client.dropped:
+            frame["dropped"] = client.dropped
+            client.dropped = 0
+        if frame["changes"] or "reset" in frame:
+            client.queue.put_nowait(frame)
+
+    def _broadcast_state(self) -> None:
+        frame: Frame = {
+            "type": "state",
+            "tick": self.simulator.tick_count,
+            "paused": self.paused,
+        }
+        for client in self._clients:
+            if not client.queue.full():
+                client.queue.put_nowait(frame)
+
+    def _subscribe(self, client: _Client, message: Frame) -> None:
+        networks = message.get("networks")
+        signals = message.get("signals")
+        count = len(self.simulator.networks)
+        if networks is not None:
+            if not isinstance(networks, list) or not all(
+                type(network) is int for network in networks
+            ):
+                raise ValueError("Networks have to be a list of integers or null")
+            if any(not 0 <= network < count for network in networks):
+                raise ValueError(f"Networks have to be between 0 and {count - 1}")
+            client.networks = set(networks)
+        else:
+            client.networks = None
+        if signals is not None:
+            if not isinstance(signals, list) or not all(
+                isinstance(name, str) for name in signals
+            ):
+                raise ValueError("Signals have to be a list of names or null")
+            mask = np.zeros(SIGNAL_COUNT, dtype=np.bool_)
+            for name in signals:
+                try:
+                    mask[Signal(name).index] = True
+                except ValueError:
+                    raise ValueError(f"Unknown signal {name!r}")
+            client.signals = mask
+        else:
+            client.signals = None
+        client.subscribed = True
+        if self._last is None:
+            # nobody was subscribed, so the changes weren't followed
+            self._reset_last()
+        # the current state of everything subscribed, sent right away even if paused
+        client.stale = {position for position in range(count) if client.wants(position)}
+        self._send(client, {})
+
+    def _handle(self, client: _Client, message: Frame) -> None:
+        kind = message.get("type")
+        if kind == "subscribe":
+            self._subscribe(client, message)
+        elif kind == "pause":
+            self.pause()
+        elif kind == "resume":
+            self.resume()
+        elif kind == "step":
+            ticks = message.get("ticks", 1)
+            if type(ticks) is not int or ticks < 1:
+                raise ValueError(
+                    f"Can only step a positive number of ticks, got {ticks}"
+                )
+            self.step(ticks)
+        else:
+            raise ValueError(f"Unknown message type {kind!r}")
+
+    async def _connect(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        client = _Client(writer, self.queue_size)
+        self._clients.append(client)
+        sender = asyncio.create_task(self._write(client))
+        client.queue.put_nowait(
+            {
+                "type": "hello",
+                "tick": self.simulator.tick_count,
+                "networks": len(self.simulator.networks),
+                "paused": self.paused,
+            }
+        )
+        try:
+            while True:
+                try:
+                    # raises ValueError for lines longer than the reader's limit
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ValueError("Messages have to be objects")
+                    self._handle(client, message)
+                except (ValueError, RecursionError) as error:
+                    # dropped like any other frame if the client is behind
+                    if not client.queue.full():
+                        client.queue.put_nowait(
+                            {"type": "error", "message": str(error) or repr(error)}
+                        )
+        except ConnectionError:
+            pass
+        finally:
+            if client in self._clients:
+                self._clients.remove(client)
+            sender.cancel()
+            writer.close()
+
+    @staticmethod
+    async def _write(client: _Client) -> None:
+        try:
+            while True:
+                client.writer.write(_encode(await client.queue.get()))
+                await client.writer.drain()
+        except ConnectionError:
+            pass
+
+
+def _encode(frame: Frame) -> bytes:
+    return (json.dumps(frame, separators=(",", ":")) + "\n").encode()
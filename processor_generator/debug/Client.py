@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from .Bridge import Frame
+
+
+class DebugClient:
+    """
+    A minimal client of a DebugBridge, keeping a copy of the subscribed state. Meant
+    for tests and scripts, and as a reference for the protocol.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader: asyncio.StreamReader = reader
+        self._writer: asyncio.StreamWriter = writer
+        self.tick: int = 0
+        self.paused: bool = False
+        # network -> signal name -> value, for the subscribed networks and signals
+        self.state: Dict[int, Dict[str, int]] = {}
+        # frames the bridge reported as dropped
+        self.dropped: int = 0
+        self.errors: List[str] = []
+
+    @staticmethod
+    async def connect(host: str, port: int) -> DebugClient:
+        return DebugClient(*await asyncio.open_connection(host, port))
+
+    @staticmethod
+    async def connect_unix(path: str) -> DebugClient:
+        return DebugClient(*await asyncio.open_unix_connection(path))
+
+    async def close(self) -> None:
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        self._writer.write((json.dumps(message) + "\n").encode())
+        await self._writer.drain()
+
+    async def subscribe(
+        self,
+        networks: Optional[Iterable[int]] = None,
+        signals: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        Replaces the subscription, None subscribes to all networks or signals
+        """
+        self.state = {}
+        await self._send(
+            {
+                "type": "subscribe",
+                "networks": None if networks is None else list(networks),
+                "signals": None if signals is None else list(signals),
+            }
+        )
+
+    async def pause(self) -> None:
+        await self._send({"type": "pause"})
+
+    async def resume(self) -> None:
+        await self._send({"type": "resume"})
+
+    async def step(self, ticks: int = 1) -> None:
+        await self._send({"type": "step", "ticks": ticks})
+
+    async def receive(self) -> Frame:
+        """
+        Waits for the next message and applies it to the state
+        """
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("The bridge closed the connection")
+        frame: Frame = json.loads(line)
+        kind = frame["type"]
+        if kind in ("hello", "state", "tick"):
+            self.tick = frame["tick"]
+        if kind in ("hello", "state"):
+            self.paused = frame["paused"]
+        elif kind == "tick":
+            for network, values in frame.get("reset", {}).items():
+                self.state[int(network)] = {}
+                self._update(int(network), values)
+            for network, values in frame["changes"].items():
+                self._update(int(network), values)
+            self.dropped += frame.get("dropped", 0)
+        elif kind == "error":
+            self.errors.append(frame["message"])
+        return frame
+
+    async def receive_until(self, tick: int) -> None:
+        """
+        Receives messages until the state of a tick is known
+        """
+        while self.tick < tick:
+            await self.receive()
+
+    def _update(self, network: int, values: Dict[str, int]) -> None:
+        state = self.state.setdefault(network, {})
+        for signal, value in values.items():
+            if value:
+                state[signal] = value
+            else:
+                state.pop(signal, None)
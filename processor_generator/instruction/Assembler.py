@@ -0,0 +1,84 @@
+from typing import Iterable, Tuple, Mapping, Dict, List
+
+import numpy as np
+import numpy.typing as npt
+
+from .InstructionSet import InstructionSet
+
+ProgramLine = Tuple[str, Mapping[str, int]]
+
+WORD_TYPES: Dict[int, type] = {
+    8: np.uint8,
+    16: np.uint16,
+    32: np.uint32,
+    64: np.uint64,
+}
+
+
+class Assembler:
+    """
+    Packs programs into contiguous arrays of instruction words. Lines are grouped by
+    instruction, so every instruction is encoded and range checked in one batch.
+    """
+
+    def __init__(self, instructions: InstructionSet):
+        self.instructions: InstructionSet = instructions
+
+    @property
+    def word_type(self) -> type:
+        width = max((instruction.width for instruction in self.instructions), default=8)
+        return WORD_TYPES[width]
+
+    def assemble(
+        self, program: Iterable[ProgramLine]
+    ) -> npt.NDArray[np.unsignedinteger]:
+        positions: Dict[str, List[int]] = {}
+        columns: Dict[str, Dict[str, List[int]]] = {}
+        length: int = 0
+        for position, (name, parameters) in enumerate(program):
+            if name not in columns:
+                try:
+                    instruction = self.instructions[name]
+                except KeyError:
+                    raise ValueError(
+                        f"Line {position}: Unknown instruction {name}"
+                    ) from None
+                columns[name] = {
+                    parameter.name: [] for parameter in instruction.parameters
+                }
+                positions[name] = []
+            positions[name].append(position)
+            instruction_columns = columns[name]
+            if parameters.keys() != instruction_columns.keys():
+                self._encode_line(position, name, parameters)
+            for parameter_name, value in parameters.items():
+                instruction_columns[parameter_name].append(value)
+            length = position + 1
+        result: npt.NDArray[np.unsignedinteger] = np.empty(length, dtype=self.word_type)
+        for name, instruction_columns in columns.items():
+            try:
+                words = self.instructions[name].encode_many(**instruction_columns)
+            except (ValueError, OverflowError):
+                # slow path, only taken to report an offending line
+                for index, position in enumerate(positions[name]):
+                    self._encode_line(
+                        position,
+                        name,
+                        {
+                            key: values[index]
+                            for key, values in instruction_columns.items()
+                        },
+                    )
+                raise
+            if not instruction_columns:
+                words = np.broadcast_to(words, len(positions[name]))
+            result[positions[name]] = words
+        return result
+
+    def _encode_line(
+        self, position: int, name: str, parameters: Mapping[str, int]
+    ) -> int:
+        try:
+            return self.instructions[name].encode(**parameters)
+        except ValueError as error:
+            raise ValueError(f"Line {position}: {error}") from None
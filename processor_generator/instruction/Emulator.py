@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import functools
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from .Instruction import Instruction
+from .InstructionSet import InstructionSet
+
+# called with the emulator and the decoded parameters of an instruction. The program
+# counter already points at the next word when it is called, and can be changed to jump.
+Semantics = Callable[["Emulator", Dict[str, int]], None]
+
+
+class DecodedInstruction(NamedTuple):
+    instruction: Instruction
+    semantics: Semantics
+    # shared by every execution of the same word, so it must not be modified
+    parameters: Dict[str, int]
+
+
+class Emulator:
+    """
+    Runs a program image against an instruction set, before there is a design
+    implementing it. The behaviour of every instruction is given by registered
+    semantics. Words are decoded once and then taken from an LRU cache keyed by the
+    word, so loops only pay for the dispatch. Since the cache doesn't depend on the
+    address, programs may modify their own image.
+    """
+
+    def __init__(
+        self,
+        instructions: InstructionSet,
+        program: Union[Sequence[int], npt.NDArray[np.unsignedinteger]],
+        cache_size: Optional[int] = 1 << 16,
+    ):
+        self.instructions: InstructionSet = instructions
+        if isinstance(program, np.ndarray):
+            # indexing lists of python ints is much faster than indexing arrays
+            program = program.tolist()
+        self.program: List[int] = list(program)
+        self.pc: int = 0
+        self.halted: bool = False
+        # instructions executed so far
+        self.executed: int = 0
+        # free for the semantics, e.g. register number -> value
+        self.registers: Dict[int, int] = {}
+        self._semantics: Dict[str, Semantics] = {}
+        self._decode: Callable[[int], DecodedInstruction] = functools.lru_cache(
+            cache_size
+        )(self._decode_word)
+
+    def register(self, name: str, semantics: Semantics) -> None:
+        """
+        Sets the semantics of an instruction, replacing earlier ones
+        """
+        if name not in {instruction.name for instruction in self.instructions}:
+            raise ValueError(f'Unknown instruction "{name}"')
+        self._semantics[name] = semantics
+        # cached words refer to the previous semantics
+        self._decode.cache_clear()  # type: ignore[attr-defined]
+
+    def semantics(self, name: str) -> Callable[[Semantics], Semantics]:
+        """
+        Decorator version of register
+        """
+
+        def decorator(semantics: Semantics) -> Semantics:
+            self.register(name, semantics)
+            return semantics
+
+        return decorator
+
+    def _decode_word(self, word: int) -> DecodedInstruction:
+        instruction = self.instructions.identify(word)
+        if instruction is None:
+            raise ValueError(f"Unknown instruction {word:#x}")
+        semantics = self._semantics.get(instruction.name)
+        if semantics is None:
+            raise ValueError(f"No semantics registered for {instruction.name}")
+        return DecodedInstruction(
+            instruction, semantics, instruction.parameters_for_instruction(word)
+        )
+
+    def decode(self, word: int) -> DecodedInstruction:
+        return self._decode(word)
+
+    @property
+    def cache_info(self) -> "functools._CacheInfo":
+        return self._decode.cache_info()  # type: ignore[attr-defined]
+
+    def halt(self) -> None:
+        self.halted = True
+
+    def step(self) -> None:
+        self.run(1)
+
+    def run(self, limit: Optional[int] = None) -> int:
+        """
+        Executes instructions until one halts the emulator, or limit instructions were
+        executed. Returns the number of executed instructions.
+        """
+        program = self.program
+        decode = self._decode
+        size = len(program)
+        # never reached without a limit
+        stop = -1 if limit is None else limit
+        executed = 0
+        try:
+            while executed != stop and not self.halted:
+                pc = self.pc
+                if not 0 <= pc < size:
+                    raise ValueError(f"Program counter {pc} is outside of the program")
+                try:
+                    decoded = decode(program[pc])
+                except ValueError as error:
+                    raise ValueError(f"Address {pc}: {error}") from None
+                self.pc = pc + 1
+                decoded[1](self, decoded[2])
+                executed += 1
+        finally:
+            self.executed += executed
+        return executed
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterable
+
+import numpy as np
+import numpy.typing as npt
 
 from .InstructionParameter import InstructionParameter
 from .instruction_types import StoredInstruction
@@ -13,11 +16,13 @@ class Instruction:
         description: Optional[str],
         parameters: List[InstructionParameter],
         architecture: str,
+        opcode: Optional[str] = None,
     ):
         self.name: str = name
         self.description: Optional[str] = description
         self.parameters: List[InstructionParameter] = parameters
         self.architecture: str = architecture
+        self.opcode: Optional[str] = opcode
 
     @property
     def architecture(self) -> str:
@@ -30,6 +35,36 @@ class Instruction:
         else:
             raise ValueError(f'Invalid instruction architecture "{arch}"')
 
+    @property
+    def width(self) -> int:
+        return int(self.architecture[: -len("bit")])
+
+    @property
+    def opcode(self) -> Optional[str]:
+        """
+        The opcode uses the parameter source syntax, but describes the instruction
+        word itself: static segments are bits that have to match, variable segments
+        only reserve their length for operands.
+        """
+        return self._opcode
+
+    @opcode.setter
+    def opcode(self, opcode: Optional[str]) -> None:
+        fixed_mask: int = 0
+        fixed_value: int = 0
+        for sub_parameter in InstructionParameter.parse_parameters(opcode or ""):
+            if sub_parameter.bit_field() is None:
+                fixed_mask |= (
+                    (1 << sub_parameter.length) - 1
+                ) << sub_parameter.shift_by
+                fixed_value |= sub_parameter.value(0)
+        self._opcode = opcode
+        self.fixed_mask: int = fixed_mask
+        self.fixed_value: int = fixed_value
+
+    def matches(self, instruction: int) -> bool:
+        return instruction & self.fixed_mask == self.fixed_value
+
     @property
     def parameters(self) -> List[InstructionParameter]:
         return self._parameters
@@ -42,6 +77,9 @@ class Instruction:
                 raise ValueError("Same parameter cannot occur twice")
             found.append(param.name)
         self._parameters = params
+        for param in params:
+            param.owned_by(self)
+        self.compile()
 
     @staticmethod
     def from_obj(obj: StoredInstruction) -> Instruction:
@@ -50,6 +88,7 @@ class Instruction:
             obj["description"] if "description" in obj else None,
             [InstructionParameter.from_obj(i) for i in obj["parameters"]],
             obj["architecture"],
+            obj["opcode"] if "opcode" in obj else None,
         )
 
     def __eq__(self, other: Any) -> bool:
@@ -59,20 +98,110 @@ class Instruction:
                 and self.architecture == other.architecture
                 and self.description == other.description
                 and self.parameters == other.parameters
+                and self.opcode == other.opcode
             )
         return False
 
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_decoder"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        for param in self.parameters:
+            param.owned_by(self)
+        # generating the decoder dominates unpickling, so it is deferred to first use
+        self._decoder: Callable[[int], Dict[str, int]] = self._compile_and_decode
+
+    def _compile_and_decode(self, instruction: int) -> Dict[str, int]:
+        self.compile()
+        return self._decoder(instruction)
+
     def __repr__(self) -> str:
         return (
             f"Instruction("
             f"name={self.name!r}, "
             f"description={self.description!r}, "
             f"parameters={self.parameters!r}, "
-            f"architecture={self.architecture!r})"
+            f"architecture={self.architecture!r}, "
+            f"opcode={self.opcode!r})"
+        )
+
+    def compile(self) -> None:
+        """
+        Generates the decoder used by parameters_for_instruction. This happens
+        automatically when the parameters are set or their source changes, but has to
+        be done manually after modifying the parameter list in place.
+        """
+        entries = ", ".join(
+            f"{parameter.name!r}: {parameter.expression('instruction')}"
+            for parameter in self.parameters
         )
+        self._decoder = eval(f"lambda instruction: {{{entries}}}", {})
 
     def parameters_for_instruction(self, instruction: int) -> Dict[str, int]:
+        return self._decoder(instruction)
+
+    def decode_many(
+        self, instructions: npt.ArrayLike
+    ) -> Dict[str, npt.NDArray[np.uint64]]:
+        """
+        Decodes an array of instructions, returning one column per parameter
+        """
+        words = np.asarray(instructions, dtype=np.uint64)
         return {
-            parameter.name: parameter.value(instruction)
-            for parameter in self.parameters
+            parameter.name: parameter.values(words) for parameter in self.parameters
         }
+
+    def _check_names(self, names: Iterable[str]) -> None:
+        expected = {parameter.name for parameter in self.parameters}
+        if set(names) != expected:
+            raise ValueError(
+                f"Instruction {self.name} expects the parameters {sorted(expected)}, "
+                f"got {sorted(names)}"
+            )
+
+    def encode(self, /, **parameters: int) -> int:
+        self._check_names(parameters)
+        instruction: int = self.fixed_value
+        for parameter in self.parameters:
+            instruction |= parameter.encode(parameters[parameter.name])
+        if (
+            instruction >> self.width
+            or not self.matches(instruction)
+            or self.parameters_for_instruction(instruction) != parameters
+        ):
+            raise ValueError(
+                f"Instruction {self.name} cannot encode the parameters {parameters}"
+            )
+        return instruction
+
+    def encode_many(self, /, **parameters: npt.ArrayLike) -> npt.NDArray[np.uint64]:
+        """
+        Vectorized version of encode, range checking all instructions at once
+        """
+        self._check_names(parameters)
+        names = list(parameters)
+        columns = dict(
+            zip(
+                names,
+                np.broadcast_arrays(*(np.asarray(parameters[name]) for name in names)),
+            )
+        )
+        shape = columns[names[0]].shape if names else ()
+        result = np.full(shape, self.fixed_value, dtype=np.uint64)
+        for parameter in self.parameters:
+            result |= parameter.encodes(columns[parameter.name])
+        valid = (result & np.uint64(self.fixed_mask)) == np.uint64(self.fixed_value)
+        if self.width < 64:
+            valid &= (result >> np.uint64(self.width)) == 0
+        for parameter in self.parameters:
+            valid &= parameter.values(result) == columns[parameter.name]
+        if not valid.all():
+            invalid = np.flatnonzero(~valid)
+            raise ValueError(
+                f"Instruction {self.name} cannot encode the parameters at positions "
+                f"{invalid[:10].tolist()}"
+            )
+        return result
@@ -1,13 +1,24 @@
 from __future__ import annotations
 
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Tuple, Dict, TYPE_CHECKING
+from weakref import ref, ReferenceType
+
+import numpy as np
+import numpy.typing as npt
 
 from .InstructionSubParameter import InstructionSubParameter, sub_parameter_parser
 from .instruction_types import StoredInstructionParameter
 
+if TYPE_CHECKING:
+    from .Instruction import Instruction
+
+# (start, mask, shift_by) of one variable sub-parameter
+BitField = Tuple[int, int, int]
+
 
 class InstructionParameter:
     def __init__(self, name: str, source: str, description: Optional[str] = None):
+        self._owners: List[ReferenceType[Instruction]] = []
         self.name: str = name
         self.parameters: List[InstructionSubParameter] = []
         self.source: str = source
@@ -44,9 +55,20 @@ class InstructionParameter:
     def name(self, name: str) -> None:
         if name:
             self._name = name
+            # the compiled decoders of the owners return the parameters by name
+            self._recompile_owners()
         else:
             raise ValueError(f"Name mustn't be none or empty, got {name}")
 
+    @property
+    def parameters(self) -> List[InstructionSubParameter]:
+        return self._parameters
+
+    @parameters.setter
+    def parameters(self, parameters: List[InstructionSubParameter]) -> None:
+        self._parameters = parameters
+        self.compile()
+
     @property
     def source(self) -> str:
         return self._source
@@ -59,6 +81,10 @@ class InstructionParameter:
         else:
             raise ValueError(f"Source mustn't be none or empty, got {source}")
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # owners register themselves again when they are unpickled
+        return {**self.__dict__, "_owners": []}
+
     def __repr__(self) -> str:
         return f"InstructionParameter(name={self.name!r}, source={self.source!r}, description={self.description!r})"
 
@@ -71,5 +97,97 @@ class InstructionParameter:
             )
         return False
 
+    def compile(self) -> None:
+        """
+        Folds the sub-parameters into a constant and a list of bit fields. Has to be
+        called again if a sub-parameter is modified in place.
+        """
+        constant: int = 0
+        fields: List[BitField] = []
+        for sub_parameter in self.parameters:
+            field = sub_parameter.bit_field()
+            if field is None:
+                constant += sub_parameter.value(0)
+            else:
+                fields.append((field[0], field[1], sub_parameter.shift_by))
+        self._constant: int = constant
+        self._fields: Tuple[BitField, ...] = tuple(fields)
+        self._recompile_owners()
+
+    def _recompile_owners(self) -> None:
+        owners = [owner for owner in self._owners if owner() is not None]
+        self._owners = owners
+        for owner in owners:
+            if instruction := owner():
+                instruction.compile()
+
+    def owned_by(self, instruction: Instruction) -> None:
+        """
+        Registers an instruction that has to be recompiled whenever this parameter
+        changes
+        """
+        owners = [owner for owner in self._owners if owner() is not None]
+        if not any(owner() is instruction for owner in owners):
+            owners.append(ref(instruction))
+        self._owners = owners
+
+    def expression(self, using: str) -> str:
+        """
+        A python expression evaluating to the value of this parameter, given the name
+        of the variable holding the instruction
+        """
+        terms = [
+            f"(({using} >> {start}) & {mask:#x})"
+            + (f" << {shift_by}" if shift_by else "")
+            for start, mask, shift_by in self._fields
+        ]
+        if self._constant or not terms:
+            terms.append(f"{self._constant:#x}")
+        return " + ".join(f"({term})" for term in terms)
+
     def value(self, using: int) -> int:
-        return sum(sub_parameter.value(using) for sub_parameter in self.parameters)
+        result: int = self._constant
+        for start, mask, shift_by in self._fields:
+            result += ((using >> start) & mask) << shift_by
+        return result
+
+    def values(self, using: npt.ArrayLike) -> npt.NDArray[np.uint64]:
+        """
+        Vectorized version of value, decoding a whole array of instructions at once
+        """
+        if self._constant.bit_length() > 64 or any(
+            shift_by + mask.bit_length() > 64 for _, mask, shift_by in self._fields
+        ):
+            raise ValueError(f"Parameter {self.name} does not fit into 64 bits")
+        words = np.asarray(using, dtype=np.uint64)
+        result = np.full(words.shape, self._constant, dtype=np.uint64)
+        for start, mask, shift_by in self._fields:
+            if start < 64:
+                field = (words >> np.uint64(start)) & np.uint64(mask)
+                result += field << np.uint64(shift_by)
+        return result
+
+    def encode(self, value: int) -> int:
+        """
+        The instruction bits holding the given value. Bits of the value that are
+        constant in this parameter are ignored.
+        """
+        result: int = 0
+        for start, mask, shift_by in self._fields:
+            result |= ((value >> shift_by) & mask) << start
+        return result
+
+    def encodes(self, values: npt.ArrayLike) -> npt.NDArray[np.uint64]:
+        """
+        Vectorized version of encode
+        """
+        numbers = np.asarray(values)
+        if numbers.dtype.kind == "i" and (numbers < 0).any():
+            raise ValueError(f"Parameter {self.name} cannot encode negative values")
+        numbers = numbers.astype(np.uint64)
+        result = np.zeros(numbers.shape, dtype=np.uint64)
+        for start, mask, shift_by in self._fields:
+            if shift_by < 64 and start + mask.bit_length() <= 64:
+                field = (numbers >> np.uint64(shift_by)) & np.uint64(mask)
+                result |= field << np.uint64(start)
+        return result
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from typing import Optional, List, Dict, Iterator, Tuple, Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .Instruction import Instruction
+from .instruction_types import StoredInstruction
+
+
+class InstructionSet:
+    """
+    A group of instructions, indexed by the fixed bits of their opcodes. Instructions
+    sharing a fixed mask are stored in one lookup table, and tables are tried from the
+    most to the least specific mask, so identification only depends on the number of
+    distinct opcode formats.
+    """
+
+    def __init__(self, instructions: List[Instruction]):
+        self.instructions: List[Instruction] = instructions
+
+    @staticmethod
+    def from_obj(objs: List[StoredInstruction]) -> InstructionSet:
+        return InstructionSet([Instruction.from_obj(obj) for obj in objs])
+
+    @property
+    def instructions(self) -> List[Instruction]:
+        return self._instructions
+
+    @instructions.setter
+    def instructions(self, instructions: List[Instruction]) -> None:
+        by_name: Dict[str, Instruction] = {}
+        for instruction in instructions:
+            if instruction.name in by_name:
+                raise ValueError(
+                    f'Same instruction cannot occur twice, got "{instruction.name}"'
+                )
+            by_name[instruction.name] = instruction
+        self._instructions = instructions
+        self._by_name: Dict[str, Instruction] = by_name
+        self.index()
+
+    def index(self) -> None:
+        """
+        Rebuilds the opcode index. This happens automatically when the instructions
+        are set, but has to be done manually after changing an instruction's opcode.
+        """
+        tables: Dict[int, Dict[int, int]] = {}
+        for position, instruction in enumerate(self.instructions):
+            table = tables.setdefault(instruction.fixed_mask, {})
+            if instruction.fixed_value in table:
+                other = self.instructions[table[instruction.fixed_value]]
+                raise ValueError(
+                    f'Instructions "{other.name}" and "{instruction.name}" have the same opcode'
+                )
+            table[instruction.fixed_value] = position
+        self._tables: List[Tuple[int, Dict[int, int]]] = sorted(
+            tables.items(), key=lambda item: bin(item[0]).count("1"), reverse=True
+        )
+        self._sorted_tables: List[
+            Tuple[int, npt.NDArray[np.uint64], npt.NDArray[np.int64]]
+        ] = []
+        for mask, table in self._tables:
+            values = np.fromiter(table.keys(), dtype=np.uint64, count=len(table))
+            positions = np.fromiter(table.values(), dtype=np.int64, count=len(table))
+            order = np.argsort(values)
+            self._sorted_tables.append((mask, values[order], positions[order]))
+
+    def __len__(self) -> int:
+        return len(self.instructions)
+
+    def __iter__(self) -> Iterator[Instruction]:
+        return iter(self.instructions)
+
+    def __getitem__(self, name: str) -> Instruction:
+        return self._by_name[name]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, InstructionSet):
+            return self.instructions == other.instructions
+        return False
+
+    def __repr__(self) -> str:
+        return f"InstructionSet(instructions={self.instructions!r})"
+
+    def position(self, instruction: int) -> Optional[int]:
+        for mask, table in self._tables:
+            position = table.get(instruction & mask)
+            if position is not None:
+                return position
+        return None
+
+    def identify(self, instruction: int) -> Optional[Instruction]:
+        position = self.position(instruction)
+        return None if position is None else self.instructions[position]
+
+    def identify_many(self, instructions: npt.ArrayLike) -> npt.NDArray[np.int64]:
+        """
+        Vectorized version of position, returning -1 for unknown instructions
+        """
+        words = np.asarray(instructions, dtype=np.uint64)
+        result = np.full(words.shape, -1, dtype=np.int64)
+        for mask, values, positions in self._sorted_tables:
+            keys = words & np.uint64(mask)
+            found = np.minimum(np.searchsorted(values, keys), len(values) - 1)
+            hit = (values[found] == keys) & (result == -1)
+            result[hit] = positions[found[hit]]
+        return result
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 
-from typing import Any
+from typing import Any, Optional, Tuple
 
 
 class InstructionSubParameter(ABC):
@@ -16,6 +16,14 @@ class InstructionSubParameter(ABC):
     def _value(self, using: int) -> int:
         raise NotImplementedError
 
+    @abstractmethod
+    def bit_field(self) -> Optional[Tuple[int, int]]:
+        """
+        The (start, mask) pair of the input bits this sub-parameter reads, or None
+        if the sub-parameter is constant
+        """
+        raise NotImplementedError
+
     def value(self, using: int) -> int:
         return self._value(using) << self.shift_by
 
@@ -32,13 +40,13 @@ class VariableInstructionSubParameter(InstructionSubParameter):
         self.end: int = end
 
     def mask(self) -> int:
-        mask: int = 0
-        for i in range(self.start, self.end + 1):
-            mask |= 2**i
-        return mask
+        return ((1 << (self.end - self.start + 1)) - 1) << self.start
 
     def _value(self, using: int) -> int:
-        return (using & self.mask()) >> self.start
+        return (using >> self.start) & ((1 << (self.end - self.start + 1)) - 1)
+
+    def bit_field(self) -> Optional[Tuple[int, int]]:
+        return self.start, (1 << (self.end - self.start + 1)) - 1
 
     def __eq__(self, other: Any) -> bool:
         if isinstance(other, VariableInstructionSubParameter):
@@ -65,6 +73,9 @@ class StaticInstructionSubParameter(InstructionSubParameter):
     def _value(self, using: int) -> int:
         return self.number
 
+    def bit_field(self) -> Optional[Tuple[int, int]]:
+        return None
+
     def __eq__(self, other: Any) -> bool:
         if isinstance(other, StaticInstructionSubParameter):
             return (
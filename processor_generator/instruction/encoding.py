@@ -0,0 +1,178 @@
+from itertools import combinations
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .Instruction import Instruction
+
+# fixed mask, fixed value and position of an instruction
+_Pattern = Tuple[int, int, int]
+
+# groups of patterns that are compared pair by pair instead of being split further
+_SMALL_GROUP: int = 8
+
+
+class EncodingReport(NamedTuple):
+    # the widest instruction, the size of the words the unused space is counted in
+    width: int
+    # pairs of instructions that both match some word, in the given order
+    ambiguous: List[Tuple[Instruction, Instruction]]
+    # disjoint (mask, value) patterns of the words no instruction matches
+    unused: List[Tuple[int, int]]
+    # whether unused stopped at the limit given to check_encodings
+    truncated: bool = False
+
+    @property
+    def unused_words(self) -> int:
+        """
+        The number of unused words, only a lower bound if unused was truncated
+        """
+        return sum(1 << (self.width - bin(mask).count("1")) for mask, _ in self.unused)
+
+
+def describe(mask: int, value: int, width: int) -> str:
+    """
+    A pattern as a string of ones, zeros and x for bits that may take either value,
+    highest bit first
+    """
+    return "".join(
+        ("1" if value >> bit & 1 else "0") if mask >> bit & 1 else "x"
+        for bit in reversed(range(width))
+    )
+
+
+def _overlap(first: _Pattern, second: _Pattern) -> bool:
+    # some word matches both unless a bit fixed by both differs
+    return not first[0] & second[0] & (first[1] ^ second[1])
+
+
+def _split_bit(patterns: List[_Pattern], decided: int) -> int:
+    """
+    The undecided bit fixed by the most patterns, zero if they fix none
+    """
+    common = ~decided
+    for mask, _, _ in patterns:
+        common &= mask
+    if common:
+        # fixed by all of them, the usual case for opcodes with a common prefix
+        return 1 << (common.bit_length() - 1)
+    counts: Dict[int, int] = {}
+    for mask, _, _ in patterns:
+        undecided = mask & ~decided
+        while undecided:
+            bit = undecided & -undecided
+            counts[bit] = counts.get(bit, 0) + 1
+            undecided ^= bit
+    return max(counts, key=lambda bit: (counts[bit], bit), default=0)
+
+
+def _bit_count(value: int) -> int:
+    return bin(value).count("1")
+
+
+def _ambiguous(patterns: List[_Pattern]) -> Set[Tuple[int, int]]:
+    """
+    The positions of all overlapping pairs. Groups are split on the bit fixed by the
+    most patterns: patterns on different sides can't overlap, and the ones not fixing
+    the bit are compared with the others directly and split further among themselves.
+    Every pattern therefore ends up in only one group.
+    """
+    pairs: Set[Tuple[int, int]] = set()
+    stack: List[Tuple[List[_Pattern], int]] = [(patterns, 0)]
+    while stack:
+        group, decided = stack.pop()
+        bit = _split_bit(group, decided) if len(group) > _SMALL_GROUP else 0
+        if not bit:
+            pairs.update(
+                (first[2], second[2])
+                for first, second in combinations(group, 2)
+                if _overlap(first, second)
+            )
+            continue
+        sides: Tuple[List[_Pattern], List[_Pattern]] = ([], [])
+        free: List[_Pattern] = []
+        for pattern in group:
+            if pattern[0] & bit:
+                sides[bool(pattern[1] & bit)].append(pattern)
+            else:
+                free.append(pattern)
+        for pattern in free:
+            pairs.update(
+                (min(pattern[2], other[2]), max(pattern[2], other[2]))
+                for side in sides
+                for other in side
+                if _overlap(pattern, other)
+            )
+        decided |= bit
+        stack.extend((part, decided) for part in (*sides, free))
+    return pairs
+
+
+def _unused(
+    patterns: List[_Pattern], limit: Optional[int]
+) -> Tuple[List[Tuple[int, int]], bool]:
+    """
+    Disjoint patterns of the words matched by no pattern, and whether the limit was
+    reached. Parts are split on a bit of the pattern closest to covering the part, the
+    one fixed by the most patterns, and patterns not fixing it go to both halves. A
+    part is covered once one of its patterns is decided by the bits split on, and
+    unused if no pattern is left.
+    """
+    unused: List[Tuple[int, int]] = []
+    stack: List[Tuple[List[_Pattern], int, int]] = [(patterns, 0, 0)]
+    while stack:
+        group, decided, prefix = stack.pop()
+        if not group:
+            if limit is not None and len(unused) >= limit:
+                return unused, True
+            unused.append((decided, prefix))
+            continue
+        undecided = min((mask & ~decided for mask, _, _ in group), key=_bit_count)
+        if not undecided:
+            # a pattern matches the whole part
+            continue
+        bit = _split_bit(group, ~undecided)
+        for side in (0, bit):
+            stack.append(
+                (
+                    [
+                        pattern
+                        for pattern in group
+                        if not pattern[0] & bit or pattern[1] & bit == side
+                    ],
+                    decided | bit,
+                    prefix | side,
+                )
+            )
+    return unused, False
+
+
+def check_encodings(
+    instructions: Iterable[Instruction], max_unused: Optional[int] = 1 << 12
+) -> EncodingReport:
+    """
+    Finds the instructions that can match the same word, and the words matched by no
+    instruction, from the fixed bits of their opcodes. Two instructions overlap unless
+    a bit fixed by both differs. Instead of testing every pair, the instructions are
+    grouped by the bits they fix, so only instructions that may overlap are compared.
+    The unused space is collected separately and can take many patterns to describe
+    when instructions fix unrelated bits, so at most max_unused patterns are listed.
+    Without instructions there are no words to check and the report is empty.
+    """
+    listed = list(instructions)
+    if not listed:
+        return EncodingReport(0, [], [])
+    width = max((instruction.width for instruction in listed), default=0)
+    patterns = [
+        (instruction.fixed_mask, instruction.fixed_value, position)
+        for position, instruction in enumerate(listed)
+    ]
+    unused, truncated = _unused(patterns, max_unused)
+    return EncodingReport(
+        width,
+        [
+            (listed[first], listed[second])
+            for first, second in sorted(_ambiguous(patterns))
+        ],
+        sorted(unused, key=lambda pattern: (pattern[1], pattern[0])),
+        truncated,
+    )
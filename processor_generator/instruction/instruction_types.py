@@ -18,3 +18,8 @@ class _StoredInstruction(TypedDict):
 
 class StoredInstruction(_StoredInstruction, total=False):
     description: Optional[str]
+    opcode: Optional[str]
+
+
+class StoredInstructionSet(TypedDict):
+    instructions: List[StoredInstruction]
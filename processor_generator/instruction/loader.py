@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Union,
+    cast,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from .Instruction import Instruction
+from .InstructionSet import InstructionSet
+from .instruction_types import StoredInstructionSet
+
+# bump whenever the pickled representation of an InstructionSet changes
+CACHE_VERSION: int = 1
+
+
+def _parse_json(text: str) -> Any:
+    return json.loads(text)
+
+
+def _parse_yaml(text: str) -> Any:
+    try:
+        import yaml
+    except ImportError:
+        raise ValueError("Loading YAML descriptions requires PyYAML to be installed")
+    return yaml.safe_load(text)
+
+
+def _parse_toml(text: str) -> Any:
+    try:
+        import tomllib
+    except ImportError:
+        raise ValueError("Loading TOML descriptions requires Python 3.11 or newer")
+    return tomllib.loads(text)
+
+
+PARSERS: Dict[str, Callable[[str], Any]] = {
+    ".json": _parse_json,
+    ".yaml": _parse_yaml,
+    ".yml": _parse_yaml,
+    ".toml": _parse_toml,
+}
+
+
+def default_cache_dir() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "processor_generator"
+
+
+def validate(value: Any, expected: Any, path: str = "$") -> None:
+    """
+    Checks a parsed description against a (possibly nested) TypedDict type, raising
+    a ValueError that points to the first offending entry
+    """
+    origin = get_origin(expected)
+    if origin is Union:
+        errors: List[str] = []
+        for option in get_args(expected):
+            try:
+                return validate(value, option, path)
+            except ValueError as error:
+                errors.append(str(error))
+        raise ValueError(" or ".join(errors))
+    if origin is list:
+        if not isinstance(value, list):
+            raise ValueError(f"{path} has to be a list, got {type(value).__name__}")
+        (item_type,) = get_args(expected)
+        for index, item in enumerate(value):
+            validate(item, item_type, f"{path}[{index}]")
+        return
+    if isinstance(expected, type) and hasattr(expected, "__required_keys__"):
+        if not isinstance(value, dict):
+            raise ValueError(f"{path} has to be an object, got {type(value).__name__}")
+        hints = get_type_hints(expected)
+        for key in value.keys() - hints.keys():
+            raise ValueError(f'{path} has the unknown entry "{key}"')
+        for key in getattr(expected, "__required_keys__") - value.keys():
+            raise ValueError(f'{path} is missing the entry "{key}"')
+        for key, item in value.items():
+            validate(item, hints[key], f"{path}.{key}")
+        return
+    if expected is type(None):
+        if value is not None:
+            raise ValueError(f"{path} has to be null, got {type(value).__name__}")
+        return
+    if not isinstance(value, expected):
+        raise ValueError(
+            f"{path} has to be of type {expected.__name__}, got {type(value).__name__}"
+        )
+
+
+def _private(path: Path) -> bool:
+    """
+    Whether a cache directory or entry belongs to the current user and can't be
+    written by anybody else. Unpickling can run arbitrary code, so entries others
+    could have planted are never loaded.
+    """
+    if not hasattr(os, "getuid"):
+        # no owners and modes to check, e.g. on windows
+        return True
+    status = path.stat()
+    return status.st_uid == os.getuid() and not status.st_mode & 0o022
+
+
+def parse_instruction_set(text: str, suffix: str = ".json") -> InstructionSet:
+    if suffix not in PARSERS:
+        raise ValueError(f'Unknown description file format "{suffix}"')
+    obj = PARSERS[suffix](text)
+    validate(obj, StoredInstructionSet)
+    stored = cast(StoredInstructionSet, obj)
+    instructions: List[Instruction] = []
+    for index, instruction in enumerate(stored["instructions"]):
+        try:
+            instructions.append(Instruction.from_obj(instruction))
+        except ValueError as error:
+            raise ValueError(f"$.instructions[{index}]: {error}") from None
+    return InstructionSet(instructions)
+
+
+def load_instruction_set(
+    path: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None
+) -> InstructionSet:
+    """
+    Loads an instruction set description file. Parsed and compiled instruction sets
+    are cached on disk, keyed by the hash of the file content.
+    """
+    path = Path(path)
+    content = path.read_bytes()
+    suffix = path.suffix.lower()
+    cache = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    digest = hashlib.sha256(
+        b"%d:%s:" % (CACHE_VERSION, suffix.encode()) + content
+    ).hexdigest()
+    cache_file = cache / f"{digest}.pickle"
+    try:
+        if _private(cache) and _private(cache_file):
+            with cache_file.open("rb") as file:
+                cached = pickle.load(file)
+            if isinstance(cached, InstructionSet):
+                return cached
+    except Exception:
+        # a missing or unreadable cache entry only means the file is parsed again
+        pass
+    instruction_set = parse_instruction_set(content.decode("utf-8"), suffix)
+    try:
+        cache.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if _private(cache):
+            with tempfile.NamedTemporaryFile(dir=cache, delete=False) as temporary:
+                try:
+                    pickle.dump(instruction_set, temporary, pickle.HIGHEST_PROTOCOL)
+                    temporary.close()
+                    os.replace(temporary.name, cache_file)
+                finally:
+                    # only left behind if writing or replacing failed
+                    if os.path.exists(temporary.name):
+                        os.unlink(temporary.name)
+    except OSError:
+        # caching is best effort, e.g. on read only file systems
+        pass
+    return instruction_set
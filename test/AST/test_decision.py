@@ -0,0 +1,145 @@
+import pickle
+import random
+import unittest
+from unittest import mock
+
+from processor_generator.AST import Decision as decision_module
+from processor_generator.AST.Decision import *
+from processor_generator.AST.Signal import SIGNALS
+from processor_generator.AST.Simulator import Simulator
+
+
+def network(values):
+    net = Network()
+    for signal, value in values.items():
+        net.update_value(signal, value)
+    net.tick()
+    return net
+
+
+class TestDecision(unittest.TestCase):
+    def setUp(self):
+        self.net = network({Signal.SIGNAL_A: 5, Signal.SIGNAL_B: -3, Signal.SIGNAL_C: 10})
+
+    def test_constructor(self):
+        node = Decision(Comparator.GREATER, self.net, Signal.SIGNAL_A)
+        self.assertEqual(node.right, ConstantOperand(0))
+        self.assertEqual(node.output_mode, OutputMode.ONE)
+        self.assertEqual(node.inputs(), [self.net])
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(ValueError):
+            Decision(Comparator.GREATER, self.net, Signal.SIGNAL_A, output_signal=Wildcard.EACH)
+        with self.assertRaises(ValueError):
+            Decision(Comparator.GREATER, self.net, Wildcard.EACH, output_signal=Wildcard.EVERYTHING)
+        with self.assertRaises(ValueError):
+            Decision(Comparator.GREATER, self.net, Wildcard.ANYTHING, output_signal=Wildcard.ANYTHING)
+
+    def test_comparators(self):
+        cases = [
+            (Comparator.GREATER, [False, True, False]),
+            (Comparator.LESS, [True, False, False]),
+            (Comparator.EQUAL, [False, False, True]),
+            (Comparator.GREATER_OR_EQUAL, [False, True, True]),
+            (Comparator.LESS_OR_EQUAL, [True, False, True]),
+            (Comparator.NOT_EQUAL, [True, True, False]),
+        ]
+        for comparator, expected in cases:
+            for right, result in zip([6, 4, 5], expected):
+                with self.subTest(comparator=comparator, right=right):
+                    node = Decision(comparator, self.net, Signal.SIGNAL_A, ConstantOperand(right), Signal.SIGNAL_Z)
+                    self.assertEqual(node.output(), {Signal.SIGNAL_Z: 1} if result else {})
+
+    def test_signal(self):
+        node = Decision(Comparator.GREATER, self.net, Signal.SIGNAL_A, SignalOperand(self.net, Signal.SIGNAL_B), Signal.SIGNAL_C, OutputMode.INPUT_COUNT)
+        self.assertEqual(node.output(), {Signal.SIGNAL_C: 10})
+        node.output_signal = Signal.SIGNAL_Z
+        self.assertEqual(node.output(), {})
+        node.output_signal = Wildcard.EVERYTHING
+        self.assertEqual(node.output(), {Signal.SIGNAL_A: 5, Signal.SIGNAL_B: -3, Signal.SIGNAL_C: 10})
+        node.output_mode = OutputMode.ONE
+        self.assertEqual(node.output(), {Signal.SIGNAL_A: 1, Signal.SIGNAL_B: 1, Signal.SIGNAL_C: 1})
+        node.output_signal = None
+        self.assertEqual(node.output(), {})
+
+    def test_everything(self):
+        node = Decision(Comparator.GREATER, self.net, Wildcard.EVERYTHING, ConstantOperand(-5), Signal.SIGNAL_Z)
+        self.assertEqual(node.output(), {Signal.SIGNAL_Z: 1})
+        node.right = ConstantOperand(0)
+        self.assertEqual(node.output(), {})
+        # true without any signals
+        node.network = empty = Network()
+        self.assertEqual(node.output(), {Signal.SIGNAL_Z: 1})
+
+    def test_anything(self):
+        node = Decision(Comparator.LESS, self.net, Wildcard.ANYTHING, ConstantOperand(0), Wildcard.EVERYTHING, OutputMode.INPUT_COUNT)
+        self.assertEqual(node.output(), {Signal.SIGNAL_A: 5, Signal.SIGNAL_B: -3, Signal.SIGNAL_C: 10})
+        node.right = ConstantOperand(-3)
+        self.assertEqual(node.output(), {})
+        node.network = empty = Network()
+        self.assertEqual(node.output(), {})
+
+    def test_each(self):
+        node = Decision(Comparator.GREATER, self.net, Wildcard.EACH, ConstantOperand(0), Wildcard.EACH)
+        self.assertEqual(node.output(), {Signal.SIGNAL_A: 1, Signal.SIGNAL_C: 1})
+        node.output_mode = OutputMode.INPUT_COUNT
+        self.assertEqual(node.output(), {Signal.SIGNAL_A: 5, Signal.SIGNAL_C: 10})
+        node.output_signal = Signal.SIGNAL_Z
+        self.assertEqual(node.output(), {Signal.SIGNAL_Z: 15})
+        node.output_mode = OutputMode.ONE
+        self.assertEqual(node.output(), {Signal.SIGNAL_Z: 2})
+        node.right = ConstantOperand(100)
+        self.assertEqual(node.output(), {})
+
+    def test_cleared_signals_ignored(self):
+        net = Network()
+        net.update_value(Signal.SIGNAL_A, 5)
+        net.update_value(Signal.SIGNAL_B, 5)
+        net.update_value(Signal.SIGNAL_B, -5)
+        net.tick()
+        node = Decision(Comparator.EQUAL, net, Wildcard.EACH, ConstantOperand(0), Wildcard.EACH)
+        self.assertEqual(node.output(), {})
+        node.comparator = Comparator.NOT_EQUAL
+        self.assertEqual(node.output(), {Signal.SIGNAL_A: 1})
+
+    def test_dense_matches_sparse(self):
+        generator = random.Random(0)
+        for _ in range(20):
+            net = network({signal: generator.randint(-3, 3) for signal in generator.sample(SIGNALS, generator.randint(0, 100))})
+            for left, output in [(Wildcard.EACH, Wildcard.EACH), (Wildcard.EACH, Signal.SIGNAL_A), (Wildcard.ANYTHING, Wildcard.EVERYTHING), (Wildcard.EVERYTHING, Signal.SIGNAL_B)]:
+                for mode in OutputMode:
+                    node = Decision(generator.choice(list(Comparator)), net, left, ConstantOperand(generator.randint(-2, 2)), output, mode)
+                    with mock.patch.object(decision_module, "DENSE_THRESHOLD", 0):
+                        dense = node.output()
+                    with mock.patch.object(decision_module, "DENSE_THRESHOLD", len(SIGNALS)):
+                        sparse = node.output()
+                    self.assertEqual(dense, sparse)
+
+    def test_simulator(self):
+        # counts up on signal A until it reaches 3, then stops feeding back
+        net = Network()
+        out = Network()
+        node = Decision(Comparator.LESS, net, Wildcard.EACH, ConstantOperand(3), Wildcard.EACH, OutputMode.INPUT_COUNT)
+        sim = Simulator()
+        sim.add(node, out)
+        sim.set_input(net, Signal.SIGNAL_A, 2)
+        sim.set_input(net, Signal.SIGNAL_B, 7)
+        sim.run(2)
+        self.assertEqual(out.get_signal_value(Signal.SIGNAL_A), 2)
+        self.assertEqual(out.get_signal_value(Signal.SIGNAL_B), 0)
+        sim.set_input(net, Signal.SIGNAL_A, 3)
+        sim.run(2)
+        self.assertEqual(out.get_signal_value(Signal.SIGNAL_A), 0)
+
+    def test_pickle(self):
+        node = Decision(Comparator.GREATER, self.net, Wildcard.EACH, ConstantOperand(0), Wildcard.EACH)
+        copy_net, copy = pickle.loads(pickle.dumps((self.net, node)))
+        self.assertIs(copy.network, copy_net)
+        self.assertEqual(copy.output(), node.output())
+
+    def test_eq(self):
+        first = Decision(Comparator.GREATER, self.net, Signal.SIGNAL_A, output_signal=Signal.SIGNAL_B)
+        second = Decision(Comparator.GREATER, self.net, Signal.SIGNAL_A, output_signal=Signal.SIGNAL_B)
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        second.output_mode = OutputMode.INPUT_COUNT
+        self.assertNotEqual(first, second)
@@ -0,0 +1,84 @@
+import copy
+import pickle
+import unittest
+
+from processor_generator.AST.Interner import *
+from processor_generator.AST.Optimizer import merge_duplicates
+from processor_generator.AST.Simulator import Simulator
+
+
+class TestInterner(unittest.TestCase):
+    def test_hash(self):
+        net = Network()
+        self.assertEqual(hash(ConstantOperand(3)), hash(ConstantOperand(3)))
+        self.assertEqual(hash(SignalOperand(net, Signal.SIGNAL_A)), hash(SignalOperand(net, Signal.SIGNAL_A)))
+        first = Operation(NumericOperator.ADD, SignalOperand(net, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_B)
+        second = Operation(NumericOperator.ADD, SignalOperand(net, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_B)
+        self.assertEqual(len({first, second}), 1)
+        self.assertEqual(len({first, Operation(NumericOperator.ADD, SignalOperand(Network(), Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_B)}), 2)
+
+    def test_structural_key(self):
+        net = Network()
+        a, b = SignalOperand(net, Signal.SIGNAL_A), SignalOperand(net, Signal.SIGNAL_B)
+        self.assertEqual(structural_key(Operation(NumericOperator.XOR, a, b)), structural_key(Operation(NumericOperator.XOR, b, a)))
+        self.assertNotEqual(structural_key(Operation(NumericOperator.SUBTRACT, a, b)), structural_key(Operation(NumericOperator.SUBTRACT, b, a)))
+        self.assertNotEqual(structural_key(Operation(NumericOperator.ADD, a, a)), structural_key(Operation(NumericOperator.ADD, a, b)))
+
+    def test_interner(self):
+        net = Network()
+        interner = Interner()
+        self.assertIs(interner.constant(5), interner.constant(5))
+        self.assertIs(interner.signal(net, Signal.SIGNAL_A), interner.signal(net, Signal.SIGNAL_A))
+        first = interner.operation(NumericOperator.MULTIPLY, SignalOperand(net, Signal.SIGNAL_A), ConstantOperand(2), Signal.SIGNAL_B)
+        second = interner.operation(NumericOperator.MULTIPLY, ConstantOperand(2), SignalOperand(net, Signal.SIGNAL_A), Signal.SIGNAL_B)
+        self.assertIs(first, second)
+        self.assertIs(first.left, interner.signal(net, Signal.SIGNAL_A))
+        self.assertIsNot(first, interner.operation(NumericOperator.MULTIPLY, SignalOperand(net, Signal.SIGNAL_A), ConstantOperand(2), Signal.SIGNAL_C))
+        self.assertEqual(len(interner), 5)
+        interner.clear()
+        self.assertEqual(len(interner), 0)
+
+    def test_interned_operands_immutable(self):
+        a, b = Network(), Network()
+        interner = Interner()
+        first = interner.operation(NumericOperator.ADD, SignalOperand(a, Signal.SIGNAL_A), ConstantOperand(1000), Signal.SIGNAL_B)
+        second = interner.operation(NumericOperator.MULTIPLY, SignalOperand(b, Signal.SIGNAL_A), ConstantOperand(1000), Signal.SIGNAL_B)
+        self.assertIs(first.right, second.right)
+        with self.assertRaises(AttributeError):
+            first.right.constant = 7
+        with self.assertRaises(AttributeError):
+            first.left.network = b
+        with self.assertRaises(AttributeError):
+            first.left.signal = Signal.SIGNAL_C
+        self.assertEqual(second.right.constant, 1000)
+        self.assertIs(interner.signal(a, Signal.SIGNAL_A).network, a)
+        self.assertIs(interner.constant(1), ConstantOperand.shared(1))
+        # copies aren't shared and can be changed
+        operand = copy.deepcopy(first.left)
+        operand.network = b
+        self.assertEqual(operand, SignalOperand(b, Signal.SIGNAL_A))
+        operand = pickle.loads(pickle.dumps(first.right))
+        operand.constant = 7
+        first.right = interner.constant(7)
+        self.assertEqual(second.right.constant, 1000)
+
+    def test_merge_duplicates(self):
+        net, first, second, third = Network(), Network(), Network(), Network()
+        sim = Simulator()
+        make = lambda: Operation(NumericOperator.ADD, SignalOperand(net, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_B)
+        kept = make()
+        sim.add(kept, first)
+        sim.add(make(), second)
+        sim.add(make(), third)
+        # writing into the same network twice doubles the value, so it is no duplicate
+        sim.add(make(), first)
+        sim.set_input(net, Signal.SIGNAL_A, 4)
+        merged, count = merge_duplicates(sim)
+        self.assertEqual(count, 2)
+        self.assertEqual(len(merged.nodes), 2)
+        self.assertEqual(merged.outputs(kept), [first, second, third])
+        merged.run(3)
+        self.assertEqual([network.get_signal_value(Signal.SIGNAL_B) for network in (first, second, third)], [10, 5, 5])
+        merged, count = merge_duplicates(sim, max_outputs=2)
+        self.assertEqual(count, 2)
+        self.assertTrue(all(len(merged.outputs(node)) <= 2 for node in merged.nodes))
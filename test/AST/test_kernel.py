@@ -0,0 +1,115 @@
+import random
+import unittest
+
+import numpy as np
+
+from processor_generator.AST.Kernel import *
+from processor_generator.AST.ASTNode import ASTNode
+
+
+def random_design(seed: int):
+    rng = random.Random(seed)
+    networks = [Network() for _ in range(10)]
+    signals = [Signal.SIGNAL_A, Signal.SIGNAL_B, Signal.SIGNAL_C]
+    sim = Simulator()
+    for _ in range(40):
+        def operand():
+            if rng.random() < 0.3:
+                return ConstantOperand(rng.randrange(-100, 100))
+            return SignalOperand(rng.choice(networks), rng.choice(signals))
+        outputs = rng.sample(networks, rng.randrange(1, 3))
+        output_signal = rng.choice(signals) if rng.random() < 0.95 else None
+        sim.add(Operation(rng.choice(list(NumericOperator)), operand(), operand(), output_signal), *outputs)
+    return rng, networks, signals, sim
+
+
+class TestKernel(unittest.TestCase):
+    def test_matches_simulator(self):
+        rng, networks, signals, sim = random_design(3)
+        sim.set_input(networks[0], Signal.SIGNAL_A, 17)
+        sim.add_constant_input(networks[0], Signal.SIGNAL_A, 4)
+        sim.run(3)
+        kernel = Kernel(sim)
+        self.assertEqual(kernel.tick_count, 3)
+        for tick in range(50):
+            if tick % 5 == 0:
+                network, signal, value = rng.choice(networks), rng.choice(signals), rng.randrange(-9, 9)
+                sim.set_input(network, signal, value)
+                kernel.set_input(network, signal, value)
+            sim.tick()
+            kernel.tick()
+            for network in networks:
+                self.assertEqual(kernel.state(network).tolist(), network.previous_values.tolist())
+                for signal in signals:
+                    self.assertEqual(kernel.get_signal_value(network, signal), network.get_signal_value(signal))
+
+    def test_write_back(self):
+        _, networks, _, sim = random_design(4)
+        kernel = Kernel(sim)
+        kernel.run(10)
+        sim.run(10)
+        expected = [dict(network._previous_state) for network in networks]
+        for network in networks:
+            network.tick()
+            network.tick()
+        kernel.write_back()
+        self.assertEqual([dict(network._previous_state) for network in networks], expected)
+        self.assertEqual([dict(network._current_state) for network in networks], expected)
+
+    def test_constants_and_groups(self):
+        net = Network()
+        sim = Simulator()
+        sim.add(Operation(NumericOperator.ADD, ConstantOperand(2**32 + 1), ConstantOperand(1), Signal.SIGNAL_A), net)
+        sim.add(Operation(NumericOperator.XOR, ConstantOperand(1), ConstantOperand(3), Signal.SIGNAL_A), net)
+        sim.add(Operation(NumericOperator.ADD, ConstantOperand(1), ConstantOperand(5), Signal.SIGNAL_B), net)
+        kernel = Kernel(sim)
+        self.assertEqual(kernel.groups, [(NumericOperator.ADD, 0, 2), (NumericOperator.XOR, 2, 3)])
+        kernel.tick()
+        self.assertEqual(kernel.get_signal_value(net, Signal.SIGNAL_A), 4)
+        self.assertEqual(kernel.get_signal_value(net, Signal.SIGNAL_B), 6)
+
+    def test_unsupported(self):
+        class Other(ASTNode):
+            def output(self):
+                return {}
+
+        sim = Simulator()
+        sim.add(Other('other'), Network())
+        with self.assertRaises(ValueError):
+            Kernel(sim)
+        sim = Simulator()
+        sim.add(Operation(NumericOperator.ADD, SignalOperand(Network(), Signal.SIGNAL_A)), Network())
+        with self.assertRaises(ValueError):
+            Kernel(sim)
+
+    def test_lanes(self):
+        rng, networks, signals, sim = random_design(5)
+        with self.assertRaises(ValueError):
+            Kernel(sim, 0)
+        lanes = Kernel(sim, 4)
+        singles = [Kernel(sim) for _ in range(4)]
+        for lane, single in enumerate(singles):
+            state = np.zeros(SIGNAL_COUNT, dtype=np.int64)
+            state[Signal.SIGNAL_B.index] = lane * 3
+            lanes.load(networks[1], state, lane)
+            single.load(networks[1], state)
+        lanes.set_input(networks[2], Signal.SIGNAL_C, [1, 2, 3, 4])
+        for lane, single in enumerate(singles):
+            single.set_input(networks[2], Signal.SIGNAL_C, lane + 1)
+        for tick in range(30):
+            if tick == 10:
+                lanes.set_input(networks[0], Signal.SIGNAL_A, -7, lane=2)
+                singles[2].set_input(networks[0], Signal.SIGNAL_A, -7)
+            lanes.tick()
+            for single in singles:
+                single.tick()
+            for network in networks:
+                for lane, single in enumerate(singles):
+                    self.assertEqual(lanes.state(network, lane).tolist(), single.state(network).tolist())
+                for signal in signals:
+                    self.assertEqual(
+                        lanes.get_signal_values(network, signal).tolist(),
+                        [single.get_signal_value(network, signal) for single in singles]
+                    )
+        lanes.write_back(3)
+        self.assertEqual(networks[4].previous_values.tolist(), singles[3].state(networks[4]).tolist())
@@ -1,4 +1,6 @@
+import numpy as np
 from processor_generator.AST.Network import *
+from processor_generator.AST.Signal import SIGNAL_COUNT
 import unittest
 
 
@@ -39,3 +41,98 @@ class TestNetwork(unittest.TestCase):
         self.assertEqual(net.get_signal_value(Signal.SIGNAL_A), 30)
         self.assertEqual(net.get_signal_value(Signal.ADVANCED_CIRCUIT), 500)
 
+    def test_get_signal_does_not_insert(self):
+        net = Network()
+        net.get_signal_value(Signal.SIGNAL_A)
+        self.assertEqual(net._previous_state, {})
+
+    def test_wrap_around(self):
+        net = Network()
+        net.update_value(Signal.SIGNAL_A, 2**31 - 1)
+        net.update_value(Signal.SIGNAL_A, 1)
+        self.assertEqual(net._current_state[Signal.SIGNAL_A], -2**31)
+        net._current_state[Signal.SIGNAL_B] = 2**32 + 5
+        self.assertEqual(net._current_state[Signal.SIGNAL_B], 5)
+
+    def test_tick_swaps_buffers(self):
+        net = Network()
+        previous, current = net._previous, net._current
+        net.update_value(Signal.SIGNAL_A, 3)
+        net.tick()
+        self.assertIs(net._previous, current)
+        self.assertIs(net._current, previous)
+        net.tick()
+        self.assertEqual(net.get_signal_value(Signal.SIGNAL_A), 0)
+        self.assertEqual(net._previous_state, {})
+        self.assertEqual(net._current_state, {})
+
+    def test_state_view(self):
+        net = Network()
+        view = net._current_state
+        view[Signal.SIGNAL_B] = 2
+        view[Signal.SIGNAL_A] = 1
+        view[Signal.SIGNAL_C] = 0
+        self.assertEqual(len(view), 2)
+        self.assertEqual(dict(view), {Signal.SIGNAL_A: 1, Signal.SIGNAL_B: 2})
+        self.assertEqual(list(view), [Signal.SIGNAL_A, Signal.SIGNAL_B])
+        del view[Signal.SIGNAL_B]
+        with self.assertRaises(KeyError):
+            view[Signal.SIGNAL_B]
+        with self.assertRaises(KeyError):
+            del view[Signal.SIGNAL_B]
+        self.assertEqual(view.get(Signal.SIGNAL_C, 0), 0)
+        self.assertEqual(repr(view), 'SignalsView({<Signal.SIGNAL_A: \'signal-A\'>: 1})')
+
+    def test_values(self):
+        net = Network()
+        net.update_value(Signal.SIGNAL_A, 7)
+        self.assertEqual(net.current_values.dtype, np.int32)
+        self.assertEqual(net.current_values[Signal.SIGNAL_A.index], 7)
+        net.tick()
+        self.assertEqual(net.previous_values.tolist().count(7), 1)
+        self.assertEqual(net.previous_values.shape, (SIGNAL_COUNT,))
+
+    def test_tick_without_clear(self):
+        net = Network()
+        net.update_value(Signal.SIGNAL_A, 4)
+        net.tick(clear=False)
+        self.assertEqual(net.get_signal_value(Signal.SIGNAL_A), 4)
+        self.assertEqual(net._current_state[Signal.SIGNAL_A], 4)
+        net.update_value(Signal.SIGNAL_A, -4)
+        net.tick(clear=False)
+        self.assertEqual(net._previous_state, {})
+
+    def test_load(self):
+        net = Network()
+        values = np.zeros(SIGNAL_COUNT, dtype=np.int64)
+        values[Signal.SIGNAL_B.index] = 2**31
+        net.load(values)
+        self.assertEqual(dict(net._previous_state), {Signal.SIGNAL_B: -2**31})
+        self.assertEqual(dict(net._current_state), {Signal.SIGNAL_B: -2**31})
+        current = np.zeros(SIGNAL_COUNT, dtype=np.int64)
+        current[Signal.SIGNAL_C.index] = 3
+        net.load(values, current)
+        self.assertEqual(dict(net._previous_state), {Signal.SIGNAL_B: -2**31})
+        self.assertEqual(dict(net._current_state), {Signal.SIGNAL_C: 3})
+
+    def test_state_hash(self):
+        net = Network()
+        self.assertEqual(net.state_hash, 0)
+        net.update_value(Signal.SIGNAL_A, 10)
+        net.update_value(Signal.SIGNAL_B, -(1 << 31))
+        net.update_value(Signal.SIGNAL_B, -1)
+        self.assertEqual(net.state_hash, 0)
+        net.tick(clear=False)
+        self.assertEqual(net.state_hash, hash_state(net.previous_values))
+        self.assertNotEqual(net.state_hash, 0)
+        net.update_value(Signal.SIGNAL_A, -10)
+        net.tick()
+        self.assertEqual(net.state_hash, hash_state(net.previous_values))
+        net.tick()
+        self.assertEqual(net.state_hash, 0)
+        net._previous_state[Signal.SIGNAL_C] = 3
+        self.assertEqual(net.state_hash, hash_state(net.previous_values))
+        del net._previous_state[Signal.SIGNAL_C]
+        self.assertEqual(net.state_hash, 0)
+        net.load(np.arange(SIGNAL_COUNT))
+        self.assertEqual(net.state_hash, hash_state(np.arange(SIGNAL_COUNT)))
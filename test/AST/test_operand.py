@@ -1,3 +1,5 @@
+import copy
+import pickle
 import unittest
 
 from processor_generator.AST.Operand import *
@@ -62,3 +64,16 @@ class TestConstantOperand(unittest.TestCase):
         self.assertNotEqual(op1, op3)
         op2.constant = 10
         self.assertEqual(op1, op2)
+
+    def test_shared(self):
+        self.assertIs(ConstantOperand.shared(1), ConstantOperand.shared(1))
+        self.assertEqual(ConstantOperand.shared(1), ConstantOperand(1))
+        self.assertIsNot(ConstantOperand.shared(1 << 20), ConstantOperand.shared(1 << 20))
+        shared = ConstantOperand.shared(0)
+        with self.assertRaises(AttributeError):
+            shared.constant = 7
+        self.assertEqual(shared.constant, 0)
+        self.assertIs(pickle.loads(pickle.dumps(shared)), shared)
+        self.assertIs(copy.deepcopy(shared), shared)
+        self.assertFalse(hasattr(ConstantOperand(1), "__dict__"))
+        self.assertFalse(hasattr(SignalOperand(Network(), Signal.SIGNAL_A), "__dict__"))
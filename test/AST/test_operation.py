@@ -1,6 +1,10 @@
 import unittest
 
+import numpy as np
+
 from processor_generator.AST.Operation import *
+from processor_generator.AST.Operand import SignalOperand
+from processor_generator.AST.Network import Network
 
 
 class TestOperation(unittest.TestCase):
@@ -9,6 +13,11 @@ class TestOperation(unittest.TestCase):
         self.assertEqual(op.operation, NumericOperator.OR)
         self.assertEqual(op.left, ConstantOperand(0))
         self.assertEqual(op.right, ConstantOperand(0))
+        self.assertFalse(hasattr(op, "__dict__"))
+        # the default operands are shared, so they can't be changed through one operation
+        with self.assertRaises(AttributeError):
+            op.left.constant = 7
+        self.assertEqual(Operation(NumericOperator.ADD).right, ConstantOperand(0))
 
     def test_eq(self):
         op1 = Operation(NumericOperator.OR)
@@ -23,3 +32,82 @@ class TestOperation(unittest.TestCase):
         self.assertNotEqual(op1, op2)
         op2.right = ConstantOperand(0)
         self.assertEqual(op1, op2)
+
+    def test_output(self):
+        op = Operation(NumericOperator.ADD, ConstantOperand(2), ConstantOperand(3))
+        self.assertEqual(op.output(), {})
+        op.output_signal = Signal.SIGNAL_A
+        self.assertEqual(op.output(), {Signal.SIGNAL_A: 5})
+        op.operation = NumericOperator.MULTIPLY
+        self.assertEqual(op.output(), {Signal.SIGNAL_A: 6})
+
+    def test_signal_operand(self):
+        net = Network()
+        op = Operation(NumericOperator.SUBTRACT, SignalOperand(net, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_B)
+        net.update_value(Signal.SIGNAL_A, 10)
+        net.tick()
+        self.assertEqual(op.output(), {Signal.SIGNAL_B: 9})
+
+    def test_semantics(self):
+        cases = [
+            (NumericOperator.ADD, 2**31 - 1, 1, -2**31),
+            (NumericOperator.SUBTRACT, -2**31, 1, 2**31 - 1),
+            (NumericOperator.MULTIPLY, 2**16, 2**16, 0),
+            (NumericOperator.MULTIPLY, -3, 5, -15),
+            (NumericOperator.DIVIDE, 7, 2, 3),
+            (NumericOperator.DIVIDE, -7, 2, -3),
+            (NumericOperator.DIVIDE, 7, -2, -3),
+            (NumericOperator.DIVIDE, 7, 0, 0),
+            (NumericOperator.DIVIDE, -2**31, -1, -2**31),
+            (NumericOperator.MODULO, 7, 3, 1),
+            (NumericOperator.MODULO, -7, 3, -1),
+            (NumericOperator.MODULO, 7, -3, 1),
+            (NumericOperator.MODULO, 7, 0, 0),
+            (NumericOperator.EXPONENT, 2, 10, 1024),
+            (NumericOperator.EXPONENT, 2, 31, -2**31),
+            (NumericOperator.EXPONENT, -3, 3, -27),
+            (NumericOperator.EXPONENT, 0, 0, 1),
+            (NumericOperator.EXPONENT, 2, -1, 0),
+            (NumericOperator.LEFT_BIT_SHIFT, 1, 31, -2**31),
+            (NumericOperator.LEFT_BIT_SHIFT, 1, 32, 1),
+            (NumericOperator.LEFT_BIT_SHIFT, 3, -31, 6),
+            (NumericOperator.RIGHT_BIT_SHIFT, -8, 1, -4),
+            (NumericOperator.RIGHT_BIT_SHIFT, 8, 33, 4),
+            (NumericOperator.AND, -1, 12, 12),
+            (NumericOperator.OR, 5, 2, 7),
+            (NumericOperator.XOR, -1, 1, -2),
+        ]
+        for operator, left, right, expected in cases:
+            with self.subTest(operator=operator, left=left, right=right):
+                op = Operation(operator, ConstantOperand(left), ConstantOperand(right))
+                self.assertEqual(op.evaluate(), expected)
+                self.assertEqual(evaluate_many(operator, [left], [right]).tolist(), [expected])
+
+    def test_wide_operands(self):
+        for operator in NumericOperator:
+            for left, right in [(2**32 + 5, 3), (-2**33 - 1, 2**31), (2**40 + 12, -2**35 + 1)]:
+                with self.subTest(operator=operator, left=left, right=right):
+                    op = Operation(operator, ConstantOperand(left), ConstantOperand(right), Signal.SIGNAL_A)
+                    expected = evaluate_many(operator, [left], [right]).tolist()
+                    self.assertEqual([op.evaluate()], expected)
+                    self.assertEqual(op.output(), {Signal.SIGNAL_A: expected[0]})
+
+    def test_evaluate_many(self):
+        rng = np.random.default_rng(0)
+        left = rng.integers(-2**31, 2**31, 500)
+        right = np.concatenate([rng.integers(-2**31, 2**31, 400), rng.integers(-40, 40, 100)])
+        for operator in NumericOperator:
+            with self.subTest(operator=operator):
+                result = evaluate_many(operator, left, right)
+                self.assertEqual(result.dtype, np.int32)
+                self.assertEqual(
+                    result.tolist(),
+                    [OPERATIONS[operator](int(l), int(r)) for l, r in zip(left, right)]
+                )
+
+    def test_evaluate_all(self):
+        ops = [Operation(NumericOperator.DIVIDE, ConstantOperand(i), ConstantOperand(3)) for i in range(-5, 5)]
+        self.assertEqual(Operation.evaluate_all(ops).tolist(), [op.evaluate() for op in ops])
+        self.assertEqual(Operation.evaluate_all([]).tolist(), [])
+        with self.assertRaises(ValueError):
+            Operation.evaluate_all([*ops, Operation(NumericOperator.ADD)])
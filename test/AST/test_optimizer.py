@@ -0,0 +1,144 @@
+import unittest
+
+from processor_generator.AST.Optimizer import *
+from processor_generator.AST.Decision import Decision, Comparator
+from processor_generator.AST.Interner import Interner
+from processor_generator.AST.Signal import Signal
+from processor_generator.AST.Network import Network
+from processor_generator.AST.Operand import SignalOperand, ConstantOperand
+from processor_generator.AST.Operation import Operation, NumericOperator
+from processor_generator.AST.Simulator import Simulator
+
+
+def add(sim, operator, left, right, output, *networks):
+    node = Operation(operator, left, right, output)
+    sim.add(node, *networks)
+    return node
+
+
+class TestOptimizer(unittest.TestCase):
+    def test_constant_result(self):
+        self.assertEqual(constant_result(Operation(NumericOperator.MULTIPLY, ConstantOperand(3), ConstantOperand(2**31))), -2**31)
+        self.assertEqual(constant_result(Operation(NumericOperator.DIVIDE, SignalOperand(Network(), Signal.SIGNAL_A), ConstantOperand(0))), 0)
+        self.assertEqual(constant_result(Operation(NumericOperator.AND, ConstantOperand(0), SignalOperand(Network(), Signal.SIGNAL_A))), 0)
+        self.assertIsNone(constant_result(Operation(NumericOperator.SUBTRACT, ConstantOperand(0), SignalOperand(Network(), Signal.SIGNAL_A))))
+
+    def test_identity_source(self):
+        net = Network()
+        operand = SignalOperand(net, Signal.SIGNAL_A)
+        self.assertIs(identity_source(Operation(NumericOperator.LEFT_BIT_SHIFT, operand, ConstantOperand(32))), operand)
+        self.assertIs(identity_source(Operation(NumericOperator.MULTIPLY, ConstantOperand(1), operand)), operand)
+        self.assertIsNone(identity_source(Operation(NumericOperator.SUBTRACT, ConstantOperand(0), operand)))
+        self.assertIsNone(identity_source(Operation(NumericOperator.ADD, operand, ConstantOperand(1))))
+
+    def test_fold(self):
+        out = Network()
+        sim = Simulator()
+        add(sim, NumericOperator.ADD, ConstantOperand(2), ConstantOperand(3), Signal.SIGNAL_A, out)
+        add(sim, NumericOperator.MULTIPLY, ConstantOperand(2), ConstantOperand(4), Signal.SIGNAL_A, out)
+        add(sim, NumericOperator.MULTIPLY, SignalOperand(out, Signal.SIGNAL_A), ConstantOperand(0), Signal.SIGNAL_B, out)
+        sim.set_input(out, Signal.SIGNAL_A, 1)
+        optimized, report = optimize(sim, [out])
+        self.assertEqual(report, OptimizationReport(3, 0, 3, 0, 0))
+        self.assertEqual(optimized.inputs, {(out, Signal.SIGNAL_A): 1})
+        self.assertEqual(optimized.constant_inputs, {(out, Signal.SIGNAL_A): 13})
+        optimized.run(2)
+        self.assertEqual(out.get_signal_value(Signal.SIGNAL_A), 14)
+        # the input is still added to the folded combinators, like in the original
+        optimized.set_input(out, Signal.SIGNAL_A, 5)
+        optimized.run(2)
+        self.assertEqual(out.get_signal_value(Signal.SIGNAL_A), 18)
+
+    def test_only_before_running(self):
+        sim = Simulator()
+        add(sim, NumericOperator.ADD, ConstantOperand(2), ConstantOperand(3), Signal.SIGNAL_A, Network())
+        sim.tick()
+        with self.assertRaises(ValueError):
+            optimize(sim, [])
+        with self.assertRaises(ValueError):
+            merge_duplicates(sim)
+
+    def test_identity(self):
+        source, middle, out = Network(), Network(), Network()
+        sim = Simulator()
+        add(sim, NumericOperator.ADD, SignalOperand(source, Signal.SIGNAL_A), ConstantOperand(0), Signal.SIGNAL_B, middle)
+        reader = add(sim, NumericOperator.MULTIPLY, SignalOperand(middle, Signal.SIGNAL_B), ConstantOperand(3), Signal.SIGNAL_C, out)
+        sim.set_input(source, Signal.SIGNAL_A, 5)
+        optimized, report = optimize(sim, [out])
+        self.assertEqual((report.identities, report.removed), (1, 1))
+        self.assertEqual(optimized.nodes[0].left, SignalOperand(source, Signal.SIGNAL_A))
+        # the design itself is left alone
+        self.assertEqual(reader.left, SignalOperand(middle, Signal.SIGNAL_B))
+        self.assertEqual(optimized.networks, [source, out])
+        self.assertEqual(len(source.dependants), 1)
+        # one tick less than through the identity
+        optimized.run(2)
+        self.assertEqual(out.get_signal_value(Signal.SIGNAL_C), 15)
+
+    def test_interned_operands_unchanged(self):
+        interner = Interner()
+        source, middle, out, other = Network(), Network(), Network(), Network()
+        sim = Simulator()
+        sim.add(interner.operation(NumericOperator.ADD, SignalOperand(source, Signal.SIGNAL_A), ConstantOperand(0), Signal.SIGNAL_B), middle)
+        first = interner.operation(NumericOperator.MULTIPLY, SignalOperand(middle, Signal.SIGNAL_B), ConstantOperand(3), Signal.SIGNAL_C)
+        second = interner.operation(NumericOperator.SUBTRACT, SignalOperand(middle, Signal.SIGNAL_B), ConstantOperand(3), Signal.SIGNAL_C)
+        self.assertIs(first.left, second.left)
+        sim.add(first, out)
+        sim.add(second, other)
+        optimized, report = optimize(sim, [out, other])
+        self.assertEqual(report.identities, 1)
+        self.assertEqual(second.left, SignalOperand(middle, Signal.SIGNAL_B))
+        self.assertIs(interner.signal(middle, Signal.SIGNAL_B), first.left)
+        self.assertIs(interner.operation(NumericOperator.MULTIPLY, SignalOperand(middle, Signal.SIGNAL_B), ConstantOperand(3), Signal.SIGNAL_C), first)
+        optimized.set_input(source, Signal.SIGNAL_A, 5)
+        optimized.run(2)
+        self.assertEqual((out.get_signal_value(Signal.SIGNAL_C), other.get_signal_value(Signal.SIGNAL_C)), (15, 2))
+
+    def test_identity_kept(self):
+        source, middle, out = Network(), Network(), Network()
+        sim = Simulator()
+        add(sim, NumericOperator.ADD, SignalOperand(source, Signal.SIGNAL_A), ConstantOperand(0), Signal.SIGNAL_B, middle)
+        # the identity is not the only writer of the middle network
+        add(sim, NumericOperator.ADD, SignalOperand(source, Signal.SIGNAL_B), ConstantOperand(1), Signal.SIGNAL_B, middle)
+        add(sim, NumericOperator.MULTIPLY, SignalOperand(middle, Signal.SIGNAL_B), ConstantOperand(3), Signal.SIGNAL_C, out)
+        self.assertEqual(optimize(sim, [out])[1].identities, 0)
+        self.assertEqual(optimize(sim, [out, middle], identities=False)[1].removed, 0)
+
+    def test_identity_read_by_other_node(self):
+        source, middle, out = Network(), Network(), Network()
+        sim = Simulator()
+        add(sim, NumericOperator.ADD, SignalOperand(source, Signal.SIGNAL_A), ConstantOperand(0), Signal.SIGNAL_A, middle)
+        sim.add(Decision(Comparator.GREATER, middle, Signal.SIGNAL_A, output_signal=Signal.SIGNAL_B), out)
+        sim.set_input(source, Signal.SIGNAL_A, 5)
+        optimized, report = optimize(sim, [out])
+        self.assertEqual(report.identities, 0)
+        optimized.run(5)
+        self.assertEqual(out.get_signal_value(Signal.SIGNAL_B), 1)
+
+    def test_dead(self):
+        counter, unused, out = Network(), Network(), Network()
+        sim = Simulator()
+        # a counter only read by a dead loop, and a live path into out
+        add(sim, NumericOperator.ADD, SignalOperand(counter, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_A, counter)
+        add(sim, NumericOperator.XOR, SignalOperand(counter, Signal.SIGNAL_A), SignalOperand(unused, Signal.SIGNAL_B), Signal.SIGNAL_B, unused)
+        add(sim, NumericOperator.SUBTRACT, SignalOperand(counter, Signal.SIGNAL_A), ConstantOperand(1), None, out)
+        sim.set_input(unused, Signal.SIGNAL_C, 1)
+        optimized, report = optimize(sim, [out])
+        self.assertEqual(report, OptimizationReport(3, 0, 0, 0, 3))
+        self.assertEqual(optimized.inputs, {})
+        optimized, report = optimize(sim, [counter])
+        self.assertEqual(report.dead, 2)
+        self.assertEqual(len(optimized.nodes), 1)
+
+    def test_same_results(self):
+        from processor_generator.benchmark import synthetic_design
+        sim = synthetic_design(300, seed=3)
+        expected = synthetic_design(300, seed=3)
+        keep = sim.networks[:5]
+        optimized, report = optimize(sim, keep, identities=False)
+        self.assertLessEqual(len(optimized.nodes), 300)
+        self.assertEqual(report.before, 300)
+        expected.run(20)
+        optimized.run(20)
+        for network, reference in zip(keep, expected.networks[:5]):
+            self.assertEqual(dict(network._previous_state), dict(reference._previous_state))
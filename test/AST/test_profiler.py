@@ -0,0 +1,95 @@
+import io
+import pickle
+import unittest
+
+from processor_generator.AST.Profiler import *
+from processor_generator.AST.Network import Network
+from processor_generator.AST.Operand import ConstantOperand
+from processor_generator.AST.Operation import Operation, NumericOperator
+from processor_generator.AST.Signal import Signal
+
+from test.designs import counter
+
+
+def design():
+    """
+    The counter and a node that never sees a change
+    """
+    sim, _, _, counter_node, double = counter()
+    constant = Operation(NumericOperator.ADD, ConstantOperand(1), ConstantOperand(2), Signal.SIGNAL_C)
+    sim.add(constant, Network())
+    return sim, (counter_node, double, constant)
+
+
+class TestProfiler(unittest.TestCase):
+    def test_counts(self):
+        sim, (counter, double, constant) = design()
+        profiler = Profiler(sim)
+        sim.set_input(sim.networks[0], Signal.SIGNAL_D, 5)
+        sim.run(10)
+        self.assertEqual(profiler.ticks, 10)
+        self.assertEqual(profiler.evaluations, [10, 10, 1])
+        # the counter and the input on the first network, the doubled counter after
+        self.assertEqual(profiler.updates, [11, 9, 1])
+        self.assertEqual(profiler.active_signals, [2, 1, 1])
+        self.assertEqual(profiler.peak_active_signals, [2, 1, 1])
+        self.assertGreaterEqual(profiler.tick_time, profiler.max_tick_time)
+        self.assertGreater(profiler.max_tick_time, 0)
+
+    def test_same_results(self):
+        plain, _ = design()
+        profiled, _ = design()
+        Profiler(profiled)
+        plain.run(20)
+        profiled.run(20)
+        for left, right in zip(plain.networks, profiled.networks):
+            self.assertEqual(dict(left._previous_state), dict(right._previous_state))
+
+    def test_detach(self):
+        sim, _ = design()
+        profiler = Profiler(sim)
+        sim.run(2)
+        profiler.detach()
+        self.assertIsNone(sim.profiler)
+        sim.run(2)
+        self.assertEqual(profiler.ticks, 2)
+
+    def test_hot_nodes(self):
+        sim, (counter, double, constant) = design()
+        profiler = Profiler(sim)
+        sim.run(5)
+        profiler.evaluation_time = [10, 30, 20]
+        self.assertEqual(
+            [(cost.node, cost.evaluations, cost.time) for cost in profiler.hot_nodes()],
+            [(double, 5, 30), (constant, 1, 20), (counter, 5, 10)],
+        )
+        self.assertEqual(len(profiler.hot_nodes(1)), 1)
+        report = profiler.report().splitlines()
+        self.assertTrue(report[0].startswith("5 ticks"))
+        self.assertTrue(report[2].split()[0] == "1")
+
+    def test_flamegraph(self):
+        sim, _ = design()
+        profiler = Profiler(sim)
+        sim.run(3)
+        output = io.StringIO()
+        profiler.write_flamegraph(output)
+        lines = output.getvalue().splitlines()
+        self.assertIn("tick;evaluate;Operation #1", [line.rsplit(" ", 1)[0] for line in lines])
+        total = sum(int(line.rsplit(" ", 1)[1]) for line in lines)
+        self.assertEqual(total, profiler.tick_time)
+
+    def test_new_nodes(self):
+        sim, _ = design()
+        profiler = Profiler(sim)
+        sim.run(1)
+        net = Network()
+        sim.add(Operation(NumericOperator.ADD, ConstantOperand(1), ConstantOperand(1), Signal.SIGNAL_A), net)
+        sim.run(1)
+        self.assertEqual(profiler.evaluations[3], 1)
+        self.assertEqual(len(profiler.updates), 4)
+
+    def test_pickle(self):
+        sim, _ = design()
+        Profiler(sim)
+        self.assertIsNone(pickle.loads(pickle.dumps(sim)).profiler)
@@ -0,0 +1,248 @@
+import pickle
+import random
+import time
+import unittest
+from unittest import mock
+
+from processor_generator.AST import Simulator as simulator_module
+from processor_generator.AST.Simulator import *
+from processor_generator.AST.Operation import Operation, NumericOperator
+from processor_generator.AST.Operand import SignalOperand, ConstantOperand
+
+from test.designs import counter
+
+
+class TestSimulator(unittest.TestCase):
+    def test_add(self):
+        sim, net, derived, node, derive = counter()
+        self.assertEqual(sim.nodes, [node, derive])
+        self.assertEqual(sim.networks, [net, derived])
+        self.assertEqual(sim.network_position(derived), 1)
+        self.assertIs(net.depends[0](), node)
+        self.assertIs(net.dependants[0](), node)
+        with self.assertRaises(ValueError):
+            sim.add(node, net)
+
+    def test_shared_network(self):
+        bus = Network()
+        sim = Simulator()
+        readers = [Operation(NumericOperator.ADD, SignalOperand(bus, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_B) for _ in range(10000)]
+        start = time.perf_counter()
+        for reader in readers:
+            sim.add(reader, bus, bus)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(len(bus.dependants), 10000)
+        self.assertEqual(len(bus.depends), 10000)
+        self.assertEqual(sim.readers(bus), readers)
+
+    def test_counter(self):
+        sim, net, _, _, _ = counter()
+        for expected in range(1, 10):
+            sim.tick()
+            self.assertEqual(net.get_signal_value(Signal.SIGNAL_A), expected)
+        self.assertEqual(sim.tick_count, 9)
+
+    def test_delay(self):
+        first, second, third = Network(), Network(), Network()
+        sim = Simulator()
+        sim.add(Operation(NumericOperator.MULTIPLY, SignalOperand(first, Signal.SIGNAL_A), ConstantOperand(2), Signal.SIGNAL_B), second)
+        sim.add(Operation(NumericOperator.ADD, SignalOperand(second, Signal.SIGNAL_B), ConstantOperand(1), Signal.SIGNAL_C), third)
+        sim.tick()
+        self.assertEqual(third.get_signal_value(Signal.SIGNAL_C), 1)
+        sim.set_input(first, Signal.SIGNAL_A, 5)
+        sim.tick()
+        self.assertEqual(first.get_signal_value(Signal.SIGNAL_A), 5)
+        self.assertEqual(second.get_signal_value(Signal.SIGNAL_B), 0)
+        sim.tick()
+        self.assertEqual(second.get_signal_value(Signal.SIGNAL_B), 10)
+        self.assertEqual(third.get_signal_value(Signal.SIGNAL_C), 1)
+        sim.tick()
+        self.assertEqual(third.get_signal_value(Signal.SIGNAL_C), 11)
+        self.assertEqual(sim.changed, [third])
+        self.assertTrue(sim.idle)
+        sim.tick()
+        self.assertEqual(sim.changed, [])
+        sim.set_input(first, Signal.SIGNAL_A, 0)
+        sim.run(3)
+        self.assertEqual(third.get_signal_value(Signal.SIGNAL_C), 1)
+
+    def test_constant_inputs(self):
+        net = Network()
+        sim = Simulator()
+        sim.add_constant_input(net, Signal.SIGNAL_A, 3)
+        sim.add_constant_input(net, Signal.SIGNAL_A, 4)
+        sim.set_input(net, Signal.SIGNAL_A, 10)
+        sim.tick()
+        self.assertEqual(net.get_signal_value(Signal.SIGNAL_A), 17)
+        sim.set_input(net, Signal.SIGNAL_A, 0)
+        sim.tick()
+        self.assertEqual(net.get_signal_value(Signal.SIGNAL_A), 7)
+        self.assertEqual(sim.inputs, {(net, Signal.SIGNAL_A): 0})
+        self.assertEqual(sim.constant_inputs, {(net, Signal.SIGNAL_A): 7})
+
+    def test_only_changed_nodes_evaluated(self):
+        evaluations = []
+
+        class Counting(Operation):
+            def output(self):
+                evaluations.append(self)
+                return super().output()
+
+        source, target = Network(), Network()
+        sim = Simulator()
+        sim.add(Counting(NumericOperator.ADD, SignalOperand(source, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_A), target)
+        sim.run(5)
+        self.assertEqual(len(evaluations), 1)
+        sim.set_input(source, Signal.SIGNAL_A, 2)
+        sim.run(5)
+        self.assertEqual(len(evaluations), 2)
+
+    def test_matches_full_sweep(self):
+        rng = random.Random(1)
+        networks = [Network() for _ in range(8)]
+        reference = [Network() for _ in range(8)]
+        signals = [Signal.SIGNAL_A, Signal.SIGNAL_B, Signal.SIGNAL_C]
+        sim = Simulator()
+        wiring = []
+        for _ in range(20):
+            operator = rng.choice(list(NumericOperator))
+            left, right, output = rng.randrange(8), rng.randrange(8), rng.randrange(8)
+            left_signal, right_signal, output_signal = (rng.choice(signals) for _ in range(3))
+            wiring.append((operator, left, left_signal, right, right_signal, output, output_signal))
+            sim.add(Operation(operator, SignalOperand(networks[left], left_signal), SignalOperand(networks[right], right_signal), output_signal), networks[output])
+        reference_nodes = [
+            (Operation(operator, SignalOperand(reference[left], left_signal), SignalOperand(reference[right], right_signal), output_signal), output)
+            for operator, left, left_signal, right, right_signal, output, output_signal in wiring
+        ]
+        inputs = {}
+        for tick in range(60):
+            if tick % 7 == 0:
+                key = (rng.randrange(8), rng.choice(signals))
+                inputs[key] = rng.randrange(-50, 50)
+                sim.set_input(networks[key[0]], key[1], inputs[key])
+            sim.tick()
+            outputs = [(node.output(), output) for node, output in reference_nodes]
+            for values, output in outputs:
+                for signal, value in values.items():
+                    reference[output].update_value(signal, value)
+            for (network, signal), value in inputs.items():
+                reference[network].update_value(signal, value)
+            for network in reference:
+                network.tick()
+            for network, expected in zip(networks, reference):
+                self.assertEqual(dict(network._previous_state), dict(expected._previous_state))
+
+    def test_pickle(self):
+        sim, net, _, _, _ = counter()
+        sim.run(3)
+        copy = pickle.loads(pickle.dumps(sim))
+        copy_net = copy.networks[0]
+        self.assertIs(copy.nodes[0].left.network, copy_net)
+        self.assertIs(copy_net.depends[0](), copy.nodes[0])
+        self.assertEqual(copy.outputs(copy.nodes[0]), [copy_net])
+        copy.run(2)
+        self.assertEqual(copy_net.get_signal_value(Signal.SIGNAL_A), 5)
+        self.assertEqual(net.get_signal_value(Signal.SIGNAL_A), 3)
+
+    def test_compact_edges(self):
+        sim, net, _, node, derive = counter(compact_edges=True)
+        out = Network()
+        reader = Operation(NumericOperator.MULTIPLY, SignalOperand(net, Signal.SIGNAL_A), SignalOperand(net, Signal.SIGNAL_B), Signal.SIGNAL_B)
+        sim.add(reader, out, out)
+        self.assertEqual(net._depends, [])
+        self.assertEqual(net._dependants, [])
+        self.assertEqual([ref() for ref in net.depends], [node])
+        self.assertEqual([ref() for ref in net.dependants], [node, derive, reader])
+        self.assertEqual([ref() for ref in out.depends], [reader])
+        self.assertEqual(out.dependants, [])
+        full = counter().simulator
+        sim.run(4)
+        full.run(4)
+        self.assertEqual(net.get_signal_value(Signal.SIGNAL_A), full.networks[0].get_signal_value(Signal.SIGNAL_A))
+
+    def test_compact_edges_pickle(self):
+        sim, net, _, _, _ = counter(compact_edges=True)
+        sim.run(3)
+        copy = pickle.loads(pickle.dumps(sim))
+        copy_net = copy.networks[0]
+        self.assertIs(copy_net.depends[0](), copy.nodes[0])
+        copy.run(2)
+        self.assertEqual(copy_net.get_signal_value(Signal.SIGNAL_A), 5)
+
+    def divider(self):
+        """
+        A counter modulo 5 through two networks, repeating every ten ticks
+        """
+        first, second = Network(), Network()
+        sim = Simulator()
+        sim.add(Operation(NumericOperator.ADD, SignalOperand(first, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_A), second)
+        sim.add(Operation(NumericOperator.MODULO, SignalOperand(second, Signal.SIGNAL_A), ConstantOperand(5), Signal.SIGNAL_A), first)
+        return sim
+
+    def assertSameState(self, sim, expected):
+        self.assertEqual(sim.tick_count, expected.tick_count)
+        for network, other in zip(sim.networks, expected.networks):
+            self.assertEqual(dict(network._previous_state), dict(other._previous_state))
+        self.assertEqual(sim._pending, expected._pending)
+        self.assertEqual(sim._cached, expected._cached)
+
+    def test_fast_forward_cycle(self):
+        for ticks in [1, 5, 10, 37, 1000, 12345]:
+            with self.subTest(ticks=ticks):
+                sim, expected = self.divider(), self.divider()
+                sim.run(ticks, fast_forward=True)
+                expected.run(ticks)
+                self.assertSameState(sim, expected)
+                self.assertEqual(expected.skipped_ticks, 0)
+                sim.run(7, fast_forward=True)
+                expected.run(7)
+                self.assertSameState(sim, expected)
+        self.assertGreater(sim.skipped_ticks, 12000)
+
+    def test_fast_forward_idle(self):
+        net, out = Network(), Network()
+        sim = Simulator()
+        sim.add(Operation(NumericOperator.MULTIPLY, SignalOperand(net, Signal.SIGNAL_A), ConstantOperand(2), Signal.SIGNAL_B), out)
+        sim.set_input(net, Signal.SIGNAL_A, 4)
+        sim.run(10 ** 9, fast_forward=True)
+        self.assertEqual(sim.tick_count, 10 ** 9)
+        self.assertEqual(out.get_signal_value(Signal.SIGNAL_B), 8)
+        self.assertEqual(sim.changed, [])
+        sim.set_input(net, Signal.SIGNAL_A, 5)
+        sim.run(2, fast_forward=True)
+        self.assertEqual(out.get_signal_value(Signal.SIGNAL_B), 10)
+
+    def test_fast_forward_opt_in(self):
+        sim = self.divider()
+        sim.run(1000)
+        self.assertEqual(sim.skipped_ticks, 0)
+
+    def test_fast_forward_after_restore(self):
+        sim, expected = self.divider(), self.divider()
+        sim.run(3)
+        snapshot = sim.snapshot()
+        sim.run(6)
+        sim.restore(snapshot)
+        sim.run(500, fast_forward=True)
+        expected.run(503)
+        self.assertSameState(sim, expected)
+        self.assertGreater(sim.skipped_ticks, 0)
+
+    def test_fast_forward_hash_collision(self):
+        # with every network weighted zero all states look equal, the comparison of the
+        # states has to catch that
+        with mock.patch.object(simulator_module, "_network_weight", lambda position: 0):
+            sim, expected = self.divider(), self.divider()
+            sim.run(100, fast_forward=True)
+        expected.run(100)
+        self.assertSameState(sim, expected)
+
+    def test_fast_forward_with_hooks(self):
+        sim, expected = self.divider(), self.divider()
+        ticks, expected_ticks = [], []
+        sim.networks[0].add_tick_hook(ticks.append)
+        expected.networks[0].add_tick_hook(expected_ticks.append)
+        sim.run(100, fast_forward=True)
+        expected.run(100)
+        self.assertEqual(sim.skipped_ticks, 0)
+        self.assertEqual(len(ticks), len(expected_ticks))
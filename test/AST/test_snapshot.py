@@ -0,0 +1,110 @@
+import tempfile
+import unittest
+
+from processor_generator.AST.Snapshot import *
+from processor_generator.AST.Simulator import Simulator
+from processor_generator.AST.Network import Network
+from processor_generator.AST.Operand import SignalOperand, ConstantOperand
+from processor_generator.AST.Operation import Operation, NumericOperator
+
+from test.designs import counter
+
+
+def design():
+    """
+    The counter plus an idle network
+    """
+    sim = counter().simulator
+    idle = Network()
+    sim.add(Operation(NumericOperator.ADD, SignalOperand(idle, Signal.SIGNAL_A), ConstantOperand(0), Signal.SIGNAL_D), idle)
+    return sim
+
+
+def state(sim):
+    return [(dict(network._previous_state), dict(network._current_state)) for network in sim.networks], sim.tick_count
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_restore(self):
+        sim = design()
+        sim.run(5)
+        snapshot = sim.snapshot()
+        expected = state(sim)
+        sim.run(7)
+        after = state(sim)
+        sim.restore(snapshot)
+        self.assertEqual(state(sim), expected)
+        sim.run(7)
+        self.assertEqual(state(sim), after)
+
+    def test_restore_with_changed_inputs(self):
+        sim = design()
+        sim.run(3)
+        snapshot = sim.snapshot()
+        sim.run(2)
+        reference = state(sim)
+        sim.restore(snapshot)
+        sim.set_input(sim.networks[0], Signal.SIGNAL_A, 10)
+        sim.run(2)
+        self.assertNotEqual(state(sim), reference)
+        sim.restore(snapshot)
+        sim.run(2)
+        self.assertEqual(state(sim), reference)
+
+    def test_delta(self):
+        sim = design()
+        for _ in range(3):
+            sim.add_network(Network())
+        sim.run(3)
+        first = sim.snapshot()
+        self.assertIsNone(first.base)
+        self.assertEqual(first.rows.tolist(), [0, 1, 2, 3, 4, 5])
+        sim.run(1)
+        second = sim.snapshot()
+        self.assertIs(second.base, first)
+        self.assertEqual(second.rows.tolist(), [0, 1])
+        self.assertEqual(second.depth, 1)
+        second_state = state(sim)
+        sim.run(4)
+        sim.restore(first)
+        sim.run(1)
+        self.assertEqual(state(sim), second_state)
+        sim.run(3)
+        sim.restore(second)
+        self.assertEqual(state(sim), second_state)
+        flat = second.flatten()
+        self.assertIsNone(flat.base)
+        self.assertEqual([array.tolist() for array in flat.resolve()], [array.tolist() for array in second.resolve()])
+
+    def test_other_simulator(self):
+        sim = design()
+        sim.run(6)
+        snapshot = sim.snapshot()
+        other = design()
+        other.restore(snapshot)
+        self.assertEqual(state(other), state(sim))
+        other.run(3)
+        sim.run(3)
+        self.assertEqual(state(other), state(sim))
+        with self.assertRaises(ValueError):
+            Simulator().restore(snapshot)
+
+    def test_save_load(self):
+        sim = design()
+        sim.run(4)
+        sim.set_input(sim.networks[1], Signal.SIGNAL_E, 3)
+        sim.snapshot()
+        sim.run(1)
+        snapshot = sim.snapshot()
+        expected = state(sim)
+        sim.run(5)
+        after = state(sim)
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot.save(directory)
+            loaded = Snapshot.load(directory)
+            self.assertIsInstance(loaded.previous, np.memmap)
+            other = design()
+            other.restore(loaded)
+            self.assertEqual(state(other), expected)
+            other.run(5)
+            self.assertEqual(state(other), after)
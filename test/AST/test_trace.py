@@ -0,0 +1,121 @@
+import io
+import os
+import tempfile
+import unittest
+
+from processor_generator.AST.Trace import *
+from processor_generator.AST.Network import Network
+from processor_generator.AST.Operation import NumericOperator
+
+from test.designs import counter
+
+
+class TestTrace(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "trace.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, ticks, chunk_size):
+        sim, count, quarter, _, _ = counter(NumericOperator.DIVIDE, 4)
+        probes = [(count, Signal.SIGNAL_A), (quarter, Signal.SIGNAL_B)]
+        with TraceRecorder(self.path, probes, lambda: sim.tick_count, chunk_size=chunk_size) as recorder:
+            expected = [[network.get_signal_value(signal) for network, signal in probes]]
+            for _ in range(ticks):
+                sim.tick()
+                expected.append([network.get_signal_value(signal) for network, signal in probes])
+        self.assertEqual(recorder.names, ["network0.signal-A", "network1.signal-B"])
+        return expected
+
+    def test_records_changes_only(self):
+        self.record(100, 16)
+        trace = Trace(self.path)
+        # the counter changes every tick, its quarter every fourth tick
+        self.assertEqual(len(trace), 100 + 24)
+        self.assertEqual((trace.start, trace.end), (0, 100))
+        self.assertEqual(len(trace._chunks), 8)
+
+    def test_value_at_every_tick(self):
+        expected = self.record(50, 7)
+        trace = Trace(self.path)
+        for time, values in enumerate(expected):
+            with self.subTest(time=time):
+                self.assertEqual([trace.value(name, time) for name in trace.names], values)
+
+    def test_query_range(self):
+        expected = self.record(200, 10)
+        trace = Trace(self.path)
+        window = trace.query(60, 70)
+        self.assertEqual(window.initial.tolist(), expected[60])
+        self.assertEqual(window.times.tolist(), [61, 61, 62, 63, 64, 65, 65, 66, 67, 68, 69, 69])
+        state = window.initial.copy()
+        for time, probe, value in zip(window.times, window.probes, window.values):
+            state[probe] = value
+        self.assertEqual(state.tolist(), expected[69])
+
+    def test_query_reads_only_needed_chunks(self):
+        self.record(1000, 10)
+        trace = Trace(self.path)
+        read = []
+        original = trace._read_chunk
+        trace._read_chunk = lambda file, chunk: read.append(chunk) or original(file, chunk)
+        trace.query(500, 510)
+        self.assertLessEqual(len(read), 3)
+
+    def test_vcd(self):
+        self.record(4, 16)
+        output = io.StringIO()
+        Trace(self.path).write_vcd(output)
+        self.assertEqual(
+            output.getvalue(),
+            "$version processor_generator $end\n"
+            "$timescale 1 ns $end\n"
+            "$scope module trace $end\n"
+            "$var integer 32 ! network0.signal-A $end\n"
+            '$var integer 32 " network1.signal-B $end\n'
+            "$upscope $end\n"
+            "$enddefinitions $end\n"
+            "#0\n$dumpvars\nb0 !\nb0 \"\n$end\n"
+            "#1\nb1 !\n#2\nb10 !\n#3\nb11 !\n#4\nb100 !\n",
+        )
+
+    def test_vcd_negative_values(self):
+        net = Network()
+        ticks = [0]
+        with TraceRecorder(self.path, [(net, Signal.SIGNAL_A)], lambda: ticks[0]):
+            net.update_value(Signal.SIGNAL_A, -1)
+            net.tick()
+            ticks[0] += 1
+        output = io.StringIO()
+        Trace(self.path).write_vcd(output)
+        self.assertIn("#1\nb" + "1" * 32 + " !\n", output.getvalue())
+
+    def test_empty(self):
+        net = Network()
+        TraceRecorder(self.path, [(net, Signal.SIGNAL_A)], lambda: 0).close()
+        window = Trace(self.path).query()
+        self.assertEqual(window.initial.tolist(), [0])
+        self.assertEqual(len(window.times), 0)
+
+    def test_detaches_on_close(self):
+        net = Network()
+        recorder = TraceRecorder(self.path, [(net, Signal.SIGNAL_A)], lambda: 0)
+        recorder.close()
+        net.update_value(Signal.SIGNAL_A, 1)
+        net.tick()
+        self.assertFalse(net._tick_hooks)
+
+    def test_incomplete_file(self):
+        with open(self.path, "wb") as file:
+            file.write(b"PGTRACE1" + bytes(32))
+        with self.assertRaises(ValueError):
+            Trace(self.path)
+
+    def test_vcd_codes(self):
+        from processor_generator.AST.Trace import _vcd_code
+        codes = [_vcd_code(number) for number in range(94 * 95)]
+        self.assertEqual(len(set(codes)), len(codes))
+        self.assertEqual(codes[93], "~")
+        self.assertEqual(codes[94], "!!")
@@ -0,0 +1,112 @@
+import base64
+import json
+import unittest
+import zlib
+
+from draftsman.blueprintable import Blueprint
+
+from processor_generator.blueprint.Exporter import *
+from processor_generator.AST.Network import Network
+from processor_generator.AST.Operand import SignalOperand, ConstantOperand
+from processor_generator.AST.Operation import Operation, NumericOperator
+from processor_generator.AST.Signal import Signal
+from processor_generator.AST.Simulator import Simulator
+
+
+def decode(string):
+    return json.loads(zlib.decompress(base64.b64decode(string[1:])))["blueprint"]
+
+
+def chain(length):
+    """
+    A counter followed by a chain of operations, each reading the previous network
+    """
+    networks = [Network() for _ in range(length + 1)]
+    sim = Simulator()
+    sim.add(Operation(NumericOperator.ADD, SignalOperand(networks[0], Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_A), networks[0])
+    for index in range(length):
+        sim.add(Operation(NumericOperator.MULTIPLY, SignalOperand(networks[index], Signal.SIGNAL_A), ConstantOperand(2), Signal.SIGNAL_A), networks[index + 1])
+    return sim, networks
+
+
+class TestExporter(unittest.TestCase):
+    def test_entities(self):
+        a, b, out = Network(), Network(), Network()
+        sim = Simulator()
+        sim.add(Operation(NumericOperator.SUBTRACT, SignalOperand(a, Signal.SIGNAL_A), SignalOperand(b, Signal.IRON_ORE), Signal.SIGNAL_C), out)
+        sim.set_input(a, Signal.SIGNAL_A, 5)
+        sim.set_input(b, Signal.IRON_ORE, -3)
+        sim.add_constant_input(a, Signal.SIGNAL_A, 2)
+        blueprint = decode(Exporter(sim, label="test").to_string())
+        self.assertEqual(blueprint["label"], "test")
+        combinator, *constants = blueprint["entities"]
+        self.assertEqual(combinator["name"], "arithmetic-combinator")
+        self.assertEqual(combinator["control_behavior"]["arithmetic_conditions"], {
+            "first_signal": {"type": "virtual", "name": "signal-A"},
+            "first_signal_networks": {"red": True, "green": False},
+            "operation": "-",
+            "second_signal": {"type": "item", "name": "iron-ore"},
+            "second_signal_networks": {"red": False, "green": True},
+            "output_signal": {"type": "virtual", "name": "signal-C"},
+        })
+        self.assertEqual(sorted(entity["name"] for entity in constants), ["constant-combinator"] * 2)
+        filters = sorted(
+            (entity["control_behavior"]["sections"]["sections"][0]["filters"][0]["name"],
+             entity["control_behavior"]["sections"]["sections"][0]["filters"][0]["count"])
+            for entity in constants
+        )
+        self.assertEqual(filters, [("iron-ore", -3), ("signal-A", 7)])
+        # the red and the green input network are each wired to their constant combinator
+        self.assertEqual(len(blueprint["wires"]), 2)
+        self.assertEqual(sorted(wire[1] for wire in blueprint["wires"]), [1, 2])
+
+    def test_draftsman_reads_string(self):
+        sim, _ = chain(40)
+        string = Exporter(sim).to_string()
+        blueprint = Blueprint.from_string(string)
+        self.assertEqual(len(blueprint.entities), 41)
+        self.assertEqual(len(blueprint.wires), 41)
+
+    def test_wires_within_reach(self):
+        sim, networks = chain(500)
+        exporter = Exporter(sim, columns=8)
+        positions = {index + 1: entity.position for index, entity in enumerate(exporter.entities)}
+        for first, _, second, _ in exporter.wires:
+            (x1, y1), (x2, y2) = positions[first], positions[second]
+            self.assertLessEqual((x1 - x2) ** 2 + (y1 - y2) ** 2, WIRE_REACH ** 2)
+        # every network is a spanning tree: one wire less than its connectors
+        self.assertEqual(len(exporter.wires), 2 * 501 - len(networks))
+
+    def test_feedback_wire(self):
+        sim, networks = chain(0)
+        blueprint = decode(Exporter(sim).to_string())
+        self.assertEqual(blueprint["wires"], [[1, 1, 1, 3]])
+
+    def test_out_of_reach(self):
+        a, b = Network(), Network()
+        sim = Simulator()
+        sim.add(Operation(NumericOperator.ADD, SignalOperand(a, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_A), b)
+        for _ in range(5):
+            sim.add(Operation(NumericOperator.ADD, SignalOperand(a, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_A), Network())
+        sim.add(Operation(NumericOperator.ADD, SignalOperand(b, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_A), Network())
+        # the readers of a are placed between both ends of b, in one column that is
+        # much taller than the reach
+        with self.assertRaises(ValueError):
+            Exporter(sim, columns=1)
+        Exporter(sim, columns=4)
+
+    def test_too_many_colors(self):
+        a, b, c = Network(), Network(), Network()
+        sim = Simulator()
+        sim.add(Operation(NumericOperator.ADD, SignalOperand(a, Signal.SIGNAL_A), SignalOperand(b, Signal.SIGNAL_A)), c)
+        sim.add(Operation(NumericOperator.ADD, SignalOperand(b, Signal.SIGNAL_A), SignalOperand(c, Signal.SIGNAL_A)), a)
+        sim.add(Operation(NumericOperator.ADD, SignalOperand(c, Signal.SIGNAL_A), SignalOperand(a, Signal.SIGNAL_A)), b)
+        with self.assertRaises(ValueError):
+            Exporter(sim)
+
+    def test_streamed_matches_json(self):
+        sim, _ = chain(3)
+        exporter = Exporter(sim)
+        blueprint = decode(exporter.to_string())
+        self.assertEqual(blueprint["entities"], [exporter._entity(index) for index in range(4)])
+        self.assertEqual(blueprint["wires"], [list(wire) for wire in exporter.wires])
@@ -0,0 +1,162 @@
+import base64
+import json
+import time
+import unittest
+import zlib
+
+from processor_generator.blueprint.Importer import *
+from processor_generator.blueprint.Exporter import Exporter
+
+
+def encode(blueprint):
+    return "0" + base64.b64encode(zlib.compress(json.dumps({"blueprint": blueprint}).encode())).decode()
+
+
+def arithmetic(number, conditions, x=0.5):
+    return {
+        "entity_number": number,
+        "name": "arithmetic-combinator",
+        "position": {"x": x, "y": 1},
+        "control_behavior": {"arithmetic_conditions": conditions},
+    }
+
+
+A = {"type": "virtual", "name": "signal-A"}
+B = {"type": "virtual", "name": "signal-B"}
+
+
+class TestImporter(unittest.TestCase):
+    def test_round_trip(self):
+        a, b, out = Network(), Network(), Network()
+        sim = Simulator()
+        sim.add(Operation(NumericOperator.SUBTRACT, SignalOperand(a, Signal.SIGNAL_A), SignalOperand(b, Signal.IRON_ORE), Signal.SIGNAL_C), out)
+        sim.add(Operation(NumericOperator.ADD, SignalOperand(out, Signal.SIGNAL_C), ConstantOperand(1), Signal.SIGNAL_C), out)
+        sim.set_input(a, Signal.SIGNAL_A, 5)
+        sim.set_input(b, Signal.IRON_ORE, -3)
+        imported = Importer.from_string(Exporter(sim).to_string())
+        self.assertEqual(len(imported.nodes), 2)
+        self.assertEqual(len(imported.networks), 3)
+        self.assertEqual(sorted(imported.simulator.inputs.values()), [-3, 5])
+        sim.run(10)
+        imported.simulator.run(10)
+        node = next(node for node in imported.nodes.values() if node.operation == NumericOperator.ADD)
+        self.assertEqual(node.left.network.get_signal_value(Signal.SIGNAL_C), out.get_signal_value(Signal.SIGNAL_C))
+        self.assertNotEqual(out.get_signal_value(Signal.SIGNAL_C), 0)
+
+    def test_shared_networks(self):
+        # every combinator reads one bus and writes into another
+        count = 20000
+        conditions = {"first_signal": A, "operation": "+", "second_constant": 1, "output_signal": B}
+        blueprint = {
+            "entities": [arithmetic(number, conditions, x=number) for number in range(1, count + 1)],
+            "wires": [[number, connector, number + 1, connector] for number in range(1, count) for connector in (1, 3)],
+        }
+        start = time.perf_counter()
+        imported = Importer(blueprint)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(len(imported.networks), 2)
+        bus = imported.nodes[1].left.network
+        self.assertEqual(len(imported.simulator.readers(bus)), count)
+        self.assertEqual(len(bus.dependants), count)
+        imported.simulator.set_input(bus, Signal.SIGNAL_A, 2)
+        imported.simulator.run(2)
+        self.assertEqual(imported.simulator.outputs(imported.nodes[1])[0].get_signal_value(Signal.SIGNAL_B), 3 * count)
+
+    def test_wires_through_poles(self):
+        blueprint = {
+            "entities": [
+                arithmetic(1, {"first_signal": A, "operation": "+", "second_constant": 1, "output_signal": A}),
+                {"entity_number": 2, "name": "medium-electric-pole", "position": {"x": 5, "y": 5}},
+                arithmetic(3, {"first_signal": A, "operation": "*", "second_constant": 2, "output_signal": B}, x=8.5),
+            ],
+            # output of 1 -> pole -> input of 1 and input of 3, copper wires are ignored
+            "wires": [[1, 3, 2, 1], [2, 1, 1, 1], [2, 1, 3, 1], [1, 5, 3, 5]],
+        }
+        imported = Importer(blueprint)
+        self.assertEqual(len(imported.networks), 1)
+        first, second = imported.nodes[1], imported.nodes[3]
+        self.assertIs(first.left.network, second.left.network)
+        self.assertEqual(imported.simulator.outputs(first), [first.left.network])
+        self.assertEqual(imported.simulator.outputs(second), [])
+
+    def test_legacy_connections(self):
+        blueprint = {
+            "entities": [
+                {
+                    "entity_number": 1,
+                    "name": "constant-combinator",
+                    "position": {"x": 0.5, "y": 0.5},
+                    "control_behavior": {"filters": [{"signal": A, "count": 7, "index": 1}]},
+                    "connections": {"1": {"green": [{"entity_id": 2}]}},
+                },
+                {
+                    **arithmetic(2, {"first_signal": A, "operation": "<<", "constant": 2, "output_signal": B}, x=1.5),
+                    "connections": {
+                        "1": {"green": [{"entity_id": 1}]},
+                        "2": {"red": [{"entity_id": 3}]},
+                    },
+                },
+                {
+                    "entity_number": 3,
+                    "name": "small-lamp",
+                    "position": {"x": 3.5, "y": 0.5},
+                    "connections": {"1": {"red": [{"entity_id": 2, "circuit_id": 2}]}},
+                },
+            ],
+        }
+        imported = Importer(blueprint)
+        node = imported.nodes[2]
+        self.assertEqual(node.operation, NumericOperator.LEFT_BIT_SHIFT)
+        self.assertEqual(node.right, ConstantOperand(2))
+        self.assertEqual(len(imported.networks), 2)
+        imported.simulator.run(3)
+        self.assertEqual(imported.simulator.outputs(node)[0].get_signal_value(Signal.SIGNAL_B), 28)
+
+    def test_constants_add_up(self):
+        constant = lambda number: {
+            "entity_number": number,
+            "name": "constant-combinator",
+            "position": {"x": number, "y": 0.5},
+            "control_behavior": {"sections": {"sections": [{"index": 1, "filters": [{"index": 1, **A, "count": 3}]}]}},
+        }
+        imported = Importer({
+            "entities": [constant(1), constant(2), arithmetic(3, {"first_signal": A, "operation": "+", "second_constant": 0, "output_signal": A})],
+            "wires": [[1, 1, 2, 1], [2, 1, 3, 1]],
+        })
+        self.assertEqual(list(imported.simulator.inputs.values()), [6])
+
+    def test_selected_networks(self):
+        conditions = {"first_signal": A, "operation": "+", "second_signal": A}
+        blueprint = {
+            "entities": [
+                {"entity_number": 1, "name": "constant-combinator", "position": {"x": 0, "y": 0}},
+                {"entity_number": 2, "name": "constant-combinator", "position": {"x": 1, "y": 0}},
+                arithmetic(3, conditions),
+            ],
+            "wires": [[1, 1, 3, 1], [2, 2, 3, 2]],
+        }
+        with self.assertRaises(ValueError):
+            Importer(blueprint)
+        conditions["first_signal_networks"] = {"red": True, "green": False}
+        conditions["second_signal_networks"] = {"red": False, "green": True}
+        imported = Importer(blueprint)
+        node = imported.nodes[3]
+        self.assertIsNot(node.left.network, node.right.network)
+
+    def test_unwired(self):
+        imported = Importer({"entities": [arithmetic(1, {"first_signal": A, "operation": "-", "second_signal": B})]})
+        node = imported.nodes[1]
+        self.assertIs(node.left.network, node.right.network)
+        self.assertEqual(imported.networks, [])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            Importer({"entities": [{"entity_number": 1, "name": "decider-combinator", "position": {"x": 0, "y": 0}}]})
+        with self.assertRaises(ValueError):
+            Importer({"entities": [arithmetic(1, {"first_signal": {"type": "virtual", "name": "signal-each"}, "operation": "+"})]})
+        with self.assertRaises(ValueError):
+            Importer.from_string("1abc")
+        with self.assertRaises(ValueError):
+            Importer.from_string("0not base64")
+        with self.assertRaises(ValueError):
+            Importer.from_string("0" + base64.b64encode(zlib.compress(b'{"blueprint_book": {}}')).decode())
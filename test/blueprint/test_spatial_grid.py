@@ -0,0 +1,30 @@
+import random
+import unittest
+
+from processor_generator.blueprint.SpatialGrid import *
+
+
+class TestSpatialGrid(unittest.TestCase):
+    def test_near(self):
+        grid = SpatialGrid(9)
+        generator = random.Random(1)
+        points = [(generator.uniform(-50, 50), generator.uniform(-50, 50)) for _ in range(500)]
+        for index, (x, y) in enumerate(points):
+            grid.insert(index, x, y)
+        self.assertEqual(len(grid), 500)
+        for x, y in [(0, 0), (-49, 12.5), (30, 30)]:
+            expected = {index for index, (px, py) in enumerate(points) if (px - x) ** 2 + (py - y) ** 2 <= 81}
+            self.assertEqual({index for index, _ in grid.near(x, y, 9)}, expected)
+
+    def test_remove(self):
+        grid = SpatialGrid(2)
+        grid.insert("a", 0.5, 0.5)
+        grid.insert("b", 1.5, 0.5)
+        grid.remove("a", 0.5, 0.5)
+        self.assertEqual(list(grid.near(0, 0, 2)), [("b", 2.5)])
+
+    def test_radius(self):
+        with self.assertRaises(ValueError):
+            list(SpatialGrid(2).near(0, 0, 3))
+        with self.assertRaises(ValueError):
+            SpatialGrid(0)
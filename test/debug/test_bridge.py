@@ -0,0 +1,191 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from processor_generator.AST.Signal import Signal
+from processor_generator.debug.Bridge import *
+from processor_generator.debug.Client import DebugClient
+
+from test.designs import counter
+
+
+def design():
+    """
+    The counter with an input on the network of the doubled count
+    """
+    sim, _, double, _, _ = counter()
+    sim.set_input(double, Signal.SIGNAL_C, 7)
+    return sim
+
+
+def expected(sim, networks=None, signals=None):
+    return {
+        position: {
+            signal.value: value
+            for signal, value in dict(network._previous_state).items()
+            if signals is None or signal.value in signals
+        }
+        for position, network in enumerate(sim.networks)
+        if networks is None or position in networks
+    }
+
+
+class TestDebugBridge(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sim = design()
+        self.bridge = DebugBridge(self.sim, queue_size=4)
+        self.host, self.port = await self.bridge.start()
+        self.bridge.pause()
+        self.runner = asyncio.create_task(self.bridge.run())
+
+    async def asyncTearDown(self):
+        self.runner.cancel()
+        await self.bridge.close()
+
+    async def client(self):
+        client = await DebugClient.connect(self.host, self.port)
+        hello = await client.receive()
+        self.assertEqual(hello, {'type': 'hello', 'tick': self.sim.tick_count, 'networks': 2, 'paused': True})
+        return client
+
+    async def test_step(self):
+        client = await self.client()
+        await client.subscribe()
+        await client.step(3)
+        await client.receive_until(3)
+        self.assertEqual(self.sim.tick_count, 3)
+        self.assertEqual(client.state, expected(self.sim))
+        await client.step()
+        frame = await client.receive()
+        self.assertEqual(frame['tick'], 4)
+        self.assertEqual(frame['changes'], {'0': {'signal-A': 4}, '1': {'signal-B': 6}})
+        self.assertEqual(client.state, expected(self.sim))
+        await client.close()
+
+    async def test_filter(self):
+        await self.bridge.close()
+        path = os.path.join(tempfile.mkdtemp(), 'bridge.sock')
+        await self.bridge.start_unix(path)
+        client = await DebugClient.connect_unix(path)
+        await client.receive()
+        await client.subscribe(networks=[1], signals=['signal-B'])
+        await client.step(5)
+        await client.receive_until(5)
+        self.assertEqual(client.state, {1: {'signal-B': 8}})
+        await client.close()
+
+    async def test_pause_resume(self):
+        client = await self.client()
+        await client.subscribe(networks=[0])
+        await client.resume()
+        while client.tick < 50:
+            await client.receive()
+        self.assertFalse(client.paused)
+        await client.pause()
+        while not client.paused:
+            await client.receive()
+        tick = self.sim.tick_count
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.sim.tick_count, tick)
+        await client.receive_until(tick)
+        self.assertEqual(client.state, expected(self.sim, networks=[0]))
+        await client.close()
+
+    async def test_slow_client(self):
+        slow = await self.client()
+        await slow.subscribe()
+        await slow.receive()
+        # frames to the slow client get stuck on the way
+        gate = asyncio.Event()
+        writer = self.bridge._clients[0].writer
+        drain = writer.drain
+
+        async def stuck():
+            await gate.wait()
+            await drain()
+
+        writer.drain = stuck
+        fast = await self.client()
+        await fast.subscribe()
+        await fast.step(40)
+        # the slow client doesn't read, the simulation goes on without it
+        await fast.receive_until(40)
+        self.assertEqual(self.sim.tick_count, 40)
+        self.assertEqual(fast.dropped, 0)
+        # once the slow client catches up, the next frame brings it up to date
+        gate.set()
+        await slow.step()
+        await slow.receive_until(41)
+        self.assertGreater(slow.dropped, 0)
+        self.assertEqual(slow.state, expected(self.sim))
+        await slow.close()
+        await fast.close()
+
+    async def test_errors(self):
+        client = await self.client()
+        for message in [{'type': 'subscribe', 'networks': [5]}, {'type': 'subscribe', 'signals': ['nope']}, {'type': 'step', 'ticks': 0}, {'type': 'jump'}]:
+            await client._send(message)
+            frame = await client.receive()
+            self.assertEqual(frame['type'], 'error')
+        self.assertEqual(len(client.errors), 4)
+        await client.close()
+
+    async def test_malformed(self):
+        client = await self.client()
+        messages = [
+            {'type': 'subscribe', 'networks': ['a']},
+            {'type': 'subscribe', 'networks': 5},
+            {'type': 'subscribe', 'signals': 'signal-A'},
+            {'type': 'subscribe', 'signals': [1]},
+            {'type': 'step', 'ticks': True},
+            [1, 2],
+        ]
+        for message in messages:
+            await client._send(message)
+            frame = await client.receive()
+            self.assertEqual(frame['type'], 'error')
+        # longer than the limit of the reader
+        client._writer.write(b'{"type": "pause", "padding": "' + b'x' * (1 << 17) + b'"}\n')
+        frame = await client.receive()
+        self.assertEqual(frame['type'], 'error')
+        # the connection is still usable
+        await client.subscribe()
+        while 'reset' not in frame:
+            frame = await client.receive()
+        self.assertEqual(client.state, expected(self.sim))
+        await client.close()
+
+    async def test_error_flood(self):
+        client = await self.client()
+        gate = asyncio.Event()
+        writer = self.bridge._clients[0].writer
+        drain = writer.drain
+
+        async def stuck():
+            await gate.wait()
+            await drain()
+
+        writer.drain = stuck
+        for _ in range(50):
+            await client._send({'type': 'jump'})
+        # subscribing shows when the bridge got through the messages
+        await client.subscribe()
+        while not self.bridge._clients[0].subscribed:
+            await asyncio.sleep(0.001)
+        # the queue holds four errors and the writer may be stuck with one more, the
+        # rest is dropped
+        gate.set()
+        await client.pause()
+        while (await client.receive())['type'] != 'state':
+            pass
+        self.assertIn(len(client.errors), (4, 5))
+        await client.close()
+
+    async def test_unsubscribed(self):
+        client = await self.client()
+        self.bridge.resume()
+        await asyncio.sleep(0.01)
+        self.assertGreater(self.sim.tick_count, 0)
+        self.assertIsNone(self.bridge._last)
+        await client.close()
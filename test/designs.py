@@ -0,0 +1,29 @@
+from typing import NamedTuple
+
+from processor_generator.AST.Network import Network
+from processor_generator.AST.Operand import SignalOperand, ConstantOperand
+from processor_generator.AST.Operation import Operation, NumericOperator
+from processor_generator.AST.Signal import Signal
+from processor_generator.AST.Simulator import Simulator
+
+
+class Counter(NamedTuple):
+    simulator: Simulator
+    counting: Network
+    derived: Network
+    increment: Operation
+    derive: Operation
+
+
+def counter(operator=NumericOperator.MULTIPLY, constant=2, compact_edges=False):
+    """
+    A network counting up on signal A through an adder feeding back into it, and a
+    network holding signal B, the count combined with a constant
+    """
+    counting, derived = Network(), Network()
+    simulator = Simulator(compact_edges)
+    increment = Operation(NumericOperator.ADD, SignalOperand(counting, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_A)
+    derive = Operation(operator, SignalOperand(counting, Signal.SIGNAL_A), ConstantOperand(constant), Signal.SIGNAL_B)
+    simulator.add(increment, counting)
+    simulator.add(derive, derived)
+    return Counter(simulator, counting, derived, increment, derive)
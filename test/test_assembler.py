@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+
+from processor_generator.instruction.Assembler import *
+
+INSTRUCTIONS: InstructionSet = InstructionSet.from_obj([
+    {
+        'name': 'LOAD',
+        'architecture': '16bit',
+        'opcode': '+#+#,0-11',
+        'parameters': [{'name': 'register', 'source': '8-11'}, {'name': 'immediate', 'source': '0-7'}],
+    },
+    {
+        'name': 'JUMP',
+        'architecture': '16bit',
+        'opcode': '++++,0-11',
+        'parameters': [{'name': 'address', 'source': '0-11,#'}],
+    },
+    {
+        'name': 'HALT',
+        'architecture': '16bit',
+        'opcode': '++++++++++++++++',
+        'parameters': [],
+    },
+])
+
+
+class TestAssembler(unittest.TestCase):
+    def test_word_type(self):
+        self.assertIs(Assembler(INSTRUCTIONS).word_type, np.uint16)
+        self.assertIs(Assembler(InstructionSet([])).word_type, np.uint8)
+
+    def test_assemble(self):
+        program = [
+            ('LOAD', {'register': 1, 'immediate': 0xab}),
+            ('JUMP', {'address': 0x24}),
+            ('HALT', {}),
+            ('LOAD', {'register': 0xf, 'immediate': 0}),
+        ]
+        image = Assembler(INSTRUCTIONS).assemble(program)
+        self.assertEqual(image.dtype, np.uint16)
+        self.assertEqual(image.tolist(), [0xa1ab, 0xf012, 0xffff, 0xaf00])
+        for word, (name, parameters) in zip(image.tolist(), program):
+            instruction = INSTRUCTIONS.identify(word)
+            self.assertEqual(instruction.name, name)
+            self.assertEqual(instruction.parameters_for_instruction(word), parameters)
+        self.assertEqual(Assembler(INSTRUCTIONS).assemble([]).tolist(), [])
+
+    def test_invalid(self):
+        assembler = Assembler(INSTRUCTIONS)
+        with self.assertRaisesRegex(ValueError, 'Line 2'):
+            assembler.assemble([('HALT', {}), ('JUMP', {'address': 0}), ('JUMP', {'address': 1})])
+        with self.assertRaisesRegex(ValueError, 'Line 1'):
+            assembler.assemble([('HALT', {}), ('LOAD', {'register': 0x10, 'immediate': 0})])
+        with self.assertRaisesRegex(ValueError, 'Line 0'):
+            assembler.assemble([('LOAD', {'register': 0})])
+        with self.assertRaisesRegex(ValueError, 'Line 1: Unknown instruction UNKNOWN'):
+            assembler.assemble([('HALT', {}), ('UNKNOWN', {})])
+        with self.assertRaisesRegex(ValueError, 'Line 2'):
+            assembler.assemble([('HALT', {}), ('LOAD', {'register': 0, 'immediate': 0}), ('LOAD', {'register': 0, 'immediate': 2 ** 64})])
+        with self.assertRaisesRegex(ValueError, 'Line 0'):
+            assembler.assemble([('JUMP', {'address': -2 ** 70})])
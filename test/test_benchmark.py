@@ -0,0 +1,77 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from processor_generator.benchmark import *
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_synthetic_instruction_set(self):
+        for architecture in ARCHITECTURES:
+            with self.subTest(architecture=architecture):
+                instructions = synthetic_instruction_set(architecture)
+                words = synthetic_words(instructions, 1000)
+                # the opcode covers the highest bits, so every word is known
+                self.assertTrue((instructions.identify_many(words) >= 0).all())
+                instruction = instructions["OP3"]
+                columns = instruction.decode_many(words)
+                encoded = instruction.encode_many(**columns)
+                self.assertEqual(instructions.identify_many(encoded).tolist(), [instructions.position(int(encoded[0]))] * 1000)
+
+    def test_synthetic_design(self):
+        simulator = synthetic_design(200)
+        self.assertEqual(len(simulator.nodes), 200)
+        self.assertEqual(len(simulator.networks), 20)
+        simulator.run(5)
+        self.assertFalse(simulator.idle)
+
+    def test_exportable_design(self):
+        simulator = exportable_design(200)
+        self.assertEqual(len(simulator.nodes), 200)
+        exporter = Exporter(simulator)
+        self.assertEqual(len(exporter.entities), 201)
+        self.assertEqual(set(exporter.colors.values()), {"red", "green"})
+
+    def test_run(self):
+        results = run_benchmarks(["8bit"], [100], words=100, ticks=1, min_time=0)
+        self.assertIn("instruction/8bit/decode", results)
+        self.assertIn("design/100/kernel", results)
+        self.assertIn("design/100/export", results)
+        for result in results.values():
+            self.assertGreater(result.value, 0)
+
+    def test_compare(self):
+        baseline = {
+            "speed": Result(100.0, "words/s", True),
+            "memory": Result(100.0, "bytes", False),
+            "removed": Result(1.0, "words/s", True),
+        }
+        self.assertEqual(compare(baseline, {"speed": Result(95.0, "words/s", True)}), [])
+        self.assertEqual(
+            compare(baseline, {"speed": Result(80.0, "words/s", True), "memory": Result(130.0, "bytes", False)}),
+            [Regression("speed", 100.0, 80.0, -0.2), Regression("memory", 100.0, 130.0, -0.3)],
+        )
+        self.assertEqual(compare(baseline, {"memory": Result(50.0, "bytes", False)}), [])
+
+    def test_baseline_round_trip(self):
+        results = {"speed": Result(1.5, "words/s", True)}
+        self.assertEqual(from_obj(json.loads(json.dumps(to_obj(results)))), results)
+        with self.assertRaises(ValueError):
+            from_obj({"version": 0, "results": {}})
+
+    def test_main_compare(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, "baseline.json")
+            current = os.path.join(directory, "current.json")
+            with open(baseline, "w") as file:
+                json.dump(to_obj({"speed": Result(100.0, "words/s", True)}), file)
+            with open(current, "w") as file:
+                json.dump(to_obj({"speed": Result(50.0, "words/s", True)}), file)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(main(["compare", baseline, "--current", current]), 1)
+                self.assertEqual(main(["compare", baseline, "--current", current, "--threshold", "0.6"]), 0)
+            self.assertIn("REGRESSION speed", output.getvalue())
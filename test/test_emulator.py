@@ -0,0 +1,132 @@
+import unittest
+
+from processor_generator.instruction.Assembler import Assembler
+from processor_generator.instruction.Emulator import *
+
+INSTRUCTIONS: InstructionSet = InstructionSet.from_obj([
+    {
+        'name': 'LOAD',
+        'architecture': '16bit',
+        'opcode': '+#+#,0-11',
+        'parameters': [{'name': 'register', 'source': '8-11'}, {'name': 'immediate', 'source': '0-7'}],
+    },
+    {
+        'name': 'DEC',
+        'architecture': '16bit',
+        'opcode': '+##+,0-11',
+        'parameters': [{'name': 'register', 'source': '8-11'}],
+    },
+    {
+        'name': 'JNZ',
+        'architecture': '16bit',
+        'opcode': '++#+,0-11',
+        'parameters': [{'name': 'register', 'source': '8-11'}, {'name': 'address', 'source': '0-7'}],
+    },
+    {
+        'name': 'HALT',
+        'architecture': '16bit',
+        'opcode': '++++++++++++++++',
+        'parameters': [],
+    },
+])
+
+
+def load(emulator, parameters):
+    emulator.registers[parameters['register']] = parameters['immediate']
+
+
+def dec(emulator, parameters):
+    emulator.registers[parameters['register']] -= 1
+
+
+def jnz(emulator, parameters):
+    if emulator.registers[parameters['register']]:
+        emulator.pc = parameters['address']
+
+
+def halt(emulator, parameters):
+    emulator.halt()
+
+
+def emulator(program):
+    image = Assembler(INSTRUCTIONS).assemble(program)
+    result = Emulator(INSTRUCTIONS, image)
+    for name, semantics in [('LOAD', load), ('DEC', dec), ('JNZ', jnz), ('HALT', halt)]:
+        result.register(name, semantics)
+    return result
+
+
+COUNTDOWN = [
+    ('LOAD', {'register': 1, 'immediate': 200}),
+    ('DEC', {'register': 1}),
+    ('JNZ', {'register': 1, 'address': 1}),
+    ('HALT', {}),
+]
+
+
+class TestEmulator(unittest.TestCase):
+    def test_run(self):
+        emu = emulator(COUNTDOWN)
+        self.assertEqual(emu.run(), 1 + 200 * 2 + 1)
+        self.assertTrue(emu.halted)
+        self.assertEqual(emu.registers, {1: 0})
+        self.assertEqual(emu.pc, 4)
+        self.assertEqual(emu.run(), 0)
+        # the loop is decoded once
+        info = emu.cache_info
+        self.assertEqual(info.misses, 4)
+        self.assertEqual(info.hits, 1 + 200 * 2 + 1 - 4)
+
+    def test_limit(self):
+        emu = emulator(COUNTDOWN)
+        self.assertEqual(emu.run(10), 10)
+        self.assertEqual(emu.registers, {1: 200 - 5})
+        emu.step()
+        self.assertEqual(emu.executed, 11)
+        self.assertFalse(emu.halted)
+
+    def test_decode(self):
+        emu = emulator(COUNTDOWN)
+        decoded = emu.decode(emu.program[2])
+        self.assertIs(decoded.instruction, INSTRUCTIONS['JNZ'])
+        self.assertIs(decoded.semantics, jnz)
+        self.assertEqual(decoded.parameters, {'register': 1, 'address': 1})
+        self.assertIs(emu.decode(emu.program[2]), decoded)
+
+    def test_register(self):
+        emu = emulator(COUNTDOWN)
+        emu.run(1)
+        calls = []
+
+        @emu.semantics('DEC')
+        def double_dec(emulator, parameters):
+            calls.append(parameters)
+            emulator.registers[parameters['register']] -= 2
+
+        emu.run()
+        self.assertEqual(len(calls), 100)
+        self.assertEqual(emu.registers, {1: 0})
+        with self.assertRaises(ValueError):
+            emu.register('MISSING', halt)
+
+    def test_self_modifying(self):
+        emu = emulator(COUNTDOWN)
+        emu.run(3)
+        emu.program[2] = emu.program[3]
+        emu.run()
+        self.assertEqual(emu.registers, {1: 198})
+        self.assertEqual(emu.executed, 5)
+
+    def test_errors(self):
+        emu = emulator(COUNTDOWN)
+        emu.program[1] = 0
+        with self.assertRaisesRegex(ValueError, 'Address 1: Unknown instruction'):
+            emu.run()
+        self.assertEqual(emu.executed, 1)
+        emu = Emulator(INSTRUCTIONS, Assembler(INSTRUCTIONS).assemble(COUNTDOWN))
+        with self.assertRaisesRegex(ValueError, 'No semantics registered for LOAD'):
+            emu.run()
+        emu = emulator(COUNTDOWN[1:3])
+        emu.registers[1] = 1
+        with self.assertRaisesRegex(ValueError, 'outside of the program'):
+            emu.run()
@@ -0,0 +1,120 @@
+import random
+import time
+import unittest
+
+from processor_generator.instruction.encoding import *
+from processor_generator.instruction.InstructionSet import InstructionSet
+
+
+def instruction(name, pattern):
+    """
+    An 8 bit instruction from a pattern like 10xx0xxx
+    """
+    segments = [{'0': '#', '1': '+'}.get(bit, '0-0') for bit in pattern]
+    return Instruction(name, None, [], f'{len(pattern)}bit', ','.join(segments))
+
+
+class TestEncoding(unittest.TestCase):
+    def test_fixed_bits(self):
+        first = instruction('A', '10xx0xxx')
+        self.assertEqual(describe(first.fixed_mask, first.fixed_value, 8), '10xx0xxx')
+
+    def test_check(self):
+        instructions = [
+            instruction('A', '10xxxxxx'),
+            instruction('B', '0xxxxxxx'),
+            instruction('C', '1x0xxxxx'),
+            instruction('D', '00000000'),
+        ]
+        report = check_encodings(instructions)
+        self.assertEqual(report.width, 8)
+        self.assertEqual(
+            [(first.name, second.name) for first, second in report.ambiguous],
+            [('A', 'C'), ('B', 'D')],
+        )
+        self.assertEqual([describe(mask, value, 8) for mask, value in report.unused], ['111xxxxx'])
+        self.assertEqual(report.unused_words, 32)
+
+    def test_empty(self):
+        report = check_encodings([])
+        self.assertEqual(report, (0, [], [], False))
+        self.assertEqual(report.unused_words, 0)
+        self.assertEqual(check_encodings([], max_unused=None), (0, [], [], False))
+        report = check_encodings([instruction('A', 'xxxxxxxx'), instruction('B', '1xxxxxxx')])
+        self.assertEqual(len(report.ambiguous), 1)
+        self.assertEqual(report.unused, [])
+
+    def test_matches_brute_force(self):
+        rng = random.Random(3)
+        for _ in range(30):
+            instructions = [
+                instruction(f'I{index}', ''.join(rng.choice('01xxx') for _ in range(8)))
+                for index in range(rng.randint(1, 12))
+            ]
+            report = check_encodings(instructions)
+            expected = set()
+            unused = 0
+            for word in range(256):
+                matching = [index for index, each in enumerate(instructions) if each.matches(word)]
+                unused += not matching
+                expected.update(
+                    (first, second) for position, first in enumerate(matching) for second in matching[position + 1:]
+                )
+            self.assertEqual(
+                [(instructions.index(first), instructions.index(second)) for first, second in report.ambiguous],
+                sorted(expected),
+            )
+            self.assertEqual(report.unused_words, unused)
+            covered = set()
+            for mask, value in report.unused:
+                words = {word for word in range(256) if word & mask == value}
+                self.assertFalse(covered & words)
+                covered |= words
+            self.assertEqual(len(covered), unused)
+
+    def test_overlapping_fields(self):
+        # no common prefix: eight 4 bit fields with all of their values, and single bits
+        instructions = []
+        for field in range(8):
+            for value in range(16):
+                pattern = ['x'] * 32
+                pattern[field * 4:field * 4 + 4] = format(value, '04b')
+                instructions.append(instruction(f'F{field}_{value}', ''.join(pattern)))
+        bits = [instruction(f'B{bit}', 'x' * (31 - bit) + '1' + 'x' * bit) for bit in range(32)]
+        start = time.perf_counter()
+        fields = check_encodings(instructions)
+        single = check_encodings(bits)
+        self.assertLess(time.perf_counter() - start, 1)
+        # values of the same field exclude each other, all others overlap
+        self.assertEqual(len(fields.ambiguous), 16 * 16 * 28)
+        self.assertEqual(fields.unused, [])
+        self.assertEqual(len(single.ambiguous), 32 * 31 // 2)
+        self.assertEqual(single.unused, [(2**32 - 1, 0)])
+
+    def test_unused_limit(self):
+        # the words with an odd high nibble are unused, listed as one pattern per nibble
+        instructions = [instruction(f'I{value}', format(value, '04b') + 'xxxx') for value in range(0, 16, 2)]
+        report = check_encodings(instructions, max_unused=3)
+        self.assertEqual(len(report.unused), 3)
+        self.assertTrue(report.truncated)
+        report = check_encodings(instructions)
+        self.assertEqual(len(report.unused), 8)
+        self.assertEqual(report.unused_words, 128)
+        self.assertFalse(report.truncated)
+
+    def test_large(self):
+        # thousands of variants in a prefix code of opcodes with varying lengths
+        rng = random.Random(0)
+        instructions = []
+        for index in range(4096):
+            length = rng.randint(8, 16)
+            opcode = format(rng.getrandbits(length), f'0{length}b')
+            instructions.append(instruction(f'I{index}', opcode + 'x' * (32 - length)))
+        start = time.perf_counter()
+        report = check_encodings(instructions)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertTrue(report.ambiguous)
+        self.assertGreater(report.unused_words, 0)
+        # an instruction set only rejects identical opcodes
+        with self.assertRaises(ValueError):
+            InstructionSet([instruction('A', '1x'), instruction('B', '1x')])
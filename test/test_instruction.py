@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 from processor_generator.instruction.Instruction import *
 from typing import List, Optional
 from processor_generator.instruction.InstructionParameter import StoredInstructionParameter
@@ -88,3 +89,74 @@ class TestInstruction(unittest.TestCase):
             PARAM1_NAME: PARAMETERS[0].value(to_test),
             PARAM2_NAME: PARAMETERS[1].value(to_test),
         })
+
+    def test_compiled_decoder(self):
+        ins = Instruction(NAME, DESCRIPTION, PARAMETERS, ARCHITECTURE)
+        for to_test in range(2**8):
+            self.assertEqual(ins.parameters_for_instruction(to_test), {
+                parameter.name: sum(sub.value(to_test) for sub in parameter.parameters)
+                for parameter in PARAMETERS
+            })
+
+    def test_recompile_on_source_change(self):
+        param = InstructionParameter(PARAM1_NAME, PARAM1_SOURCE)
+        ins = Instruction(NAME, DESCRIPTION, [param], ARCHITECTURE)
+        self.assertEqual(ins.parameters_for_instruction(0b1111), {PARAM1_NAME: 0b11_0000})
+        param.source = '0-3'
+        self.assertEqual(ins.parameters_for_instruction(0b1111), {PARAM1_NAME: 0b1111})
+        ins.parameters.append(InstructionParameter(PARAM2_NAME, '+'))
+        ins.compile()
+        self.assertEqual(ins.parameters_for_instruction(0), {PARAM1_NAME: 0, PARAM2_NAME: 1})
+
+    def test_recompile_on_rename(self):
+        param = InstructionParameter(PARAM1_NAME, '0-3')
+        ins = Instruction(NAME, DESCRIPTION, [param], ARCHITECTURE)
+        param.name = PARAM2_NAME
+        self.assertEqual(ins.parameters_for_instruction(0b1111), {PARAM2_NAME: 0b1111})
+
+    def test_decode_many(self):
+        ins = Instruction(NAME, DESCRIPTION, PARAMETERS, ARCHITECTURE)
+        words = np.arange(2**8, dtype=np.uint64)
+        decoded = ins.decode_many(words)
+        self.assertEqual(set(decoded), {PARAM1_NAME, PARAM2_NAME})
+        for index, word in enumerate(words):
+            expected = ins.parameters_for_instruction(int(word))
+            self.assertEqual({name: int(column[index]) for name, column in decoded.items()}, expected)
+
+    def test_opcode(self):
+        ins = Instruction(NAME, DESCRIPTION, PARAMETERS, ARCHITECTURE)
+        self.assertIsNone(ins.opcode)
+        self.assertEqual((ins.fixed_mask, ins.fixed_value), (0, 0))
+        self.assertTrue(ins.matches(0b1010))
+        ins.opcode = '+#,0-3,#+'
+        self.assertEqual(ins.fixed_mask, 0b11_0000_11)
+        self.assertEqual(ins.fixed_value, 0b10_0000_01)
+        self.assertTrue(ins.matches(0b10_1111_01))
+        self.assertFalse(ins.matches(0b11_0000_01))
+        self.assertNotEqual(ins, Instruction(NAME, DESCRIPTION, PARAMETERS, ARCHITECTURE))
+        self.assertEqual(ins.width, 16)
+
+    def test_encode(self):
+        ins = Instruction(NAME, DESCRIPTION, PARAMETERS, ARCHITECTURE, '+,0-6')
+        for to_test in range(2**7):
+            word = to_test | 0b1000_0000
+            parameters = ins.parameters_for_instruction(word)
+            self.assertEqual(ins.parameters_for_instruction(ins.encode(**parameters)), parameters)
+        self.assertEqual(ins.encode(**{PARAM1_NAME: 0b11_00_11, PARAM2_NAME: 0b11_11_00}), 0b1011_1110)
+        with self.assertRaises(ValueError):
+            ins.encode(**{PARAM1_NAME: 0})
+        with self.assertRaises(ValueError):
+            ins.encode(**{PARAM1_NAME: 0, PARAM2_NAME: 0})
+        with self.assertRaises(ValueError):
+            ins.encode(**{PARAM1_NAME: 0b100_00_00, PARAM2_NAME: 0b11_00_00})
+
+    def test_encode_many(self):
+        ins = Instruction(NAME, DESCRIPTION, PARAMETERS, ARCHITECTURE)
+        words = np.arange(2**8, dtype=np.uint64) & np.uint64(0b0011_0110)
+        decoded = ins.decode_many(words)
+        self.assertEqual(ins.encode_many(**decoded).tolist(), words.tolist())
+        self.assertEqual(ins.encode_many(**{PARAM1_NAME: [0b11_00_11], PARAM2_NAME: 0b11_11_00}).tolist(), [0b0011_1110])
+        with self.assertRaises(ValueError):
+            ins.encode_many(**{PARAM1_NAME: [0, -1], PARAM2_NAME: [0b11_00_00, 0b11_00_00]})
+        with self.assertRaises(ValueError):
+            ins.encode_many(**{PARAM1_NAME: [0, 1], PARAM2_NAME: [0b11_00_00, 0b11_00_00]})
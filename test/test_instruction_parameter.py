@@ -1,4 +1,7 @@
 import unittest
+
+import numpy as np
+
 from processor_generator.instruction.InstructionParameter import InstructionParameter
 from processor_generator.instruction.instruction_types import StoredInstructionParameter
 from processor_generator.instruction.InstructionSubParameter import sub_parameter_parser
@@ -115,3 +118,30 @@ class InstructionParameterTest(unittest.TestCase):
         self.assertEqual(param.value(0b1011_0100), 0b0001_0011)
         param = InstructionParameter(NAME, '+,1-4,#,0-0')
         self.assertEqual(param.value(0b1011_0100), 0b0110_1000)
+
+    def test_compiled_value(self):
+        param = InstructionParameter(NAME, '+,1-4,#,0-0,++')
+        for using in range(2**6):
+            self.assertEqual(
+                param.value(using),
+                sum(sub_param.value(using) for sub_param in param.parameters)
+            )
+        param.parameters[1].start = 2
+        param.compile()
+        self.assertEqual(param.value(0b1_0000), 0b1_0100_0011)
+
+    def test_expression(self):
+        param = InstructionParameter(NAME, '##,0-3,++')
+        self.assertEqual(eval(param.expression('using'), {'using': 0b1011_0100}), param.value(0b1011_0100))
+        param = InstructionParameter(NAME, '#+')
+        self.assertEqual(eval(param.expression('using'), {}), 1)
+
+    def test_values(self):
+        param = InstructionParameter(NAME, '+,1-4,#,0-0,++')
+        words = np.arange(2**6, dtype=np.uint64)
+        self.assertEqual(param.values(words).tolist(), [param.value(int(word)) for word in words])
+        param = InstructionParameter(NAME, '+#')
+        self.assertEqual(param.values([0, 1]).tolist(), [2, 2])
+        param = InstructionParameter(NAME, '0-63,+')
+        with self.assertRaises(ValueError):
+            param.values([0])
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from processor_generator.instruction.InstructionSet import *
+from processor_generator.instruction.InstructionParameter import InstructionParameter
+
+
+def make_instruction(name: str, opcode: str) -> Instruction:
+    return Instruction(name, None, [InstructionParameter('operand', '0-3')], '8bit', opcode)
+
+
+LOAD: Instruction = make_instruction('LOAD', '#+#+,0-3')
+STORE: Instruction = make_instruction('STORE', '#++#,0-3')
+HALT: Instruction = make_instruction('HALT', '++++++++')
+NOP: Instruction = make_instruction('NOP', '++++,0-3')
+
+
+class TestInstructionSet(unittest.TestCase):
+    def test_constructor(self):
+        instruction_set = InstructionSet([LOAD, STORE])
+        self.assertEqual(instruction_set.instructions, [LOAD, STORE])
+        self.assertEqual(len(instruction_set), 2)
+        self.assertEqual(list(instruction_set), [LOAD, STORE])
+        self.assertIs(instruction_set['STORE'], STORE)
+        with self.assertRaises(ValueError):
+            InstructionSet([LOAD, LOAD])
+        with self.assertRaises(ValueError):
+            InstructionSet([LOAD, make_instruction('OTHER', '#+#+,4-7')])
+
+    def test_from_obj(self):
+        instruction_set = InstructionSet.from_obj([{
+            'name': 'LOAD',
+            'architecture': '8bit',
+            'opcode': '#+#+,0-3',
+            'parameters': [{'name': 'operand', 'source': '0-3'}],
+        }])
+        self.assertEqual(instruction_set, InstructionSet([LOAD]))
+        self.assertNotEqual(instruction_set, LOAD)
+
+    def test_identify(self):
+        instruction_set = InstructionSet([LOAD, STORE, HALT, NOP])
+        self.assertIs(instruction_set.identify(0b0101_0011), LOAD)
+        self.assertIs(instruction_set.identify(0b0110_1111), STORE)
+        self.assertIs(instruction_set.identify(0b1111_1111), HALT)
+        self.assertIs(instruction_set.identify(0b1111_1110), NOP)
+        self.assertIsNone(instruction_set.identify(0b0000_0000))
+        self.assertEqual(instruction_set.position(0b0110_0000), 1)
+
+    def test_fallback(self):
+        other = make_instruction('OTHER', None)
+        instruction_set = InstructionSet([other, LOAD])
+        self.assertIs(instruction_set.identify(0b0101_0000), LOAD)
+        self.assertIs(instruction_set.identify(0b0000_0000), other)
+
+    def test_identify_many(self):
+        instruction_set = InstructionSet([LOAD, STORE, HALT, NOP])
+        words = np.arange(2**8, dtype=np.uint64)
+        self.assertEqual(
+            instruction_set.identify_many(words).tolist(),
+            [-1 if (position := instruction_set.position(int(word))) is None else position for word in words]
+        )
+
+    def test_reindex(self):
+        load = make_instruction('LOAD', '#+#+,0-3')
+        instruction_set = InstructionSet([load])
+        load.opcode = '+#+#,0-3'
+        instruction_set.index()
+        self.assertIs(instruction_set.identify(0b1010_0000), load)
+        self.assertIsNone(instruction_set.identify(0b0101_0000))
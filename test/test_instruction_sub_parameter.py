@@ -56,6 +56,12 @@ class TestVariableInstructionSubParameter(unittest.TestCase):
         param2 = StaticInstructionSubParameter(0, 1, 1)
         self.assertNotEqual(param1, param2)
 
+    def test_bit_field(self):
+        param = VariableInstructionSubParameter(4, 2, 5)
+        self.assertEqual(param.bit_field(), (2, 0b1111))
+        param.end = 2
+        self.assertEqual(param.bit_field(), (2, 0b1))
+
     def test_len(self):
         param = VariableInstructionSubParameter(0, 0, 0)
         self.assertEqual(param.length, 1)
@@ -94,6 +100,10 @@ class TestStaticInstructionSubParameter(unittest.TestCase):
         param2 = VariableInstructionSubParameter(0, 1, 2)
         self.assertNotEqual(param1, param2)
 
+    def test_bit_field(self):
+        param = StaticInstructionSubParameter(0, 1, 1)
+        self.assertIsNone(param.bit_field())
+
     def test_repr(self):
         param = StaticInstructionSubParameter(0, 1, 2)
         self.assertEqual(repr(param), 'StaticInstructionSubParameter(shift_by=0, length=1, number=2)')
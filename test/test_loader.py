@@ -0,0 +1,131 @@
+import json
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+
+from processor_generator.instruction.loader import *
+from processor_generator.instruction.instruction_types import StoredInstruction
+
+DESCRIPTION = {
+    'instructions': [
+        {
+            'name': 'LOAD',
+            'architecture': '8bit',
+            'opcode': '#+,0-5',
+            'parameters': [{'name': 'value', 'source': '0-5', 'description': None}],
+        },
+        {
+            'name': 'HALT',
+            'description': 'stops the processor',
+            'architecture': '8bit',
+            'opcode': '++++++++',
+            'parameters': [],
+        },
+    ]
+}
+
+
+class TestValidate(unittest.TestCase):
+    def test_valid(self):
+        validate(DESCRIPTION, StoredInstructionSet)
+        validate(DESCRIPTION['instructions'][0], StoredInstruction)
+
+    def test_invalid(self):
+        with self.assertRaisesRegex(ValueError, r'\$ has to be an object'):
+            validate([], StoredInstructionSet)
+        with self.assertRaisesRegex(ValueError, r'\$\.instructions has to be a list'):
+            validate({'instructions': {}}, StoredInstructionSet)
+        with self.assertRaisesRegex(ValueError, r'\$\.instructions\[0\] is missing the entry "architecture"'):
+            validate({'instructions': [{'name': 'a', 'parameters': []}]}, StoredInstructionSet)
+        with self.assertRaisesRegex(ValueError, r'unknown entry "other"'):
+            validate({'instructions': [], 'other': 1}, StoredInstructionSet)
+        with self.assertRaisesRegex(ValueError, r'\$\.name has to be of type str, got int'):
+            validate({'name': 1, 'parameters': [], 'architecture': '8bit'}, StoredInstruction)
+        with self.assertRaisesRegex(ValueError, r'\$\.description'):
+            validate({'name': 'a', 'parameters': [], 'architecture': '8bit', 'description': 1}, StoredInstruction)
+
+
+class TestLoader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+        self.cache = self.path / 'cache'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name: str, content: str) -> Path:
+        path = self.path / name
+        path.write_text(content)
+        return path
+
+    def test_parse(self):
+        instruction_set = parse_instruction_set(json.dumps(DESCRIPTION))
+        self.assertEqual([instruction.name for instruction in instruction_set], ['LOAD', 'HALT'])
+        self.assertEqual(instruction_set.identify(0b0100_0011).name, 'LOAD')
+        with self.assertRaises(ValueError):
+            parse_instruction_set('', '.txt')
+        broken = {'instructions': [{'name': 'a', 'architecture': '7bit', 'parameters': []}]}
+        with self.assertRaisesRegex(ValueError, r'\$\.instructions\[0\]: Invalid instruction architecture'):
+            parse_instruction_set(json.dumps(broken))
+
+    def test_formats(self):
+        expected = parse_instruction_set(json.dumps(DESCRIPTION))
+        try:
+            import yaml
+            import tomllib
+        except ImportError:
+            self.skipTest('PyYAML or tomllib not available')
+        self.assertEqual(parse_instruction_set(yaml.safe_dump(DESCRIPTION), '.yaml'), expected)
+        toml = (
+            '[[instructions]]\nname = "LOAD"\narchitecture = "8bit"\nopcode = "#+,0-5"\n'
+            'parameters = [{name = "value", source = "0-5"}]\n'
+            '[[instructions]]\nname = "HALT"\ndescription = "stops the processor"\n'
+            'architecture = "8bit"\nopcode = "++++++++"\nparameters = []\n'
+        )
+        self.assertEqual(parse_instruction_set(toml, '.toml'), expected)
+
+    def test_cache(self):
+        path = self.write('isa.json', json.dumps(DESCRIPTION))
+        first = load_instruction_set(path, self.cache)
+        self.assertEqual(len(os.listdir(self.cache)), 1)
+        second = load_instruction_set(path, self.cache)
+        self.assertEqual(first, second)
+        self.assertEqual(second['LOAD'].parameters_for_instruction(0b0100_0011), {'value': 3})
+        second['LOAD'].parameters[0].source = '0-1'
+        self.assertEqual(second['LOAD'].parameters_for_instruction(0b0100_0111), {'value': 3})
+        changed = {'instructions': DESCRIPTION['instructions'][:1]}
+        path.write_text(json.dumps(changed))
+        self.assertEqual(len(load_instruction_set(path, self.cache)), 1)
+        self.assertEqual(len(os.listdir(self.cache)), 2)
+
+    def test_corrupt_cache(self):
+        path = self.write('isa.json', json.dumps(DESCRIPTION))
+        load_instruction_set(path, self.cache)
+        for entry in self.cache.iterdir():
+            entry.write_bytes(b'garbage')
+        self.assertEqual(len(load_instruction_set(path, self.cache)), 2)
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), 'no file owners')
+    def test_shared_cache_ignored(self):
+        path = self.write('isa.json', json.dumps(DESCRIPTION))
+        load_instruction_set(path, self.cache)
+        self.assertEqual(stat.S_IMODE(self.cache.stat().st_mode) & 0o077, 0)
+        entry = next(self.cache.iterdir())
+        entry.chmod(0o666)
+        with mock.patch('pickle.load') as load:
+            self.assertEqual(len(load_instruction_set(path, self.cache)), 2)
+        load.assert_not_called()
+        entry.unlink()
+        self.cache.chmod(0o777)
+        load_instruction_set(path, self.cache)
+        self.assertEqual(os.listdir(self.cache), [])
+
+    def test_failed_write_cleaned_up(self):
+        path = self.write('isa.json', json.dumps(DESCRIPTION))
+        with mock.patch('os.replace', side_effect=OSError('read only')):
+            self.assertEqual(len(load_instruction_set(path, self.cache)), 2)
+        self.assertEqual(os.listdir(self.cache), [])
@@ -0,0 +1,71 @@
+import os
+import pickle
+import unittest
+
+from processor_generator.Runner import *
+from processor_generator.instruction.InstructionSet import InstructionSet
+from processor_generator.AST.Kernel import Kernel
+from processor_generator.AST.Network import Network
+from processor_generator.AST.Operand import SignalOperand, ConstantOperand
+from processor_generator.AST.Operation import Operation, NumericOperator
+from processor_generator.AST.Signal import Signal
+from processor_generator.AST.Simulator import Simulator
+
+INSTRUCTIONS: InstructionSet = InstructionSet.from_obj([
+    {
+        'name': 'LOAD',
+        'architecture': '8bit',
+        'opcode': '#+,0-5',
+        'parameters': [{'name': 'value', 'source': '0-5'}],
+    },
+    {
+        'name': 'HALT',
+        'architecture': '8bit',
+        'opcode': '++,0-5',
+        'parameters': [],
+    },
+])
+
+
+def decode_program(instructions, program):
+    result = []
+    for word in program:
+        instruction = instructions.identify(word)
+        if instruction is None:
+            raise ValueError(f'Unknown instruction {word}')
+        result.append((instruction.name, instruction.parameters_for_instruction(word), os.getpid()))
+    return result
+
+
+def count_to(kernel, ticks):
+    kernel = pickle.loads(pickle.dumps(kernel))
+    kernel.run(ticks)
+    return kernel.get_signal_value(kernel.networks[0], Signal.SIGNAL_A)
+
+
+class TestRunner(unittest.TestCase):
+    def test_instruction_cases(self):
+        cases = [[0b0100_0000 | i, 0b1100_0000] for i in range(20)] + [[0]]
+        runner = Runner(INSTRUCTIONS, decode_program, max_workers=2, chunk_size=3)
+        results = sorted(runner.run(cases))
+        self.assertEqual([result.position for result in results], list(range(21)))
+        for index, result in enumerate(results[:20]):
+            self.assertIsNone(result.error)
+            self.assertEqual([(name, parameters) for name, parameters, _ in result.value], [('LOAD', {'value': index}), ('HALT', {})])
+            self.assertNotEqual(result.value[0][2], os.getpid())
+        self.assertIsNone(results[20].value)
+        self.assertIn('Unknown instruction 0', results[20].error)
+
+    def test_circuit_cases(self):
+        net = Network()
+        sim = Simulator()
+        sim.add(Operation(NumericOperator.ADD, SignalOperand(net, Signal.SIGNAL_A), ConstantOperand(1), Signal.SIGNAL_A), net)
+        runner = Runner(Kernel(sim), count_to, max_workers=2)
+        self.assertEqual(sorted(result.value for result in runner.run([5, 1, 9])), [1, 5, 9])
+
+    def test_serial(self):
+        runner = Runner(INSTRUCTIONS, decode_program)
+        results = list(runner.run_serial([[0b1100_0000]]))
+        self.assertEqual(results[0].value, [('HALT', {}, os.getpid())])
+        with self.assertRaises(ValueError):
+            Runner(INSTRUCTIONS, decode_program, chunk_size=0)